@@ -0,0 +1 @@
+"""Synthetic data generator and benchmark runner (python -m benchmarks.run)."""
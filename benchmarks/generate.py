@@ -0,0 +1,120 @@
+"""Synthetic duplicate reports for benchmarking.
+
+Writes <group>/<file>/<match> XML in the layout XMLFlattener reads, or the
+same groups as JSON / JSON lines for JsonAnalyzer. Output is streamed, so
+reports far larger than memory can be generated, and a fixed seed always
+produces the same report.
+
+    python -m benchmarks.generate report.xml --groups 1000000
+"""
+import argparse
+import json
+import random
+from typing import Dict, Iterator, List, Tuple
+from xml.sax.saxutils import quoteattr
+
+
+def generate_groups(groups: int, min_files: int = 2, max_files: int = 6, directories: int = 1000,
+                    depth: int = 3, partial_fraction: float = 0.1, shared_fraction: float = 0.05,
+                    seed: int = 0) -> Iterator[Tuple[List[str], List[Tuple[int, int, float]]]]:
+    """Yield (file paths, matches) per group
+
+    Matches chain the files of a group (0-1, 1-2, ...). A partial_fraction
+    of groups contain one match below 100%, and shared_fraction of files
+    reuse a path from an earlier group, as happens when one file matches
+    several groups.
+    """
+    rng = random.Random(seed)
+    recent: List[str] = []
+    file_number = 0
+    for _ in range(groups):
+        paths = []
+        for _ in range(rng.randint(min_files, max_files)):
+            if recent and rng.random() < shared_fraction:
+                shared = rng.choice(recent)
+                if shared not in paths:
+                    paths.append(shared)
+                    continue
+            file_number += 1
+            directory = '/'.join(f"d{rng.randrange(directories)}" for _ in range(depth))
+            path = f"/data/{directory}/IMG_{file_number:08d}.jpg"
+            paths.append(path)
+            if len(recent) < 10000:
+                recent.append(path)
+            else:
+                recent[rng.randrange(len(recent))] = path
+        matches = [(i, i + 1, 100.0) for i in range(len(paths) - 1)]
+        if matches and rng.random() < partial_fraction:
+            first, second, _ = matches[rng.randrange(len(matches))]
+            matches[first] = (first, second, float(rng.randint(60, 99)))
+        yield paths, matches
+
+
+def write_xml(path: str, **shape) -> int:
+    """Write a duplicate report XML; returns the number of groups"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n<duplicates>\n')
+        for paths, matches in generate_groups(**shape):
+            parts = ['<group>']
+            parts.extend(f'<file path={quoteattr(p)}/>' for p in paths)
+            parts.extend(f'<match first="{a}" second="{b}" percentage="{pct:g}"/>' for a, b, pct in matches)
+            parts.append('</group>\n')
+            out.write(''.join(parts))
+            count += 1
+        out.write('</duplicates>\n')
+    return count
+
+
+def _group_dict(paths: List[str], matches: List[Tuple[int, int, float]]) -> Dict:
+    return {
+        'files': [{'path': p} for p in paths],
+        'matches': [{'first': a, 'second': b, 'percentage': pct} for a, b, pct in matches],
+    }
+
+
+def write_json(path: str, lines: bool = False, **shape) -> int:
+    """Write the groups as one JSON document, or one group per line; returns the number of groups"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as out:
+        if not lines:
+            out.write('{"groups": [\n')
+        for paths, matches in generate_groups(**shape):
+            if lines:
+                out.write(json.dumps(_group_dict(paths, matches)) + '\n')
+            else:
+                out.write((',\n' if count else '') + json.dumps(_group_dict(paths, matches)))
+            count += 1
+        if not lines:
+            out.write('\n]}\n')
+    return count
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic duplicate report")
+    parser.add_argument('output')
+    parser.add_argument('--format', choices=['xml', 'json', 'jsonl'],
+                        help="default: from the output extension, else xml")
+    parser.add_argument('--groups', type=int, default=10000)
+    parser.add_argument('--min-files', type=int, default=2)
+    parser.add_argument('--max-files', type=int, default=6)
+    parser.add_argument('--directories', type=int, default=1000, help="distinct names per path level")
+    parser.add_argument('--depth', type=int, default=3, help="directory levels below /data")
+    parser.add_argument('--partial-fraction', type=float, default=0.1)
+    parser.add_argument('--shared-fraction', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or next((f for f in ('jsonl', 'json') if args.output.endswith('.' + f)), 'xml')
+    shape = dict(groups=args.groups, min_files=args.min_files, max_files=args.max_files,
+                 directories=args.directories, depth=args.depth, partial_fraction=args.partial_fraction,
+                 shared_fraction=args.shared_fraction, seed=args.seed)
+    if fmt == 'xml':
+        count = write_xml(args.output, **shape)
+    else:
+        count = write_json(args.output, lines=fmt == 'jsonl', **shape)
+    print(f"Wrote {count} groups to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
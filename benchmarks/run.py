@@ -0,0 +1,235 @@
+"""Benchmark runner.
+
+Runs each benchmark in a fresh process, so the reported peak RSS belongs
+to that benchmark alone. Results can be saved and compared with a
+previous run to catch regressions:
+
+    python -m benchmarks.run --groups 100000 --output baseline.json
+    python -m benchmarks.run --groups 100000 --compare baseline.json
+
+Benchmarks:
+    ingest        -- XMLFlattener rows/sec, database size
+    page_load     -- viewer queries: open a listing, first screen, jump, scroll
+    json_analyzer -- JsonAnalyzer groups/sec over a JSON report
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from src.core.ingest_stats import peak_rss_mb
+
+from .generate import write_json, write_xml
+
+# Metrics compared against a baseline, and whether higher is better
+METRICS = {
+    'rows_per_sec': True,
+    'groups_per_sec': True,
+    'seconds': False,
+    'peak_rss_mb': False,
+    'db_mb': False,
+    'open_ms': False,
+    'first_screen_ms': False,
+    'jump_ms': False,
+    'scroll_ms': False,
+}
+
+SCREEN_GROUPS = 10  # Groups fetched per screen in page_load
+
+
+def _db_path(workdir: str, groups: int) -> str:
+    return os.path.join(workdir, f"bench_{groups}.db")
+
+
+def bench_ingest(workdir: str, groups: int) -> dict:
+    from src.core.xml_processor import XMLFlattener
+
+    xml_path = os.path.join(workdir, f"report_{groups}.xml")
+    if not os.path.exists(xml_path):
+        write_xml(xml_path, groups=groups)
+    db_path = _db_path(workdir, groups)
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    started = time.perf_counter()
+    stats = XMLFlattener(db_path).process_large_xml(xml_path)
+    elapsed = time.perf_counter() - started
+
+    conn = sqlite3.connect(db_path)
+    rows = sum(conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in ('all_groups', 'matches'))
+    conn.close()
+    return {
+        'seconds': elapsed,
+        'rows': rows,
+        'rows_per_sec': rows / elapsed,
+        'xml_mb': os.path.getsize(xml_path) / 2**20,
+        'db_mb': os.path.getsize(db_path) / 2**20,
+        'stages': stats.as_dict()['stages'],
+    }
+
+
+def bench_page_load(workdir: str, groups: int, repeat: int = 20) -> dict:
+    from src.core.group_query import GroupFilter, ensure_query_indexes
+    from src.ui.utils.group_source import GroupSource
+    from src.ui.utils.prefetcher import fetch_group_files
+
+    db_path = _db_path(workdir, groups)
+    if not os.path.exists(db_path):
+        bench_ingest(workdir, groups)
+    conn = sqlite3.connect(db_path)
+    ensure_query_indexes(conn)
+    conn.close()
+
+    def timed(func):
+        started = time.perf_counter()
+        func()
+        return (time.perf_counter() - started) * 1000
+
+    def screen(source, first):
+        fetch_group_files(db_path, source[first:first + SCREEN_GROUPS])
+
+    results = {}
+    for sort in GroupFilter.SORTS:
+        open_ms, first_ms, jump_ms, scroll_ms = [], [], [], []
+        for run in range(repeat):
+            started = time.perf_counter()
+            source = GroupSource(db_path, GroupFilter(sort=sort))
+            open_ms.append((time.perf_counter() - started) * 1000)
+            first_ms.append(timed(lambda: screen(source, 0)))
+            # A jump lands in an uncached block; the following screens mostly reuse it
+            middle = len(source) * (run + 1) // (repeat + 1)
+            jump_ms.append(timed(lambda: screen(source, middle)))
+            for step in range(1, 6):
+                scroll_ms.append(timed(lambda: screen(source, middle + step * SCREEN_GROUPS)))
+            source.close()
+        results[sort] = {
+            'open_ms': statistics.median(open_ms),
+            'first_screen_ms': statistics.median(first_ms),
+            'jump_ms': statistics.median(jump_ms),
+            'scroll_ms': statistics.median(scroll_ms),
+        }
+    return results
+
+
+def bench_json_analyzer(workdir: str, groups: int) -> dict:
+    from json_analyzer import JsonAnalyzer
+
+    json_path = os.path.join(workdir, f"report_{groups}.json")
+    if not os.path.exists(json_path):
+        write_json(json_path, groups=groups)
+
+    started = time.perf_counter()
+    with open(json_path, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+    JsonAnalyzer(data).analyze()
+    elapsed = time.perf_counter() - started
+    return {
+        'seconds': elapsed,
+        'groups_per_sec': groups / elapsed,
+        'json_mb': os.path.getsize(json_path) / 2**20,
+    }
+
+
+BENCHMARKS = {
+    'ingest': bench_ingest,
+    'page_load': bench_page_load,
+    'json_analyzer': bench_json_analyzer,
+}
+
+
+def _run_one(name: str, workdir: str, groups: int) -> dict:
+    logging.basicConfig(level=logging.WARNING)
+    result = BENCHMARKS[name](workdir, groups)
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def run(names, workdir: str, groups: int) -> dict:
+    results = {
+        'meta': {
+            'groups': groups,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+    }
+    for name in names:
+        # A fresh interpreter per benchmark keeps peak RSS and caches separate
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            try:
+                results[name] = executor.submit(_run_one, name, workdir, groups).result()
+            except Exception as e:
+                results[name] = {'error': f"{type(e).__name__}: {e}"}
+        print(f"{name}: {json.dumps(results[name], indent=2, default=str)}")
+    return results
+
+
+def _flatten(results: dict, prefix: str = '') -> dict:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and key in METRICS:
+            flat[prefix + key] = (value, METRICS[key])
+    return flat
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> int:
+    """Print changes against baseline; returns the number of regressions"""
+    current = _flatten({k: v for k, v in results.items() if k != 'meta'})
+    previous = _flatten({k: v for k, v in baseline.items() if k != 'meta'})
+    regressions = 0
+    for metric, (value, higher_is_better) in sorted(current.items()):
+        if metric not in previous or not previous[metric][0]:
+            continue
+        ratio = value / previous[metric][0]
+        worse = ratio < 1 - tolerance if higher_is_better else ratio > 1 + tolerance
+        regressions += worse
+        print(f"{'REGRESSION' if worse else 'ok':>10}  {metric:<40} {previous[metric][0]:>12.2f} -> "
+              f"{value:>12.2f}  ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--groups', type=int, default=100000, help="groups in the synthetic report")
+    parser.add_argument('--workdir', help="keep generated inputs and databases here for reuse")
+    parser.add_argument('--output', help="save results as JSON")
+    parser.add_argument('--compare', help="baseline results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    names = args.benchmarks or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run(names, args.workdir, args.groups)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run(names, workdir, args.groups)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as out:
+            json.dump(results, out, indent=2)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        return 1 if compare(results, baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
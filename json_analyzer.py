@@ -1,4 +1,5 @@
 import json
+import sys
 from collections import Counter
 from typing import Any, Dict, List
 import pandas as pd
@@ -53,14 +54,24 @@ class JsonAnalyzer:
             "stats": self.stats
         }
 
-def analyze_json_file(file_path: str) -> None:
-    """Analyze JSON file and print results"""
+def _load_and_analyze(file_path: str) -> Dict:
+    with open(file_path, 'r') as file:
+        json_data = json.load(file)
+    return JsonAnalyzer(json_data).analyze()
+
+def analyze_json_file(file_path: str, profile: bool = False) -> None:
+    """Analyze JSON file and print results
+
+    With profile, loading and analysis are profiled into
+    <file_path>.prof / <file_path>.profile.txt.
+    """
     try:
-        with open(file_path, 'r') as file:
-            json_data = json.load(file)
-            
-        analyzer = JsonAnalyzer(json_data)
-        results = analyzer.analyze()
+        if profile:
+            from src.core.profiling import profiled
+            with profiled(file_path):
+                results = _load_and_analyze(file_path)
+        else:
+            results = _load_and_analyze(file_path)
         
         print("\n=== JSON Structure ===")
         for path, type_info in results["structure"].items():
@@ -76,6 +87,7 @@ def analyze_json_file(file_path: str) -> None:
         print(f"Error analyzing JSON file: {str(e)}")
 
 if __name__ == "__main__":
-    # Example usage
-    file_path = "duplcates.json"
-    analyze_json_file(file_path)
\ No newline at end of file
+    # Example usage: python json_analyzer.py [file.json] [--profile]
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    file_path = args[0] if args else "duplcates.json"
+    analyze_json_file(file_path, profile='--profile' in sys.argv[1:])
\ No newline at end of file
@@ -14,6 +14,10 @@ setup(
         "sqlalchemy>=1.4.0",  # for database operations
     ],
     extras_require={
+        'parquet': ['pyarrow>=7.0.0'],  # for export --format parquet
+        'zstd': ['zstandard>=0.15.0'],  # for .xml.zst reports
+        'columnar': ['pyarrow>=7.0.0', 'duckdb>=0.9.0'],  # for --storage parquet stores
+        'postgres': ['psycopg2-binary>=2.9'],  # for postgresql:// databases
         'dev': [
             'pytest>=7.0.0',
             'pytest-cov>=4.0.0',
@@ -21,6 +25,11 @@ setup(
             'flake8>=4.0.0',
         ]
     },
+    entry_points={
+        'console_scripts': [
+            'xml-analyzer=core.cli:main',
+        ],
+    },
     python_requires=">=3.7",
     author="Your Name",
     description="XML Duplicate File Analyzer with GUI",
@@ -0,0 +1 @@
+"""Core processing package."""
\ No newline at end of file
@@ -0,0 +1,110 @@
+import logging
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from .file_meta import collect_file_meta, create_file_meta_table
+
+logger = logging.getLogger(__name__)
+
+# Paths flagged as duplicate in every group they appear in; a path that is
+# the original anywhere must be kept, so it never counts as reclaimable
+DUPLICATE_PATHS = '''
+SELECT filepath FROM all_groups
+GROUP BY filepath
+HAVING MIN(duplicate_flag) = 1
+'''
+
+
+def original_join(conn: sqlite3.Connection) -> str:
+    """JOIN clause pairing duplicate rows d of all_groups with their originals o
+
+    After clustering a duplicate belongs to the original of its own
+    file_clusters subcluster, otherwise to the originals of its group.
+    """
+    if conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'file_clusters'"
+    ).fetchone() is not None:
+        return '''
+        JOIN file_clusters fd ON fd.id = d.id
+        JOIN file_clusters fo ON fo.cluster_id = fd.cluster_id
+        JOIN all_groups o ON o.id = fo.id AND o.duplicate_flag = 0
+        '''
+    return 'JOIN all_groups o ON o.group_id = d.group_id AND o.duplicate_flag = 0'
+
+
+def reclaimable_paths(conn: sqlite3.Connection) -> str:
+    """SQL selecting the paths the resolver would remove
+
+    A duplicate path only counts if it has an original to keep, so groups
+    left without one (partial or failed verification) free nothing.
+    """
+    return f'''
+    SELECT DISTINCT d.filepath FROM all_groups d
+    {original_join(conn)}
+    WHERE d.duplicate_flag = 1 AND d.filepath IN ({DUPLICATE_PATHS})
+    '''
+
+# Directory part of a path (keeps the trailing separator): rtrim strips every
+# trailing character that is not a separator, i.e. the file name
+DIRECTORY_EXPR = "rtrim(d.filepath, replace(replace(d.filepath, '/', ''), '\\', ''))"
+
+
+def reclaimable_summary(conn: sqlite3.Connection, collect: bool = True,
+                        workers: Optional[int] = None) -> Dict:
+    """Return overall counts and bytes freed by deleting flagged duplicates
+
+    With collect, paths missing from file_meta are stat'ed first (in
+    parallel, cached for later calls). Everything else is computed by SQL
+    aggregates, so no rows are loaded into Python. Files that could not be
+    stat'ed are reported as missing and contribute no bytes.
+    """
+    if collect:
+        collect_file_meta(conn, workers=workers)
+    else:
+        create_file_meta_table(conn)
+
+    files, total_bytes = conn.execute('''
+    SELECT COUNT(*), COALESCE(SUM(fm.size), 0)
+    FROM (SELECT DISTINCT filepath FROM all_groups) p
+    LEFT JOIN file_meta fm ON fm.filepath = p.filepath
+    ''').fetchone()
+    duplicates, reclaimable, missing = conn.execute(f'''
+    SELECT COUNT(*), COALESCE(SUM(fm.size), 0), COALESCE(SUM(fm.size IS NULL), 0)
+    FROM ({reclaimable_paths(conn)}) d
+    LEFT JOIN file_meta fm ON fm.filepath = d.filepath
+    ''').fetchone()
+
+    summary = {
+        'files': files,
+        'total_bytes': total_bytes,
+        'duplicate_files': duplicates,
+        'reclaimable_bytes': reclaimable,
+        'missing_files': missing,
+    }
+    logger.info(f"{duplicates} duplicate files, {format_bytes(reclaimable)} reclaimable "
+                f"({missing} not found on disk)")
+    return summary
+
+
+def directory_rollup(conn: sqlite3.Connection, limit: Optional[int] = 50) -> List[Tuple[str, int, int]]:
+    """Return (directory, duplicate_files, reclaimable_bytes), largest first
+
+    Relies on file_meta already being filled (see reclaimable_summary).
+    Pass limit=None for every directory.
+    """
+    create_file_meta_table(conn)
+    return conn.execute(f'''
+    SELECT {DIRECTORY_EXPR} AS directory, COUNT(*), COALESCE(SUM(fm.size), 0) AS reclaimable
+    FROM ({reclaimable_paths(conn)}) d
+    LEFT JOIN file_meta fm ON fm.filepath = d.filepath
+    GROUP BY directory
+    ORDER BY reclaimable DESC, directory
+    LIMIT ?
+    ''', (-1 if limit is None else limit,)).fetchall()
+
+
+def format_bytes(size: int) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if size < 1024 or unit == 'TB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
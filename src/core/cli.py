@@ -0,0 +1,385 @@
+"""Headless command line interface.
+
+Only the standard library is imported at startup; each command imports the
+modules it needs, so no command ever loads tkinter, ttkthemes or PIL (unless an
+original selection rule needs image dimensions).
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+
+logger = logging.getLogger(__name__)
+
+
+def _cmd_ingest(args) -> int:
+    from .xml_processor import XMLFlattener
+
+    flattener = XMLFlattener(
+        args.db,
+        verify_content=args.verify_content,
+        hash_cache_path=args.hash_cache,
+        original_policy=_original_policy(args),
+        build_search_index=args.search_index,
+        storage=args.storage,
+    )
+    job = _cancel_on_interrupt()
+    if args.profile:
+        from .profiling import profiled
+        with profiled(args.profile_output or args.db, memory=not args.no_memory_profile):
+            stats = flattener.process_large_xml(args.xml, stats_path=args.stats_json, job=job)
+    else:
+        stats = flattener.process_large_xml(args.xml, stats_path=args.stats_json, job=job)
+    if stats.cancelled:
+        logger.warning(f"Interrupted; {stats.counters.get('groups', 0)} groups were kept in {args.db}")
+        return 130
+    logger.info(f"Data successfully stored in {args.db}")
+    return 0
+
+
+def _cmd_ingest_batch(args) -> int:
+    from .ingest_queue import IngestQueue
+
+    def report(job):
+        if job.status not in ('queued', 'running'):
+            logger.info(f"[{job.id}/{len(ingest_queue.jobs)}] {job.xml_path}: {job.status}"
+                        + (f" ({job.error})" if job.error else ""))
+
+    ingest_queue = IngestQueue(
+        workers=args.workers,
+        shared_db=args.db,
+        on_update=report,
+        verify_content=args.verify_content,
+        hash_cache_path=args.hash_cache,
+        original_policy=_original_policy(args),
+        build_search_index=args.search_index,
+    )
+
+    _cancel_on_interrupt(ingest_queue.cancel)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    for xml_path in args.xml:
+        db_path = None
+        if not args.db and args.output_dir:
+            db_path = os.path.join(args.output_dir, os.path.splitext(os.path.basename(xml_path))[0] + '.db')
+        ingest_queue.submit(xml_path, db_path)
+    summary = ingest_queue.wait()
+    if args.stats_json:
+        import json
+        with open(args.stats_json, 'w', encoding='utf-8') as out:
+            json.dump({'summary': summary, 'jobs': [
+                {'xml': job.xml_path, 'db': job.db_path, 'status': job.status, 'error': job.error,
+                 'stats': job.stats} for job in ingest_queue.jobs
+            ]}, out, indent=2)
+    return 0 if summary['done'] == summary['jobs'] else 1
+
+
+def _original_policy(args):
+    """OriginalPolicy from --original-rules/--preferred-prefix, or None if neither was given"""
+    from .originals import OriginalPolicy
+
+    if not (args.original_rules or args.preferred_prefix):
+        return None
+    rules = args.original_rules.split(',') if args.original_rules else ['preferred_prefix']
+    return OriginalPolicy(rules=rules, preferred_prefixes=args.preferred_prefix)
+
+
+def _cancel_on_interrupt(cancel=None):
+    """Return a JobController cancelled by the first Ctrl-C (the second one aborts)
+
+    cancel, if given, is called as well (e.g. IngestQueue.cancel).
+    """
+    import signal
+    from .job_control import JobController
+
+    job = JobController()
+
+    def interrupt(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        logger.warning("Interrupted, committing loaded groups (press Ctrl-C again to abort)")
+        job.cancel()
+        if cancel is not None:
+            cancel()
+
+    signal.signal(signal.SIGINT, interrupt)
+    return job
+
+
+def _cmd_stats(args) -> int:
+    from .group_summary import has_group_summary, rebuild_group_summary
+    from .repository import connect, is_database_url, is_sqlite_file
+
+    if args.space and is_database_url(args.db):
+        raise ValueError("--space needs a SQLite database file or a columnar store")
+    conn = connect(args.db)
+    try:
+        if is_sqlite_file(args.db) and not has_group_summary(conn):
+            rebuild_group_summary(conn)
+        groups, files, originals, matches = conn.execute('''
+        SELECT COUNT(*), COALESCE(SUM(member_count), 0), COALESCE(SUM(original_count), 0),
+               COALESCE(SUM(match_count), 0)
+        FROM group_summary
+        ''').fetchone()
+        print(f"groups:     {groups}")
+        print(f"files:      {files}")
+        print(f"originals:  {originals}")
+        print(f"duplicates: {files - originals}")
+        print(f"matches:    {matches}")
+        if args.space:
+            from .analytics import directory_rollup, format_bytes, reclaimable_summary
+            summary = reclaimable_summary(conn, workers=args.workers)
+            print(f"size:        {format_bytes(summary['total_bytes'])}")
+            print(f"reclaimable: {format_bytes(summary['reclaimable_bytes'])} "
+                  f"({summary['missing_files']} files not found)")
+            for directory, count, size in directory_rollup(conn, limit=args.top):
+                print(f"  {format_bytes(size):>10}  {count:>8}  {directory}")
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_list_groups(args) -> int:
+    from .group_query import GroupFilter, ensure_query_indexes
+    from .group_summary import has_group_summary, rebuild_group_summary
+    from .path_search import build_path_index, has_path_index, match_expression
+    from .repository import connect, is_sqlite_file
+
+    sqlite_file = is_sqlite_file(args.db)
+    if args.search and not sqlite_file:
+        raise ValueError("--search needs a SQLite database file (it uses an FTS5 index)")
+    conn = connect(args.db)
+    try:
+        if sqlite_file:
+            if not has_group_summary(conn):
+                rebuild_group_summary(conn)
+            ensure_query_indexes(conn)
+        path_match = None
+        if args.search:
+            if not has_path_index(conn):
+                build_path_index(conn)
+            path_match = match_expression(conn, args.search)
+        group_filter = GroupFilter(
+            min_members=args.min_members,
+            max_members=args.max_members,
+            directory_prefix=args.directory,
+            filename_pattern=args.filename,
+            min_percentage=args.min_percentage,
+            max_percentage=args.max_percentage,
+            path_match=path_match,
+            only_with_original=not args.all,
+            sort=args.sort,
+        )
+        rows = group_filter.fetch_page(conn, args.limit, offset=args.offset)
+        for group_id, _ in rows:
+            if not args.files:
+                print(group_id)
+                continue
+            for filepath, duplicate_flag in conn.execute(
+                'SELECT filepath, duplicate_flag FROM all_groups WHERE group_id = ? ORDER BY file_id',
+                (group_id,)
+            ).fetchall():
+                print(f"{group_id}\t{'duplicate' if duplicate_flag else 'original'}\t{filepath}")
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_export(args) -> int:
+    from .exporter import export_table
+    from .repository import connect
+
+    conn = connect(args.db)
+    try:
+        export_table(conn, args.table, args.output, fmt=args.format, batch_size=args.batch_size)
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_apply_policy(args) -> int:
+    from .originals import OriginalPolicy, apply_original_policy
+    from .repository import is_sqlite_file
+
+    if not is_sqlite_file(args.db):
+        raise ValueError("Original selection needs a SQLite database file")
+    conn = sqlite3.connect(args.db)
+    try:
+        # After `cluster`, every subcluster keeps its own original
+        clustered = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'file_clusters'"
+        ).fetchone() is not None
+        apply_original_policy(conn, _original_policy(args) or OriginalPolicy(),
+                              partition='cluster' if clustered else 'group')
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_cluster(args) -> int:
+    from .clustering import cluster_matches
+    from .group_summary import has_group_summary, rebuild_group_summary
+    from .repository import is_sqlite_file
+
+    if not is_sqlite_file(args.db):
+        raise ValueError("Clustering needs a SQLite database file")
+    conn = sqlite3.connect(args.db)
+    try:
+        clusters = cluster_matches(conn, threshold=args.threshold, policy=_original_policy(args))
+        if not has_group_summary(conn):
+            rebuild_group_summary(conn)  # cluster_matches only refreshes an existing one
+        print(f"clusters:   {clusters}")
+    finally:
+        conn.close()
+    return 0
+
+
+def _cmd_resolve(args) -> int:
+    from .resolver import DuplicateResolver
+
+    resolver = DuplicateResolver(args.db, action=args.action, quarantine_dir=args.quarantine,
+                                 dry_run=args.dry_run, workers=args.workers, hash_cache_path=args.hash_cache)
+    try:
+        if args.undo:
+            resolver.undo()
+        else:
+            if args.discard_pending:
+                resolver.discard_pending()
+            resolver.plan()
+            stats = resolver.run(retry_failed=args.retry_failed)
+            return 1 if stats['failed'] else 0
+    finally:
+        resolver.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='xml-analyzer', description="Duplicate report analyzer (headless)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="debug logging")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help="load a duplicate report XML into a database")
+    ingest.add_argument('xml')
+    ingest.add_argument('--db', default='xml_data.db',
+                        help="SQLite file, database URL (postgresql://user@host/db) or store directory")
+    ingest.add_argument('--verify-content', action='store_true',
+                        help="confirm originals by comparing file content")
+    ingest.add_argument('--hash-cache', default='hash_cache.db')
+    ingest.add_argument('--original-rules',
+                        help="comma separated OriginalPolicy rules, e.g. preferred_prefix,oldest_mtime")
+    ingest.add_argument('--preferred-prefix', action='append', default=[],
+                        help="directory whose files are kept as originals (repeatable)")
+    ingest.add_argument('--search-index', action='store_true', help="build the path search index")
+    ingest.add_argument('--storage', choices=('sqlite', 'parquet'), default='sqlite',
+                        help="parquet writes a columnar store directory at --db (needs pyarrow)")
+    ingest.add_argument('--stats-json', help="write stage timings and throughput to this file")
+    ingest.add_argument('--profile', action='store_true',
+                        help="write cProfile/tracemalloc results next to the database")
+    ingest.add_argument('--profile-output', help="profile file prefix (default: the database path)")
+    ingest.add_argument('--no-memory-profile', action='store_true', help="skip tracemalloc (much faster)")
+    ingest.set_defaults(func=_cmd_ingest)
+
+    batch = commands.add_parser('ingest-batch', help="load several reports in parallel")
+    batch.add_argument('xml', nargs='+')
+    batch.add_argument('--db', help="load everything into this shared database "
+                                    "(default: one database per report)")
+    batch.add_argument('--output-dir', help="directory for per-report databases (default: next to each report)")
+    batch.add_argument('--workers', type=int, help="parallel loads (default: CPU count)")
+    batch.add_argument('--verify-content', action='store_true',
+                       help="confirm originals by comparing file content")
+    batch.add_argument('--hash-cache', default='hash_cache.db')
+    batch.add_argument('--original-rules',
+                       help="comma separated OriginalPolicy rules, e.g. preferred_prefix,oldest_mtime")
+    batch.add_argument('--preferred-prefix', action='append', default=[],
+                       help="directory whose files are kept as originals (repeatable)")
+    batch.add_argument('--search-index', action='store_true', help="build the path search index")
+    batch.add_argument('--stats-json', help="write per-job and aggregate throughput to this file")
+    batch.set_defaults(func=_cmd_ingest_batch)
+
+    stats = commands.add_parser('stats', help="summarise a database")
+    stats.add_argument('--db', default='xml_data.db')
+    stats.add_argument('--space', action='store_true', help="stat files and report reclaimable space")
+    stats.add_argument('--top', type=int, default=10, help="directories listed with --space")
+    stats.add_argument('--workers', type=int)
+    stats.set_defaults(func=_cmd_stats)
+
+    list_groups = commands.add_parser('list-groups', help="list groups matching a filter")
+    list_groups.add_argument('--db', default='xml_data.db')
+    list_groups.add_argument('--min-members', type=int)
+    list_groups.add_argument('--max-members', type=int)
+    list_groups.add_argument('--min-percentage', type=float)
+    list_groups.add_argument('--max-percentage', type=float)
+    list_groups.add_argument('--directory', help="only groups with a file under this path prefix")
+    list_groups.add_argument('--filename', help="only groups with a file name matching this glob")
+    list_groups.add_argument('--search', help="only groups with a path containing this text")
+    list_groups.add_argument('--all', action='store_true', help="include groups without an original")
+    list_groups.add_argument('--sort', default='group_id', choices=['group_id', 'size_desc', 'size_asc',
+                                                                    'percentage_asc'])
+    list_groups.add_argument('--limit', type=int, default=100)
+    list_groups.add_argument('--offset', type=int, default=0)
+    list_groups.add_argument('--files', action='store_true', help="print the files of each group")
+    list_groups.set_defaults(func=_cmd_list_groups)
+
+    export = commands.add_parser('export', help="stream a table to CSV, JSON lines or Parquet")
+    export.add_argument('--db', default='xml_data.db')
+    export.add_argument('--table', default='all_groups', help="e.g. all_groups, matches, group_summary")
+    export.add_argument('--output', '-o', default='-', help="output file (default: stdout)")
+    export.add_argument('--format', choices=['csv', 'jsonl', 'parquet'],
+                        help="default: from the output extension, else csv")
+    export.add_argument('--batch-size', type=int, default=50000)
+    export.set_defaults(func=_cmd_export)
+
+    apply_policy = commands.add_parser('apply-policy', help="re-decide originals in a loaded database")
+    apply_policy.add_argument('--db', default='xml_data.db')
+    apply_policy.add_argument('--original-rules',
+                              help="comma separated OriginalPolicy rules "
+                                   "(default: preferred_prefix,oldest_mtime,shortest_path)")
+    apply_policy.add_argument('--preferred-prefix', action='append', default=[],
+                              help="directory whose files are kept as originals (repeatable)")
+    apply_policy.set_defaults(func=_cmd_apply_policy)
+
+    cluster = commands.add_parser('cluster', help="split partial-match groups into exact-duplicate subclusters")
+    cluster.add_argument('--db', default='xml_data.db')
+    cluster.add_argument('--threshold', type=float, default=100.0,
+                         help="lowest match percentage joining two files (default: 100)")
+    cluster.add_argument('--original-rules',
+                         help="comma separated OriginalPolicy rules (default: first listed file)")
+    cluster.add_argument('--preferred-prefix', action='append', default=[],
+                         help="directory whose files are kept as originals (repeatable)")
+    cluster.set_defaults(func=_cmd_cluster)
+
+    resolve = commands.add_parser('resolve', help="delete, move or link flagged duplicates")
+    resolve.add_argument('--db', default='xml_data.db')
+    resolve.add_argument('--action', default='move', choices=['delete', 'move', 'hardlink', 'reflink'])
+    resolve.add_argument('--quarantine', help="target directory for --action move")
+    resolve.add_argument('--dry-run', action='store_true')
+    resolve.add_argument('--retry-failed', action='store_true')
+    resolve.add_argument('--discard-pending', action='store_true',
+                         help="drop unresolved entries planned earlier (e.g. with another action)")
+    resolve.add_argument('--hash-cache', default='hash_cache.db',
+                         help="content hashes checked before deleting or linking")
+    resolve.add_argument('--undo', action='store_true', help="reverse completed moves and links")
+    resolve.add_argument('--workers', type=int)
+    resolve.set_defaults(func=_cmd_resolve)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logger.error(str(e))
+        return 1
+    except Exception as e:
+        # Columnar stores raise duckdb.Error; duckdb is only imported for them
+        duckdb = sys.modules.get('duckdb')
+        if duckdb is None or not isinstance(e, duckdb.Error):
+            raise
+        logger.error(str(e))
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import logging
+import sqlite3
+from array import array
+
+from .group_summary import has_group_summary, rebuild_group_summary
+from .originals import OriginalPolicy, apply_original_policy
+
+logger = logging.getLogger(__name__)
+
+
+class UnionFind:
+    """Disjoint sets over dense integer ids stored in flat arrays.
+
+    Uses 8 bytes (parent) + 1 byte (rank) per node instead of Python
+    objects, so hundreds of millions of nodes fit in memory.
+    """
+
+    def __init__(self, size: int):
+        self.parent = array('q', range(size))
+        self.rank = array('b', bytes(size))
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:  # Path compression
+            parent[node], node = root, parent[node]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.rank[root_a] < self.rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        if self.rank[root_a] == self.rank[root_b]:
+            self.rank[root_a] += 1
+
+
+def cluster_matches(conn: sqlite3.Connection, threshold: float = 100.0,
+                    policy: OriginalPolicy = None, batch_size: int = 100000) -> int:
+    """Split groups into subclusters of files matching at >= threshold percent
+
+    Runs union-find over the matches edges at or above threshold, keyed by
+    all_groups row id, and stores each file's cluster (a representative row
+    id) in the file_clusters table. Duplicate flags are then rebuilt so
+    that every cluster has exactly one original, chosen by policy (default:
+    the first listed file, which needs no file metadata); files that match
+    nothing form singleton clusters and are therefore never flagged as
+    duplicates. Returns the number of clusters with more than one file.
+    """
+    max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM all_groups').fetchone()[0]
+    sets = UnionFind(max_id + 1)
+
+    # Resolve match endpoints (file indexes within a group) to row ids
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_all_groups_group_file ON all_groups (group_id, file_id)')
+    cursor = conn.execute('''
+    SELECT a.id, b.id
+    FROM matches m
+    JOIN all_groups a ON a.group_id = m.group_id AND a.file_id = m.first
+    JOIN all_groups b ON b.group_id = m.group_id AND b.file_id = m.second
+    WHERE m.percentage >= ?
+    ''', (threshold,))
+    edges = 0
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        for a, b in batch:
+            sets.union(a, b)
+        edges += len(batch)
+
+    conn.execute('DROP TABLE IF EXISTS file_clusters')
+    conn.execute('''
+    CREATE TABLE file_clusters (
+        id INTEGER PRIMARY KEY,
+        cluster_id INTEGER
+    )''')
+    cursor = conn.execute('SELECT id FROM all_groups ORDER BY id')
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        conn.executemany(
+            'INSERT INTO file_clusters (id, cluster_id) VALUES (?, ?)',
+            [(row_id, sets.find(row_id)) for row_id, in batch]
+        )
+    del sets
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_file_clusters_cluster ON file_clusters (cluster_id)')
+
+    # Every cluster gets an original: reset flags, then rank within clusters
+    conn.execute('UPDATE all_groups SET duplicate_flag = 1')
+    conn.execute('''
+    UPDATE all_groups SET duplicate_flag = 0
+    WHERE id IN (SELECT cluster_id FROM file_clusters)
+    ''')
+    apply_original_policy(conn, policy or OriginalPolicy(rules=()), partition='cluster',
+                          refresh_summary=False)
+
+    clusters = conn.execute('''
+    SELECT COUNT(*) FROM (
+        SELECT cluster_id FROM file_clusters GROUP BY cluster_id HAVING COUNT(*) > 1
+    )''').fetchone()[0]
+    conn.commit()
+    if has_group_summary(conn):
+        rebuild_group_summary(conn)  # Original counts changed
+    logger.info(f"Clustered {edges} match edges >= {threshold}% into {clusters} duplicate clusters")
+    return clusters
@@ -0,0 +1,189 @@
+import glob
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+# Column names and Arrow types of each table, in SQLite column order
+TABLES = {
+    'all_groups': (('id', 'int64'), ('group_id', 'int64'), ('file_id', 'int32'),
+                   ('filepath', 'string'), ('filename', 'string'), ('duplicate_flag', 'bool_')),
+    'matches': (('id', 'int64'), ('group_id', 'int64'), ('first', 'int32'),
+                ('second', 'int32'), ('percentage', 'float64')),
+    'group_summary': (('group_id', 'int64'), ('member_count', 'int32'), ('original_count', 'int32'),
+                      ('match_count', 'int32'), ('min_percentage', 'float64'),
+                      ('max_percentage', 'float64')),
+}
+# Side tables written by readers (analytics), kept as Parquet partitions in
+# the store like the ingested tables; each insert_rows() batch adds one
+SIDE_TABLES = ('file_meta',)
+PARTITION_ROWS = 1_000_000
+
+# Root directory -> in-memory DuckDB connection; each open_store() call gets a cursor of it
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def is_columnar_store(path: str) -> bool:
+    """True if path is a directory written by ColumnarWriter"""
+    return os.path.isdir(os.path.join(path, 'all_groups'))
+
+
+def _partitions(root: str, table: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(root, table, 'part-*.parquet')))
+
+
+class ColumnarWriter:
+    """Writes all_groups, matches and group_summary as Parquet partitions.
+
+    Rows arrive in the same dicts XMLFlattener inserts into SQLite and are
+    buffered per table as columns; every ``partition_rows`` rows become one
+    zstd-compressed file, <root>/<table>/part-NNNNN.parquet. Groups are
+    loaded in order, so each partition covers a contiguous group_id range
+    and readers skip partitions by their min/max statistics. Partitions
+    are written under a temporary name and renamed when complete. Opening
+    a writer replaces any partitions already in the store. commit(),
+    rollback() and close() behave like a SQLite connection's, so the
+    writer can take the place of one in XMLFlattener.
+    """
+
+    def __init__(self, root: str, partition_rows: int = PARTITION_ROWS, row_group_rows: int = 128 * 1024):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Columnar storage needs pyarrow (pip install pyarrow)")
+        self._pa, self._pq = pa, pq
+        self.root = root
+        self.partition_rows = partition_rows
+        self.row_group_rows = row_group_rows
+        self.schemas = {
+            table: pa.schema([(name, getattr(pa, type_name)()) for name, type_name in columns])
+            for table, columns in TABLES.items()
+        }
+        self._buffers = {table: {name: [] for name, _ in columns} for table, columns in TABLES.items()}
+        self._written = {table: 0 for table in TABLES}  # Partitions written so far
+        self._next_id = {table: 1 for table in TABLES}
+        for table in (*TABLES, *SIDE_TABLES):
+            os.makedirs(os.path.join(root, table), exist_ok=True)
+            for path in _partitions(root, table):
+                os.remove(path)
+
+    def append(self, table: str, records: List[Dict]) -> None:
+        """Buffer record dicts (SQLite's autoincrement id is assigned here)"""
+        columns = self._buffers[table]
+        if 'id' in columns:
+            start = self._next_id[table]
+            columns['id'].extend(range(start, start + len(records)))
+            self._next_id[table] = start + len(records)
+        for name, values in columns.items():
+            if name != 'id':
+                values.extend(record[name] for record in records)
+        if len(next(iter(columns.values()))) >= self.partition_rows:
+            self._write_partition(table)
+
+    def commit(self) -> None:
+        """Write what is still buffered; every table gets at least one (maybe empty) partition"""
+        for table, columns in self._buffers.items():
+            if columns[next(iter(columns))] or not self._written[table]:
+                self._write_partition(table)
+
+    def rollback(self) -> None:
+        """Drop rows not yet written (written partitions stay)"""
+        for columns in self._buffers.values():
+            for values in columns.values():
+                values.clear()
+
+    def close(self) -> None:
+        """Like a SQLite connection, uncommitted rows are discarded"""
+        self.rollback()
+
+    def _write_partition(self, table: str) -> None:
+        schema = self.schemas[table]
+        columns = self._buffers[table]
+        batch = self._pa.table([self._pa.array(columns[field.name], type=field.type) for field in schema],
+                               schema=schema)
+        path = os.path.join(self.root, table, f"part-{self._written[table]:05d}.parquet")
+        self._pq.write_table(batch, path + '.tmp', compression='zstd', row_group_size=self.row_group_rows)
+        os.replace(path + '.tmp', path)
+        self._written[table] += 1
+        for values in columns.values():
+            values.clear()
+
+
+def open_store(root: str):
+    """DuckDB connection on a columnar store, with each table as a view over its partitions
+
+    The connection answers the same SQL as the SQLite database (the viewer's
+    group queries, analytics, export), while scans only read the columns a
+    query needs. The DuckDB database lives in memory and only reads files
+    of the store, so any number of processes can have a store open. The
+    store is opened once per process; every call returns a new cursor on
+    it, so each thread can use its own.
+    """
+    try:
+        import duckdb
+    except ImportError:
+        raise ValueError("Reading a columnar store needs duckdb (pip install duckdb)")
+    root = os.path.abspath(root)
+    missing = [table for table in TABLES if not _partitions(root, table)]
+    if missing:
+        # A load that failed before its first commit leaves no partitions
+        raise ValueError(f"Incomplete columnar store {root} (no {', '.join(missing)} partitions)")
+    with _stores_lock:
+        database = _stores.get(root)
+        if database is None:
+            database = duckdb.connect()
+            for table in TABLES:
+                pattern = os.path.join(root, table, 'part-*.parquet').replace("'", "''")
+                database.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{pattern}')")
+            database.execute('CREATE TABLE store_root AS SELECT ? AS root', [root])
+            _load_side_tables(database, root)
+            _stores[root] = database
+    return database.cursor()
+
+
+def _load_side_tables(database, root: str) -> None:
+    from .file_meta import create_file_meta_table
+
+    create_file_meta_table(database)
+    # Later partitions hold newer rows for the same path
+    for path in _partitions(root, 'file_meta'):
+        database.execute(f"INSERT OR REPLACE INTO file_meta SELECT filepath, size, mtime, width, height "
+                         f"FROM read_parquet('{path.replace(chr(39), chr(39) * 2)}')")
+
+
+def _save_partition(conn, table: str, rows) -> None:
+    """Write an Arrow table of new side table rows as one more partition of the store"""
+    import pyarrow.parquet as pq
+
+    root = conn.execute('SELECT root FROM store_root').fetchone()[0]
+    os.makedirs(os.path.join(root, table), exist_ok=True)
+    # Named by time and process, so concurrent readers never collide and load in write order
+    path = os.path.join(root, table, f"part-{time.time_ns():020d}-{os.getpid()}.parquet")
+    pq.write_table(rows, path + '.tmp', compression='zstd')
+    os.replace(path + '.tmp', path)
+
+
+def insert_rows(conn, table: str, columns: Sequence[str], rows: List[Tuple], replace: bool = False) -> None:
+    """executemany INSERT (OR REPLACE) on a SQLite or columnar store connection
+
+    DuckDB runs executemany one row at a time, so there the rows go in as
+    one Arrow table instead, which is also saved to the store for side
+    tables (the store's DuckDB database is in memory).
+    """
+    verb = 'INSERT OR REPLACE' if replace else 'INSERT'
+    if isinstance(conn, sqlite3.Connection):
+        conn.executemany(f'{verb} INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                         rows)
+        return
+    import pyarrow as pa
+    batch = pa.table(dict(zip(columns, map(list, zip(*rows)))))
+    conn.register('_insert_rows', batch)
+    try:
+        conn.execute(f'{verb} INTO {table} ({", ".join(columns)}) SELECT * FROM _insert_rows')
+    finally:
+        conn.unregister('_insert_rows')
+    if table in SIDE_TABLES:
+        _save_partition(conn, table, batch)
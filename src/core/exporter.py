@@ -0,0 +1,116 @@
+import csv
+import json
+import logging
+import sqlite3
+import sys
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+def infer_format(output: str) -> str:
+    """Pick the export format from the output file extension (csv by default)"""
+    for fmt in FORMATS:
+        if output.lower().endswith('.' + fmt):
+            return fmt
+    return 'csv'
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[Tuple[str, str]]:
+    if hasattr(conn, 'table_columns'):
+        return conn.table_columns(table)  # Repository
+    rows = conn.execute('SELECT * FROM pragma_table_info(?)', (table,)).fetchall()
+    columns = [(row[1], row[2]) for row in rows]
+    if not columns:
+        raise ValueError(f"No such table: {table}")
+    return columns
+
+
+def _batches(cursor: sqlite3.Cursor, batch_size: int) -> Iterator[List[Tuple]]:
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+def export_table(conn: sqlite3.Connection, table: str, output: str, fmt: Optional[str] = None,
+                 batch_size: int = 50000) -> int:
+    """Stream a table to CSV, JSON lines or Parquet; returns the number of rows
+
+    Rows are read with fetchmany and written batch by batch (Parquet as
+    one Arrow record batch per fetch), so memory stays constant however
+    large the table is. output '-' writes CSV/JSONL to stdout.
+    """
+    fmt = fmt or infer_format(output)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    columns = _table_columns(conn, table)
+    cursor = conn.execute(f'SELECT {", ".join(name for name, _ in columns)} FROM "{table}"')
+    batches = _batches(cursor, batch_size)
+
+    if fmt == 'parquet':
+        rows = _write_parquet(batches, columns, output)
+    else:
+        out = sys.stdout if output == '-' else open(output, 'w', newline='', encoding='utf-8')
+        try:
+            write = _write_csv if fmt == 'csv' else _write_jsonl
+            rows = write(batches, [name for name, _ in columns], out)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    logger.info(f"Exported {rows} rows of {table} to {output} ({fmt})")
+    return rows
+
+
+def _write_csv(batches: Iterator[List[Tuple]], names: Sequence[str], out) -> int:
+    writer = csv.writer(out)
+    writer.writerow(names)
+    rows = 0
+    for batch in batches:
+        writer.writerows(batch)
+        rows += len(batch)
+    return rows
+
+
+def _write_jsonl(batches: Iterator[List[Tuple]], names: Sequence[str], out) -> int:
+    rows = 0
+    for batch in batches:
+        out.write(''.join(json.dumps(dict(zip(names, row)), ensure_ascii=False) + '\n' for row in batch))
+        rows += len(batch)
+    return rows
+
+
+def _arrow_type(declared: str):
+    import pyarrow as pa
+    declared = declared.upper()
+    if 'BOOL' in declared:
+        return pa.bool_()
+    if 'INT' in declared:
+        return pa.int64()
+    if any(t in declared for t in ('REAL', 'FLOA', 'DOUB')):
+        return pa.float64()
+    return pa.string()
+
+
+def _write_parquet(batches: Iterator[List[Tuple]], columns: Sequence[Tuple[str, str]], output: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    schema = pa.schema([(name, _arrow_type(declared)) for name, declared in columns])
+    rows = 0
+    with pq.ParquetWriter(output, schema) as writer:
+        for batch in batches:
+            arrays = []
+            for field, values in zip(schema, zip(*batch)):
+                if pa.types.is_boolean(field.type):
+                    values = [None if v is None else bool(v) for v in values]
+                arrays.append(pa.array(values, type=field.type))
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            rows += len(batch)
+    return rows
@@ -0,0 +1,90 @@
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from .columnar_store import insert_rows
+
+logger = logging.getLogger(__name__)
+
+
+def create_file_meta_table(conn: sqlite3.Connection) -> None:
+    """Create the per-path metadata table used by policies and reports"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS file_meta (
+        filepath TEXT PRIMARY KEY,
+        size INTEGER,
+        mtime REAL,
+        width INTEGER,
+        height INTEGER
+    )''')
+
+
+def _stat_file(filepath: str) -> Tuple[Optional[int], Optional[float]]:
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None, None
+    return st.st_size, st.st_mtime
+
+
+def _image_size(filepath: str) -> Tuple[Optional[int], Optional[int]]:
+    # Only the header is read; PIL is imported lazily to keep headless runs light
+    from PIL import Image
+    try:
+        with Image.open(filepath) as image:
+            return image.size
+    except Exception:
+        return None, None
+
+
+def collect_file_meta(conn: sqlite3.Connection, with_resolution: bool = False,
+                      workers: Optional[int] = None, batch_size: int = 10000) -> int:
+    """Stat every path in all_groups not yet in file_meta, in parallel
+
+    Paths already present are skipped, so the table acts as a cache across
+    calls. With with_resolution, image dimensions are also read (header
+    only) for paths that do not have them yet. Returns the number of paths
+    processed.
+    """
+    create_file_meta_table(conn)
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+
+    missing = 'fm.filepath IS NULL OR fm.width IS NULL' if with_resolution else 'fm.filepath IS NULL'
+    # Stage the work list in a temp table so reading it never overlaps our writes
+    conn.execute('DROP TABLE IF EXISTS temp.meta_todo')
+    conn.execute(f'''
+    CREATE TEMP TABLE meta_todo AS
+    SELECT DISTINCT g.filepath FROM all_groups g
+    LEFT JOIN file_meta fm ON fm.filepath = g.filepath
+    WHERE {missing}
+    ''')
+    total = conn.execute('SELECT COUNT(*) FROM meta_todo').fetchone()[0]
+
+    def describe(filepath):
+        size, mtime = _stat_file(filepath)
+        width = height = None
+        if with_resolution and size is not None:
+            width, height = _image_size(filepath)
+        return filepath, size, mtime, width, height
+
+    processed = 0
+    last_rowid = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            batch = conn.execute(
+                'SELECT rowid, filepath FROM meta_todo WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                (last_rowid, batch_size)
+            ).fetchall()
+            if not batch:
+                break
+            last_rowid = batch[-1][0]
+            rows = list(executor.map(describe, [filepath for _, filepath in batch]))
+            insert_rows(conn, 'file_meta', ('filepath', 'size', 'mtime', 'width', 'height'), rows, replace=True)
+            conn.commit()
+            processed += len(rows)
+            logger.info(f"Collected metadata for {processed}/{total} files")
+
+    conn.execute('DROP TABLE temp.meta_todo')
+    return processed
@@ -0,0 +1,163 @@
+import re
+import sqlite3
+from typing import List, Optional, Sequence, Tuple
+
+from .path_search import PATH_MATCH_SUBQUERY
+
+
+def ensure_query_indexes(conn: sqlite3.Connection) -> None:
+    """Create the indexes GroupFilter queries rely on (no-op when present)"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_all_groups_filepath ON all_groups (filepath, group_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_all_groups_filename ON all_groups (filename, group_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_group_summary_percentage ON group_summary (min_percentage)')
+    # One index per sort order, matching GroupFilter.SORTS expression for expression
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_group_summary_size_asc ON group_summary (member_count, group_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_group_summary_size_desc ON group_summary (-member_count, group_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_group_summary_pct_sort '
+                 'ON group_summary (COALESCE(min_percentage, -1), group_id)')
+    conn.commit()
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _glob_regex(pattern: str) -> str:
+    """Anchored regular expression matching what SQLite's GLOB matches"""
+    parts = []
+    for token in re.findall(r'\[[^\]]+\]|.', pattern, re.S):
+        if token == '*':
+            parts.append('.*')
+        elif token == '?':
+            parts.append('.')
+        elif len(token) > 1:
+            parts.append(token)  # Character class, same syntax ([^...] negates)
+        else:
+            parts.append(re.escape(token))
+    return '^' + ''.join(parts) + '$'
+
+
+def _dialect(conn) -> str:
+    # Repositories name their SQL dialect; sqlite3 and DuckDB connections share SQLite's
+    return getattr(conn, 'dialect_name', 'sqlite')
+
+
+class GroupFilter:
+    """Filter and sort order for listing groups from group_summary.
+
+    Every criterion maps onto an indexed lookup: member count and
+    percentage on group_summary, directory prefix as a range scan over the
+    filepath index, filename pattern as a GLOB over the filename index,
+    and path_match (an FTS5 expression from path_search.match_expression)
+    through the path_fts full-text index.
+    Sort keys are plain ascending expressions so pages can be fetched by
+    keyset ("after this key") as well as by offset. On PostgreSQL the
+    filename pattern becomes a regular expression, the prefix range is
+    compared in the C collation (code point order, like SQLite), and
+    path_match is not available.
+    """
+
+    SORTS = {
+        'group_id': ('gs.group_id',),
+        'size_desc': ('-gs.member_count', 'gs.group_id'),
+        'size_asc': ('gs.member_count', 'gs.group_id'),
+        'percentage_asc': ('COALESCE(gs.min_percentage, -1)', 'gs.group_id'),
+    }
+
+    def __init__(self, min_members: Optional[int] = None, max_members: Optional[int] = None,
+                 directory_prefix: Optional[str] = None, filename_pattern: Optional[str] = None,
+                 min_percentage: Optional[float] = None, max_percentage: Optional[float] = None,
+                 path_match: Optional[str] = None, only_with_original: bool = True,
+                 sort: str = 'group_id'):
+        if sort not in self.SORTS:
+            raise ValueError(f"Unknown sort order: {sort}")
+        self.min_members = min_members
+        self.max_members = max_members
+        self.directory_prefix = directory_prefix or None
+        self.filename_pattern = filename_pattern or None
+        self.min_percentage = min_percentage
+        self.max_percentage = max_percentage
+        self.path_match = path_match or None
+        self.only_with_original = only_with_original
+        self.sort = sort
+
+    @property
+    def sort_keys(self) -> Sequence[str]:
+        return self.SORTS[self.sort]
+
+    def where_clause(self, dialect: str = 'sqlite') -> Tuple[str, List]:
+        postgres = dialect == 'postgresql'
+        conditions, params = [], []
+        if self.only_with_original:
+            conditions.append('gs.original_count > 0')
+        if self.min_members is not None:
+            conditions.append('gs.member_count >= ?')
+            params.append(self.min_members)
+        if self.max_members is not None:
+            conditions.append('gs.member_count <= ?')
+            params.append(self.max_members)
+        if self.min_percentage is not None:
+            conditions.append('gs.min_percentage >= ?')
+            params.append(self.min_percentage)
+        if self.max_percentage is not None:
+            conditions.append('gs.min_percentage <= ?')
+            params.append(self.max_percentage)
+        if self.directory_prefix:
+            filepath = 'filepath COLLATE "C"' if postgres else 'filepath'
+            conditions.append(f'gs.group_id IN (SELECT group_id FROM all_groups '
+                              f'WHERE {filepath} >= ? AND {filepath} < ?)')
+            params.extend([self.directory_prefix, _prefix_upper_bound(self.directory_prefix)])
+        if self.filename_pattern:
+            if postgres:
+                conditions.append('gs.group_id IN (SELECT group_id FROM all_groups WHERE filename ~ ?)')
+                params.append(_glob_regex(self.filename_pattern))
+            else:
+                conditions.append('gs.group_id IN (SELECT group_id FROM all_groups WHERE filename GLOB ?)')
+                params.append(self.filename_pattern)
+        if self.path_match:
+            if postgres:
+                raise ValueError("Path search needs a SQLite database")
+            conditions.append(f'gs.group_id IN ({PATH_MATCH_SUBQUERY})')
+            params.append(self.path_match)
+        return (' AND '.join(conditions) or '1 = 1'), params
+
+    def count(self, conn: sqlite3.Connection) -> int:
+        where, params = self.where_clause(_dialect(conn))
+        return conn.execute(f'SELECT COUNT(*) FROM group_summary gs WHERE {where}', params).fetchone()[0]
+
+    def fetch_page(self, conn: sqlite3.Connection, limit: int, offset: int = 0,
+                   after: Optional[Tuple] = None) -> List[Tuple[int, Tuple]]:
+        """Return up to limit (group_id, sort_key) rows
+
+        Pass the sort_key of the last row of the previous page as after to
+        continue without OFFSET; otherwise offset rows are skipped.
+        """
+        where, params = self.where_clause(_dialect(conn))
+        keys = ', '.join(self.sort_keys)
+        if after is not None:
+            where += f' AND ({keys}) > ({", ".join("?" * len(after))})'
+            params.extend(after)
+            offset = 0
+        rows = conn.execute(f'''
+        SELECT gs.group_id, {keys} FROM group_summary gs
+        WHERE {where}
+        ORDER BY {keys}
+        LIMIT ? OFFSET ?
+        ''', params + [limit, offset]).fetchall()
+        return [(row[0], tuple(row[1:])) for row in rows]
+
+    def position(self, conn: sqlite3.Connection, group_id: int) -> Optional[int]:
+        """Return the index of group_id in this listing, or None if filtered out"""
+        where, params = self.where_clause(_dialect(conn))
+        keys = ', '.join(self.sort_keys)
+        row = conn.execute(
+            f'SELECT {keys} FROM group_summary gs WHERE {where} AND gs.group_id = ?',
+            params + [group_id]
+        ).fetchone()
+        if row is None:
+            return None
+        return conn.execute(
+            f'SELECT COUNT(*) FROM group_summary gs WHERE {where} AND ({keys}) < ({", ".join("?" * len(row))})',
+            params + list(row)
+        ).fetchone()[0]
@@ -0,0 +1,128 @@
+import io
+import mmap
+import os
+from typing import Iterator, List, Optional, Tuple
+
+GROUP_START = b'<group>'
+GROUP_END = b'</group>'
+# Window bytes.count() runs over; the only part of the file copied to the heap
+WINDOW_BYTES = 4 * 1024 * 1024
+
+
+class GroupScanner:
+    """Finds <group> elements in a plain XML report through a memory map.
+
+    The file is mapped read-only, so scanning it only touches the page
+    cache: offsets() and split() search the map in place, and count()
+    copies at most one WINDOW_BYTES window at a time. split() cuts the
+    report into byte ranges on group boundaries, and open_range() turns a
+    range back into a well-formed document (the report's own prolog and
+    closing tag around the groups), so parallel workers can each iterparse
+    their share of one report. Use as a context manager, or call close().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._file = open(path, 'rb')
+        # An empty file cannot be mapped; it simply has no groups
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        if self._map is not None and hasattr(self._map, 'madvise'):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+    def __enter__(self) -> 'GroupScanner':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _bounds(self, start: int, end: Optional[int]) -> Tuple[int, int]:
+        return start, self.size if end is None else min(end, self.size)
+
+    def count(self, start: int = 0, end: Optional[int] = None) -> int:
+        """Number of groups starting in [start, end)"""
+        start, end = self._bounds(start, end)
+        if self._map is None:
+            return 0
+        total = 0
+        overlap = len(GROUP_START) - 1  # So tags across a window edge are counted once
+        for pos in range(start, end, WINDOW_BYTES):
+            total += self._map[pos:min(end, pos + WINDOW_BYTES + overlap)].count(GROUP_START)
+        return total
+
+    def offsets(self, start: int = 0, end: Optional[int] = None) -> Iterator[int]:
+        """Yield the byte offset of every <group> starting in [start, end)"""
+        start, end = self._bounds(start, end)
+        if self._map is None:
+            return
+        find = self._map.find
+        pos = find(GROUP_START, start, end)
+        while pos != -1:
+            yield pos
+            pos = find(GROUP_START, pos + len(GROUP_START), end)
+
+    def group_span(self) -> Tuple[int, int]:
+        """(start of the first group, end of the last one); (0, 0) without groups"""
+        if self._map is None:
+            return 0, 0
+        first = self._map.find(GROUP_START)
+        last = self._map.rfind(GROUP_END)
+        if first == -1 or last == -1:
+            return 0, 0
+        return first, last + len(GROUP_END)
+
+    def split(self, parts: int) -> List[Tuple[int, int]]:
+        """Cut the groups into up to `parts` byte ranges of similar size
+
+        Every range starts at a <group> tag, so each holds whole groups and
+        together they cover all of them. Fewer ranges come back when the
+        report has fewer groups than parts.
+        """
+        first, last = self.group_span()
+        if first == last:
+            return []
+        boundaries = [first]
+        for i in range(1, parts):
+            target = first + (last - first) * i // parts
+            pos = self._map.find(GROUP_START, max(target, boundaries[-1] + 1), last)
+            if pos == -1:
+                break
+            boundaries.append(pos)
+        boundaries.append(last)
+        return list(zip(boundaries, boundaries[1:]))
+
+    def open_range(self, start: int, end: int) -> io.BufferedReader:
+        """Readable stream of the groups in [start, end) as a complete document"""
+        first, last = self.group_span()
+        prolog = self._map[:first]  # XML declaration and the root's start tag
+        epilog = self._map[last:]   # The root's end tag
+        return io.BufferedReader(_RangeReader(self._map, prolog, start, end, epilog))
+
+
+class _RangeReader(io.RawIOBase):
+    """prolog + map[start:end] + epilog, copying straight from the map"""
+
+    def __init__(self, source: mmap.mmap, prolog: bytes, start: int, end: int, epilog: bytes):
+        super().__init__()
+        self._segments = [(prolog, 0, len(prolog)), (source, start, end), (epilog, 0, len(epilog))]
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._segments:
+            data, pos, end = self._segments[0]
+            if pos < end:
+                size = min(len(buffer), end - pos)
+                with memoryview(data) as view:
+                    buffer[:size] = view[pos:pos + size]
+                self._segments[0] = (data, pos + size, end)
+                return size
+            self._segments.pop(0)
+        return 0
@@ -0,0 +1,74 @@
+import logging
+import sqlite3
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def create_group_summary_table(conn: sqlite3.Connection) -> None:
+    """Create the one-row-per-group table the viewer lists and filters on"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS group_summary (
+        group_id INTEGER PRIMARY KEY,
+        member_count INTEGER,
+        original_count INTEGER,
+        match_count INTEGER,
+        min_percentage REAL,
+        max_percentage REAL
+    )''')
+
+
+def summarize_group(group_id: int, group_records: List[Dict], match_records: List[Dict]) -> Dict:
+    """Build the summary row of one group from its ingested records"""
+    percentages = [m['percentage'] for m in match_records]
+    return {
+        'group_id': group_id,
+        'member_count': len(group_records),
+        'original_count': sum(1 for r in group_records if not r['duplicate_flag']),
+        'match_count': len(match_records),
+        'min_percentage': min(percentages) if percentages else None,
+        'max_percentage': max(percentages) if percentages else None,
+    }
+
+
+def insert_group_summaries(conn: sqlite3.Connection, data: List[Dict]) -> None:
+    conn.executemany('''
+    INSERT OR REPLACE INTO group_summary
+        (group_id, member_count, original_count, match_count, min_percentage, max_percentage)
+    VALUES (:group_id, :member_count, :original_count, :match_count, :min_percentage, :max_percentage)
+    ''', data)
+
+
+def has_group_summary(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'group_summary'"
+    ).fetchone() is not None
+
+
+def rebuild_group_summary(conn: sqlite3.Connection) -> int:
+    """Recompute group_summary from all_groups and matches in one pass each
+
+    Used for databases loaded before the table existed and after bulk
+    changes to duplicate flags. Returns the number of groups summarised.
+    """
+    create_group_summary_table(conn)
+    conn.execute('DELETE FROM group_summary')
+    conn.execute('''
+    INSERT INTO group_summary
+        (group_id, member_count, original_count, match_count, min_percentage, max_percentage)
+    SELECT g.group_id, g.member_count, g.original_count,
+           COALESCE(m.match_count, 0), m.min_percentage, m.max_percentage
+    FROM (
+        SELECT group_id, COUNT(*) AS member_count, SUM(duplicate_flag = 0) AS original_count
+        FROM all_groups GROUP BY group_id
+    ) g
+    LEFT JOIN (
+        SELECT group_id, COUNT(*) AS match_count,
+               MIN(percentage) AS min_percentage, MAX(percentage) AS max_percentage
+        FROM matches GROUP BY group_id
+    ) m ON m.group_id = g.group_id
+    ''')
+    conn.commit()
+    count = conn.execute('SELECT COUNT(*) FROM group_summary').fetchone()[0]
+    logger.info(f"Rebuilt group summary for {count} groups")
+    return count
@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import xxhash
+except ImportError:  # Optional, BLAKE2 is used when missing
+    xxhash = None
+
+logger = logging.getLogger(__name__)
+
+PARTIAL_BYTES = 64 * 1024  # Read from each end of a file for the partial hash
+CHUNK_BYTES = 1024 * 1024
+
+HASH_ALGORITHM = 'xxh3_128' if xxhash is not None else 'blake2b_128'
+
+
+def _new_hasher():
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+class HashCache:
+    """Persistent file hash cache keyed by path, size and mtime.
+
+    A cached hash is only reused while the file's size and mtime are
+    unchanged, so repeated runs read each unchanged file at most once.
+    The cache is in WAL mode with a busy timeout, so several processes
+    (the workers of an IngestQueue) can share one cache file.
+    """
+
+    def __init__(self, db_path: str = 'hash_cache.db', flush_every: int = 1000,
+                 busy_timeout: float = 60.0):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=busy_timeout)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.lock = threading.Lock()
+        self.flush_every = flush_every
+        self.pending = {}
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS file_hashes (
+            filepath TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime_ns INTEGER,
+            algorithm TEXT,
+            partial_hash TEXT,
+            full_hash TEXT
+        )''')
+
+    def lookup(self, filepath: str, size: int, mtime_ns: int) -> Tuple[Optional[str], Optional[str]]:
+        """Return (partial_hash, full_hash) still valid for this file version"""
+        with self.lock:
+            row = self.pending.get(filepath)
+            if row is None:
+                row = self.conn.execute(
+                    'SELECT size, mtime_ns, algorithm, partial_hash, full_hash '
+                    'FROM file_hashes WHERE filepath = ?', (filepath,)
+                ).fetchone()
+                if row is not None:
+                    row = (filepath,) + row
+        if row is None or row[1:4] != (size, mtime_ns, HASH_ALGORITHM):
+            return None, None
+        return row[4], row[5]
+
+    def store(self, filepath: str, size: int, mtime_ns: int,
+              partial_hash: Optional[str], full_hash: Optional[str] = None) -> None:
+        with self.lock:
+            self.pending[filepath] = (filepath, size, mtime_ns, HASH_ALGORITHM, partial_hash, full_hash)
+            if len(self.pending) >= self.flush_every:
+                self._flush()
+
+    def _flush(self) -> None:
+        self.conn.executemany('''
+        INSERT OR REPLACE INTO file_hashes
+            (filepath, size, mtime_ns, algorithm, partial_hash, full_hash)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', list(self.pending.values()))
+        self.conn.commit()
+        self.pending.clear()
+
+    def close(self) -> None:
+        with self.lock:
+            if self.pending:
+                self._flush()
+            self.conn.close()
+
+
+class DuplicateVerifier:
+    """Confirms that the members of duplicate groups are byte-identical.
+
+    Work is staged so most files are rejected cheaply: sizes first, then a
+    hash of the first and last PARTIAL_BYTES, and only then a streaming
+    hash of the whole file. Each stage runs over a whole batch of groups in
+    a thread pool, and results are kept in a HashCache.
+    """
+
+    def __init__(self, cache_path: str = 'hash_cache.db', workers: Optional[int] = None):
+        self.cache = HashCache(cache_path)
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.stats = {
+            'groups_checked': 0,
+            'groups_rejected': 0,
+            'files_hashed': 0,
+            'bytes_read': 0,
+            'cache_hits': 0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def verify_groups(self, groups: List[List[str]]) -> List[bool]:
+        """Return, per group of file paths, whether all members are identical"""
+        paths = {path for group in groups for path in group}
+        file_stats = dict(zip(paths, self.executor.map(self._stat, paths)))
+
+        # Stage 1: every member must exist and have the same size
+        candidates = [self._sizes_match([file_stats[p] for p in group]) for group in groups]
+
+        # Stage 2: partial hashes (whole-file hashes for small files)
+        partial = self._hash_stage(groups, candidates, file_stats, self._partial_hash)
+        candidates = [ok and self._all_equal(partial[p] for p in group)
+                      for group, ok in zip(groups, candidates)]
+
+        # Stage 3: full streaming hashes, only for files larger than the partial window
+        full = self._hash_stage(groups, candidates, file_stats, self._full_hash)
+        results = [ok and self._all_equal(full[p] for p in group)
+                   for group, ok in zip(groups, candidates)]
+
+        with self._stats_lock:
+            self.stats['groups_checked'] += len(groups)
+            self.stats['groups_rejected'] += results.count(False)
+        return results
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        self.cache.close()
+        logger.info(f"Content verification: {self.stats}")
+
+    @staticmethod
+    def _sizes_match(group_stats: List[Optional[Tuple[int, int]]]) -> bool:
+        return all(group_stats) and len({size for size, _ in group_stats}) == 1
+
+    @staticmethod
+    def _all_equal(hashes: Iterable[Optional[str]]) -> bool:
+        hashes = list(hashes)
+        return all(hashes) and len(set(hashes)) == 1
+
+    def _hash_stage(self, groups, candidates, file_stats, hash_func) -> Dict[str, Optional[str]]:
+        paths = {p for group, ok in zip(groups, candidates) if ok for p in group}
+        return dict(zip(paths, self.executor.map(lambda p: hash_func(p, *file_stats[p]), paths)))
+
+    @staticmethod
+    def _stat(filepath: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _partial_hash(self, filepath: str, size: int, mtime_ns: int) -> Optional[str]:
+        cached, _ = self.cache.lookup(filepath, size, mtime_ns)
+        if cached:
+            self._count(cache_hits=1)
+            return cached
+        try:
+            hasher = _new_hasher()
+            with open(filepath, 'rb') as f:
+                hasher.update(f.read(PARTIAL_BYTES))
+                if size > 2 * PARTIAL_BYTES:
+                    f.seek(-PARTIAL_BYTES, os.SEEK_END)
+                hasher.update(f.read())
+        except OSError:
+            return None
+        digest = hasher.hexdigest()
+        read = min(size, 2 * PARTIAL_BYTES)
+        self._count(files_hashed=1, bytes_read=read)
+        # Small files were read completely, so the partial hash is also the full hash
+        self.cache.store(filepath, size, mtime_ns, digest, digest if size <= 2 * PARTIAL_BYTES else None)
+        return digest
+
+    def _full_hash(self, filepath: str, size: int, mtime_ns: int) -> Optional[str]:
+        partial, cached = self.cache.lookup(filepath, size, mtime_ns)
+        if cached:
+            self._count(cache_hits=1)
+            return cached
+        try:
+            hasher = _new_hasher()
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_BYTES), b''):
+                    hasher.update(chunk)
+        except OSError:
+            return None
+        digest = hasher.hexdigest()
+        self._count(files_hashed=1, bytes_read=size)
+        self.cache.store(filepath, size, mtime_ns, partial, digest)
+        return digest
+
+    def _count(self, **increments) -> None:
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
@@ -0,0 +1,283 @@
+import logging
+import os
+import queue
+import signal
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional
+
+from .job_control import JobController
+from .originals import apply_original_policy
+from .path_search import build_path_index
+from .xml_processor import XMLFlattener
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _init_worker
+_progress_queue = None
+_job = None
+
+
+class IngestJob:
+    """One XML report in an IngestQueue and its live status"""
+
+    def __init__(self, job_id: int, xml_path: str, db_path: str):
+        self.id = job_id
+        self.xml_path = xml_path
+        self.db_path = db_path  # Target database (the shared one in shared mode)
+        self.status = 'queued'  # queued, running, merging, done, cancelled, failed
+        self.processed = 0
+        self.total = 0
+        self.stats: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.future = None
+
+    @property
+    def percentage(self) -> float:
+        return 100.0 * self.processed / self.total if self.total else 0.0
+
+
+def _init_worker(progress_queue, cancel_event) -> None:
+    global _progress_queue, _job
+    _progress_queue = progress_queue
+    # Ctrl-C reaches the whole process group; the parent cancels through the event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Cancelling stops the whole queue, so every job run by this process
+    # shares one controller and one thread bridging the cross-process event
+    _job = job = JobController()
+
+    def watch_cancel():
+        cancel_event.wait()
+        job.cancel()
+
+    threading.Thread(target=watch_cancel, daemon=True).start()
+
+
+def _run_job(job_id: int, xml_path: str, db_path: str, options: Dict) -> Dict:
+    """Worker process: load one report with a normal XMLFlattener run"""
+    logging.basicConfig(level=logging.INFO)
+    flattener = XMLFlattener(db_path, **options)
+    _progress_queue.put(('progress', job_id, 0, 0))
+    stats = flattener.process_large_xml(
+        xml_path, lambda current, total: _progress_queue.put(('progress', job_id, current, total)), job=_job
+    )
+    return stats.as_dict()
+
+
+class IngestQueue:
+    """Loads many XML reports on a pool of worker processes.
+
+    Each report is parsed by its own process. Without shared_db every
+    report gets its own database. With shared_db, workers load into
+    private part databases and a single writer thread merges each
+    finished part into the shared database (shifting group ids past the
+    ones already there), so the shared database only ever has one writer;
+    indexes, the original policy and the search index are built once at
+    the end. on_update(job) is called from the writer thread whenever a
+    job's progress or status changes.
+    """
+
+    def __init__(self, workers: Optional[int] = None, shared_db: Optional[str] = None,
+                 on_update: Optional[Callable[[IngestJob], None]] = None, **flattener_options):
+        self.shared_db = shared_db
+        self.on_update = on_update
+        self.flattener_options = flattener_options
+        self.jobs: List[IngestJob] = []
+        self.started = None
+        self.finished = None
+        context = get_context('spawn')
+        self._progress = context.Queue()
+        self._cancel = context.Event()
+        self._events = queue.Queue()  # Progress and completions, consumed by the writer thread
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1, mp_context=context,
+            initializer=_init_worker, initargs=(self._progress, self._cancel)
+        )
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._forwarder = threading.Thread(target=self._forward_progress, daemon=True)
+        if shared_db:
+            conn = sqlite3.connect(shared_db)
+            XMLFlattener(shared_db).create_tables(conn)
+            conn.commit()
+            conn.close()
+
+    def submit(self, xml_path: str, db_path: Optional[str] = None) -> IngestJob:
+        """Queue a report; db_path defaults to the report's name with .db (ignored in shared mode)"""
+        if self.started is None:
+            self.started = time.perf_counter()
+            self._writer.start()
+            self._forwarder.start()
+        with self._lock:
+            job = IngestJob(len(self.jobs) + 1, xml_path,
+                            self.shared_db or db_path or os.path.splitext(xml_path)[0] + '.db')
+            self.jobs.append(job)
+            self._pending += 1
+
+        options = dict(self.flattener_options)
+        target = job.db_path
+        if self.shared_db:
+            target = self._part_path(job)
+            self._remove_part(job)  # Left over from an earlier, aborted queue
+            options.pop('original_policy', None)
+            options.pop('build_search_index', None)
+            options['index_after_load'] = False  # Parts are only read once, by the merge
+        job.future = self._executor.submit(_run_job, job.id, xml_path, target, options)
+        job.future.add_done_callback(lambda f: self._events.put(('finished', job, f)))
+        self._notify(job)
+        return job
+
+    def cancel(self) -> None:
+        """Stop all jobs; running loads keep (and merge) what they loaded so far
+
+        The queue cannot be reused afterwards.
+        """
+        self._cancel.set()
+        for job in list(self.jobs):
+            if job.future is not None:
+                job.future.cancel()  # Only succeeds for jobs that have not started
+
+    def wait(self) -> Dict:
+        """Block until every submitted job is finished, then finalise; returns the summary"""
+        with self._idle:
+            while self._pending:
+                self._idle.wait()
+        if self.shared_db:
+            self._finish_shared()
+        self.finished = time.perf_counter()
+        self._executor.shutdown()
+        self._progress.put(None)
+        self._events.put(None)
+        if self.started is not None:
+            # Let both threads drain their queues before the process can exit
+            self._forwarder.join()
+            self._writer.join()
+        summary = self.summary()
+        logger.info(f"Ingest queue finished: {summary['done']}/{len(self.jobs)} jobs, "
+                    f"{summary['rows']} rows, {summary['rows_per_sec']:.0f} rows/s overall")
+        return summary
+
+    def summary(self) -> Dict:
+        """Aggregate counts and throughput over all jobs so far"""
+        elapsed = ((self.finished or time.perf_counter()) - self.started) if self.started else 0.0
+        stats = [job.stats for job in self.jobs if job.stats]
+        rows = sum(s['counters'].get('files', 0) + s['counters'].get('matches', 0) for s in stats)
+        input_bytes = sum(s['input_bytes'] for s in stats)
+        return {
+            'jobs': len(self.jobs),
+            'done': sum(job.status == 'done' for job in self.jobs),
+            'failed': sum(job.status == 'failed' for job in self.jobs),
+            'cancelled': sum(job.status == 'cancelled' for job in self.jobs),
+            'seconds': elapsed,
+            'rows': rows,
+            'rows_per_sec': rows / elapsed if elapsed else 0.0,
+            'bytes_per_sec': input_bytes / elapsed if elapsed else 0.0,
+        }
+
+    def _part_path(self, job: IngestJob) -> str:
+        return f"{self.shared_db}.part{job.id}"
+
+    def _notify(self, job: IngestJob) -> None:
+        if self.on_update:
+            self.on_update(job)
+
+    def _forward_progress(self) -> None:
+        while True:
+            event = self._progress.get()
+            if event is None:
+                return
+            self._events.put(event)
+
+    def _write_loop(self) -> None:
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            if event[0] == 'progress':
+                _, job_id, current, total = event
+                job = self.jobs[job_id - 1]
+                if job.status == 'queued':
+                    job.status = 'running'
+                job.processed, job.total = current, total
+                self._notify(job)
+                continue
+
+            _, job, future = event
+            try:
+                job.stats = future.result()
+                if self.shared_db:
+                    job.status = 'merging'
+                    self._notify(job)
+                    self._merge(job)
+                job.status = 'cancelled' if job.stats['cancelled'] else 'done'
+            except Exception as e:
+                if future.cancelled():
+                    job.status = 'cancelled'
+                else:
+                    job.status = 'failed'
+                    job.error = str(e)
+                    logger.error(f"Failed to ingest {job.xml_path}: {e}")
+                if self.shared_db:
+                    self._remove_part(job)
+            self._notify(job)
+            with self._idle:
+                self._pending -= 1
+                self._idle.notify_all()
+
+    def _merge(self, job: IngestJob) -> None:
+        """Append a finished part database to the shared one (writer thread only)"""
+        part = self._part_path(job)
+        conn = sqlite3.connect(self.shared_db)
+        try:
+            conn.execute('ATTACH DATABASE ? AS part', (part,))
+            offset = conn.execute('''
+            SELECT MAX(COALESCE((SELECT MAX(group_id) FROM main.all_groups), 0),
+                       COALESCE((SELECT MAX(group_id) FROM main.group_summary), 0))
+            ''').fetchone()[0]
+            conn.execute('''
+            INSERT INTO main.all_groups (group_id, file_id, filepath, filename, duplicate_flag)
+            SELECT group_id + ?, file_id, filepath, filename, duplicate_flag FROM part.all_groups ORDER BY id
+            ''', (offset,))
+            conn.execute('''
+            INSERT INTO main.matches (group_id, first, second, percentage)
+            SELECT group_id + ?, first, second, percentage FROM part.matches ORDER BY id
+            ''', (offset,))
+            conn.execute('''
+            INSERT INTO main.group_summary
+                (group_id, member_count, original_count, match_count, min_percentage, max_percentage)
+            SELECT group_id + ?, member_count, original_count, match_count, min_percentage, max_percentage
+            FROM part.group_summary
+            ''', (offset,))
+            conn.commit()
+            conn.execute('DETACH DATABASE part')
+        finally:
+            conn.close()
+        self._remove_part(job)
+        logger.info(f"Merged {job.xml_path} into {self.shared_db} (group ids from {offset + 1})")
+
+    def _remove_part(self, job: IngestJob) -> None:
+        part = self._part_path(job)
+        for path in (part, part + '-journal'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _finish_shared(self) -> None:
+        flattener = XMLFlattener(self.shared_db, **{
+            key: value for key, value in self.flattener_options.items()
+            if key in ('original_policy', 'build_search_index')
+        })
+        conn = sqlite3.connect(self.shared_db)
+        try:
+            flattener.create_indexes(conn)
+            conn.commit()
+            if flattener.original_policy:
+                apply_original_policy(conn, flattener.original_policy)
+            if flattener.build_search_index:
+                build_path_index(conn)
+        finally:
+            conn.close()
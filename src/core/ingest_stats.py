@@ -0,0 +1,91 @@
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory is not reported
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process so far, in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10  # bytes on macOS, KiB elsewhere
+
+
+class IngestStats:
+    """Per-stage timings and counters of one ingestion run.
+
+    Stages are accumulated wall-clock seconds (stage() for coarse steps,
+    add_time() from hot loops where a context manager would cost too much).
+    Counters track rows and batches, and buffer maxima the largest batch
+    flushed. as_dict() derives rows/sec and bytes/sec from the totals.
+    """
+
+    def __init__(self, source: str = ''):
+        self.source = source
+        self.input_bytes = os.path.getsize(source) if source and os.path.exists(source) else 0
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.buffers: Dict[str, int] = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.cancelled = False
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, **increments: int) -> None:
+        for key, value in increments.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe_buffer(self, name: str, size: int) -> None:
+        if size > self.buffers.get(name, 0):
+            self.buffers[name] = size
+
+    def finish(self) -> 'IngestStats':
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def as_dict(self) -> Dict:
+        elapsed = self.elapsed or (time.perf_counter() - self.started)
+        rows = self.counters.get('files', 0) + self.counters.get('matches', 0)
+        return {
+            'source': self.source,
+            'seconds': elapsed,
+            'cancelled': self.cancelled,
+            'stages': dict(sorted(self.stages.items(), key=lambda item: -item[1])),
+            'counters': self.counters,
+            'max_buffers': self.buffers,
+            'input_bytes': self.input_bytes,
+            'rows_per_sec': rows / elapsed if elapsed else 0.0,
+            'bytes_per_sec': self.input_bytes / elapsed if elapsed else 0.0,
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as out:
+            json.dump(self.as_dict(), out, indent=2)
+
+    def summary(self) -> str:
+        stats = self.as_dict()
+        stages = ', '.join(f"{name} {seconds:.2f}s" for name, seconds in stats['stages'].items())
+        return (f"{stats['seconds']:.2f}s, {stats['rows_per_sec']:.0f} rows/s, "
+                f"{stats['bytes_per_sec'] / 2**20:.1f} MB/s ({stages})")
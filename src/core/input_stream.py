@@ -0,0 +1,121 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # Optional, only needed for .zst reports
+    zstandard = None
+
+# Leading bytes of each supported compressed format
+MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+)
+CHUNK_BYTES = 1024 * 1024
+
+
+def compression_of(path: str) -> Optional[str]:
+    """Return the compression format of a file from its magic bytes, or None"""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for magic, name in MAGIC:
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def _decompressing_reader(raw, compression: str):
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if compression == 'bz2':
+        return bz2.BZ2File(raw, mode='rb')
+    if compression == 'xz':
+        return lzma.LZMAFile(raw, mode='rb')
+    if zstandard is None:
+        raise ValueError("Reading .zst reports needs the zstandard package (pip install zstandard)")
+    return zstandard.ZstdDecompressor().stream_reader(raw)
+
+
+class ReportStream(io.RawIOBase):
+    """Read-only stream of a decompressed report, decompressed on a thread.
+
+    A background thread reads ``chunk_size`` blocks of decompressed data
+    into a bounded queue (zlib, bz2 and lzma release the GIL, so this
+    overlaps with parsing), and nothing is ever written to disk.
+    ``position`` is how far into the compressed file decompression has
+    got, against ``compressed_size``, for byte-based progress.
+    """
+
+    def __init__(self, path: str, compression: str, chunk_size: int = CHUNK_BYTES, depth: int = 8):
+        super().__init__()
+        self.compressed_size = os.path.getsize(path)
+        self.decompressed_bytes = 0
+        self._raw = open(path, 'rb')
+        self._reader = _decompressing_reader(self._raw, compression)
+        self._chunks = queue.Queue(maxsize=depth)
+        self._current = memoryview(b'')
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._decompress, args=(chunk_size,), daemon=True)
+        self._thread.start()
+
+    @property
+    def position(self) -> int:
+        try:
+            return self._raw.tell()
+        except ValueError:  # Closed
+            return self.compressed_size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._current:
+            chunk = self._chunks.get()
+            if chunk is None:
+                return 0
+            if isinstance(chunk, BaseException):
+                raise chunk
+            self._current = memoryview(chunk)
+        size = min(len(buffer), len(self._current))
+        buffer[:size] = self._current[:size]
+        self._current = self._current[size:]
+        self.decompressed_bytes += size
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stopped.set()
+            # Unblock the thread if it is waiting for room in the queue
+            while self._thread.is_alive():
+                try:
+                    self._chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._reader.close()
+            self._raw.close()
+        super().close()
+
+    def _decompress(self, chunk_size: int) -> None:
+        try:
+            while not self._stopped.is_set():
+                chunk = self._reader.read(chunk_size)
+                if not chunk:
+                    break
+                self._chunks.put(chunk)
+            self._chunks.put(None)
+        except BaseException as e:  # Re-raised in the reading thread
+            self._chunks.put(e)
+
+
+def open_report(path: str) -> Optional[ReportStream]:
+    """Open a compressed report for streaming, or return None for plain XML"""
+    compression = compression_of(path)
+    return ReportStream(path, compression) if compression else None
@@ -0,0 +1,38 @@
+import threading
+
+
+class JobController:
+    """Cooperative cancel / pause / resume for a long-running job.
+
+    The worker checks the plain ``interrupted`` attribute at safe points
+    (a single attribute read, so it can be done per group) and only calls
+    wait() when it is set. Control methods may be called from any thread.
+    """
+
+    def __init__(self):
+        self.interrupted = False
+        self.cancelled = False
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def pause(self) -> None:
+        self._running.clear()
+        self.interrupted = True
+
+    def resume(self) -> None:
+        self._running.set()
+        self.interrupted = self.cancelled
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self.interrupted = True
+        self._running.set()  # Wake a paused worker so it can stop
+
+    def wait(self) -> bool:
+        """Block while paused; returns False if the job should stop"""
+        self._running.wait()
+        return not self.cancelled
@@ -0,0 +1,114 @@
+import logging
+import sqlite3
+from typing import List, Sequence, Tuple
+
+from .file_meta import collect_file_meta, create_file_meta_table
+from .group_summary import has_group_summary, rebuild_group_summary
+
+logger = logging.getLogger(__name__)
+
+
+class OriginalPolicy:
+    """Ordered rules deciding which member of a group is kept as the original.
+
+    Rules are applied in order, each breaking ties left by the previous
+    ones; file_id and row id always break any remaining tie, so the same
+    database and policy always yield the same originals.
+
+    Available rules:
+        preferred_prefix   -- files under an earlier prefix in preferred_prefixes win
+        oldest_mtime       -- earliest modification time wins
+        shortest_path      -- shortest full path wins
+        largest_resolution -- most image pixels wins
+    """
+
+    RULES = ('preferred_prefix', 'oldest_mtime', 'shortest_path', 'largest_resolution')
+    META_RULES = {'oldest_mtime': False, 'largest_resolution': True}  # rule -> needs resolution
+
+    def __init__(self, rules: Sequence[str] = ('preferred_prefix', 'oldest_mtime', 'shortest_path'),
+                 preferred_prefixes: Sequence[str] = ()):
+        unknown = [rule for rule in rules if rule not in self.RULES]
+        if unknown:
+            raise ValueError(f"Unknown original selection rule(s): {', '.join(unknown)}")
+        self.rules = list(rules)
+        self.preferred_prefixes = list(preferred_prefixes)
+
+    @property
+    def needs_meta(self) -> bool:
+        return any(rule in self.META_RULES for rule in self.rules)
+
+    @property
+    def needs_resolution(self) -> bool:
+        return any(self.META_RULES.get(rule) for rule in self.rules)
+
+    def order_by(self) -> Tuple[str, List]:
+        """Return the window ORDER BY clause over all_groups g / file_meta fm"""
+        terms, params = [], []
+        for rule in self.rules:
+            if rule == 'preferred_prefix' and self.preferred_prefixes:
+                cases = ' '.join('WHEN substr(g.filepath, 1, ?) = ? THEN ?' for _ in self.preferred_prefixes)
+                terms.append(f'CASE {cases} ELSE ? END')
+                for rank, prefix in enumerate(self.preferred_prefixes):
+                    params.extend([len(prefix), prefix, rank])
+                params.append(len(self.preferred_prefixes))
+            elif rule == 'oldest_mtime':
+                terms.append('fm.mtime IS NULL, fm.mtime')
+            elif rule == 'shortest_path':
+                terms.append('length(g.filepath), g.filepath')
+            elif rule == 'largest_resolution':
+                terms.append('fm.width * fm.height IS NULL, fm.width * fm.height DESC')
+        terms.append('g.file_id, g.id')
+        return ', '.join(terms), params
+
+
+def apply_original_policy(conn: sqlite3.Connection, policy: OriginalPolicy,
+                          collect_meta: bool = True, partition: str = 'group',
+                          refresh_summary: bool = True) -> int:
+    """Re-decide the original of every group that has one, in bulk SQL
+
+    Groups without an original (partial matches, failed verification) are
+    left untouched. With partition='cluster' the same is done per
+    file_clusters subcluster instead of per group. Metadata needed by the
+    policy is collected first unless collect_meta is False. group_summary
+    (its original counts) is rebuilt afterwards unless refresh_summary is
+    False. Returns the number of groups (or clusters) decided.
+    """
+    if partition == 'group':
+        key, join = 'g.group_id', ''
+    elif partition == 'cluster':
+        key, join = 'fc.cluster_id', 'JOIN file_clusters fc ON fc.id = g.id'
+    else:
+        raise ValueError(f"Unknown partition: {partition}")
+
+    create_file_meta_table(conn)
+    if policy.needs_meta and collect_meta:
+        collect_file_meta(conn, with_resolution=policy.needs_resolution)
+
+    order_by, params = policy.order_by()
+    conn.execute('DROP TABLE IF EXISTS temp.chosen_originals')
+    conn.execute('CREATE TEMP TABLE chosen_originals (id INTEGER PRIMARY KEY)')
+    conn.execute(f'''
+    INSERT INTO chosen_originals (id)
+    SELECT id FROM (
+        SELECT g.id, ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY {order_by}) AS rn
+        FROM all_groups g {join}
+        LEFT JOIN file_meta fm ON fm.filepath = g.filepath
+        WHERE {key} IN (SELECT {key} FROM all_groups g {join} WHERE g.duplicate_flag = 0)
+    ) WHERE rn = 1
+    ''', params)
+    decided = conn.execute('SELECT COUNT(*) FROM chosen_originals').fetchone()[0]
+
+    conn.execute('''
+    UPDATE all_groups SET duplicate_flag = 1
+    WHERE duplicate_flag = 0 AND id NOT IN (SELECT id FROM chosen_originals)
+    ''')
+    conn.execute('''
+    UPDATE all_groups SET duplicate_flag = 0
+    WHERE id IN (SELECT id FROM chosen_originals)
+    ''')
+    conn.execute('DROP TABLE temp.chosen_originals')
+    conn.commit()
+    if refresh_summary and has_group_summary(conn):
+        rebuild_group_summary(conn)
+    logger.info(f"Original selection ({', '.join(policy.rules) or 'file order'}) applied to {decided} {partition}s")
+    return decided
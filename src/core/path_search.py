@@ -0,0 +1,73 @@
+import logging
+import re
+import sqlite3
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+
+def has_path_index(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'path_fts'"
+    ).fetchone() is not None
+
+
+def _uses_trigram(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'path_fts'").fetchone()
+    return row is not None and 'trigram' in row[0]
+
+
+def build_path_index(conn: sqlite3.Connection) -> str:
+    """(Re)build the full-text index over all_groups filepath/filename
+
+    Uses the FTS5 trigram tokenizer (substring search, SQLite 3.34+) when
+    available and falls back to word tokens with prefix matching. The index
+    is external-content, so it stores no second copy of the paths; rebuild
+    it after loading more data. Returns the tokenizer used.
+    """
+    conn.execute('DROP TABLE IF EXISTS path_fts')
+    tokenizer = 'trigram'
+    try:
+        conn.execute(f'''
+        CREATE VIRTUAL TABLE path_fts USING fts5(
+            filepath, filename, content='all_groups', content_rowid='id', tokenize='{tokenizer}'
+        )''')
+    except sqlite3.OperationalError:
+        tokenizer = 'unicode61'
+        conn.execute(f'''
+        CREATE VIRTUAL TABLE path_fts USING fts5(
+            filepath, filename, content='all_groups', content_rowid='id', tokenize='{tokenizer}'
+        )''')
+    conn.execute("INSERT INTO path_fts (path_fts) VALUES ('rebuild')")
+    conn.commit()
+    logger.info(f"Built path search index ({tokenizer})")
+    return tokenizer
+
+
+def match_expression(conn: sqlite3.Connection, text: str) -> str:
+    """Translate free text into an FTS5 MATCH expression for path_fts"""
+    if _uses_trigram(conn):
+        if len(text) < 3:
+            raise ValueError("Search text must be at least 3 characters")
+        return '"' + text.replace('"', '""') + '"'
+    tokens = [t for t in re.split(r'\W+', text) if t]
+    if not tokens:
+        raise ValueError("Search text has no searchable words")
+    return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+# Selects the group_ids having a file that matches the MATCH parameter
+PATH_MATCH_SUBQUERY = (
+    'SELECT g.group_id FROM path_fts JOIN all_groups g ON g.id = path_fts.rowid '
+    'WHERE path_fts MATCH ?'
+)
+
+
+def search_groups(conn: sqlite3.Connection, text: str, limit: int = 100, offset: int = 0) -> List[int]:
+    """Return a page of group ids containing a file whose path matches text"""
+    rows = conn.execute(f'''
+    SELECT DISTINCT group_id FROM ({PATH_MATCH_SUBQUERY})
+    ORDER BY group_id
+    LIMIT ? OFFSET ?
+    ''', [match_expression(conn, text), limit, offset]).fetchall()
+    return [row[0] for row in rows]
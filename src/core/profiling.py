@@ -0,0 +1,67 @@
+import cProfile
+import io
+import logging
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Functions called out separately in the summary (pstats regex)
+FOCUS_FUNCTIONS = r'process_large_xml|process_group|_flush_groups|_batch_insert_|analyze'
+
+
+@contextmanager
+def profiled(output_prefix: str, top: int = 30, memory: bool = True, frames: int = 1):
+    """Profile the enclosed block with cProfile (and tracemalloc)
+
+    Writes <output_prefix>.prof (raw pstats, for snakeviz/pstats) and
+    <output_prefix>.profile.txt: the top functions by cumulative and own
+    time, the ingestion/analysis entry points in FOCUS_FUNCTIONS, and with
+    memory the allocation sites still holding the most memory at the end
+    and the peak traced memory. tracemalloc slows the run down
+    considerably; pass memory=False to skip it.
+    """
+    profiler = cProfile.Profile()
+    if memory:
+        tracemalloc.start(frames)
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        snapshot = peak = None
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        write_profile(profiler, output_prefix, top, snapshot, peak)
+
+
+def write_profile(profiler: cProfile.Profile, output_prefix: str, top: int = 30,
+                  snapshot: tracemalloc.Snapshot = None, peak: int = None) -> str:
+    """Write the raw and summarised profile; returns the summary path"""
+    profiler.dump_stats(f"{output_prefix}.prof")
+
+    report = io.StringIO()
+    stats = pstats.Stats(profiler, stream=report).strip_dirs()
+    for title, sort in (("cumulative time", 'cumulative'), ("own time", 'tottime')):
+        report.write(f"=== Top {top} functions by {title} ===\n")
+        stats.sort_stats(sort).print_stats(top)
+    report.write("=== Ingestion / analysis entry points ===\n")
+    stats.sort_stats('cumulative').print_stats(FOCUS_FUNCTIONS)
+
+    if snapshot is not None:
+        report.write(f"=== Top {top} allocation sites (peak traced: {peak / 2**20:.1f} MB) ===\n")
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        for stat in snapshot.statistics('lineno')[:top]:
+            report.write(f"{stat}\n")
+
+    summary_path = f"{output_prefix}.profile.txt"
+    with open(summary_path, 'w', encoding='utf-8') as out:
+        out.write(report.getvalue())
+    logger.info(f"Profile written to {summary_path} and {output_prefix}.prof")
+    return summary_path
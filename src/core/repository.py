@@ -0,0 +1,373 @@
+import functools
+import io
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+from .columnar_store import is_columnar_store, open_store
+
+# Lookup indexes of XMLFlattener.create_indexes and ensure_query_indexes,
+# written so that both SQLite and PostgreSQL accept them
+INDEXES = (
+    'CREATE INDEX IF NOT EXISTS idx_all_groups_group_file ON all_groups (group_id, file_id)',
+    'CREATE INDEX IF NOT EXISTS idx_matches_group ON matches (group_id)',
+    'CREATE INDEX IF NOT EXISTS idx_all_groups_filepath ON all_groups (filepath, group_id)',
+    'CREATE INDEX IF NOT EXISTS idx_all_groups_filename ON all_groups (filename, group_id)',
+    'CREATE INDEX IF NOT EXISTS idx_group_summary_percentage ON group_summary (min_percentage)',
+    'CREATE INDEX IF NOT EXISTS idx_group_summary_size_asc ON group_summary (member_count, group_id)',
+    'CREATE INDEX IF NOT EXISTS idx_group_summary_size_desc ON group_summary ((-member_count), group_id)',
+    'CREATE INDEX IF NOT EXISTS idx_group_summary_pct_sort '
+    'ON group_summary ((COALESCE(min_percentage, -1)), group_id)',
+)
+
+# Characters escaped in COPY's text format
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+# URL -> Repository, so every caller in a process shares one connection pool
+_repositories: Dict[str, 'Repository'] = {}
+_repositories_lock = threading.Lock()
+
+
+def is_database_url(target: str) -> bool:
+    """True for a SQLAlchemy URL such as postgresql://host/db (rather than a file path)"""
+    return '://' in target
+
+
+def is_sqlite_file(target: str) -> bool:
+    """True for a plain SQLite database path (not a URL or a columnar store)"""
+    return not is_database_url(target) and not is_columnar_store(target)
+
+
+# SQLAlchemy is only imported once a repository is opened, so commands
+# working on plain SQLite files never pay for it
+@functools.lru_cache(maxsize=None)
+def _schema():
+    """SQLAlchemy MetaData with the ingested tables (same layout as XMLFlattener.create_tables)"""
+    from sqlalchemy import Boolean, Column, Float, Integer, MetaData, Table, Text
+
+    metadata = MetaData()
+    Table(
+        'all_groups', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('group_id', Integer),
+        Column('file_id', Integer),
+        Column('filepath', Text),
+        Column('filename', Text),
+        Column('duplicate_flag', Boolean, default=True),
+    )
+    Table(
+        'matches', metadata,
+        Column('id', Integer, primary_key=True),
+        Column('group_id', Integer),
+        Column('first', Integer),
+        Column('second', Integer),
+        Column('percentage', Float),
+    )
+    Table(
+        'group_summary', metadata,
+        Column('group_id', Integer, primary_key=True, autoincrement=False),
+        Column('member_count', Integer),
+        Column('original_count', Integer),
+        Column('match_count', Integer),
+        Column('min_percentage', Float),
+        Column('max_percentage', Float),
+    )
+    return metadata
+
+
+class _Cursor:
+    """Rows of one Repository.execute() with the DB-API cursor methods
+
+    The first ``buffer_rows`` rows are fetched at once; a result that fits
+    gives its pooled connection back immediately. Longer results stream
+    from the server (stream_results) and keep the connection until they are
+    exhausted or closed.
+    """
+
+    def __init__(self, connection, transaction, result, buffer_rows: int):
+        self._connection = connection
+        self._transaction = transaction
+        self._result = result
+        self._rows = result.fetchmany(buffer_rows) if result.returns_rows else []
+        self._next = 0
+        if len(self._rows) < buffer_rows:
+            self.close()
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size: int) -> List[Tuple]:
+        rows = [tuple(row) for row in self._rows[self._next:self._next + size]]
+        self._next += len(rows)
+        if len(rows) < size and self._result is not None:
+            more = self._result.fetchmany(size - len(rows))
+            rows.extend(tuple(row) for row in more)
+            if len(rows) < size:
+                self.close()
+        return rows
+
+    def fetchall(self) -> List[Tuple]:
+        rows = self.fetchmany(len(self._rows) - self._next)
+        while self._result is not None:
+            rows.extend(self.fetchmany(50000))
+        return rows
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(1000)
+            if not rows:
+                return
+            yield from rows
+
+    def close(self) -> None:
+        """Release the connection (rows still buffered stay readable)"""
+        if self._connection is None:
+            return
+        connection, self._connection, self._result = self._connection, None, None
+        try:
+            self._transaction.commit()
+        finally:
+            connection.close()
+
+    def __del__(self):
+        try:
+            self.close()  # An abandoned stream still returns its connection
+        except Exception:
+            pass
+
+
+class Repository:
+    """The ingested tables in a database reached through SQLAlchemy.
+
+    A repository owns one engine and its connection pool. Each execute()
+    checks out a pooled connection and runs one statement in its own
+    transaction; small results are fetched at once and large ones are
+    streamed (see _Cursor), so many threads (the viewer's list, prefetcher
+    and reports) can share a repository and exports stay constant-memory.
+    execute() takes the same qmark SQL as sqlite3, and commit() and close()
+    do nothing, so a repository can be passed where GroupFilter, the
+    viewer and export expect a connection. dispose() closes the pool.
+    Bulk loading goes through writer().
+    """
+
+    indexes = INDEXES
+    buffer_rows = 1000  # Rows fetched before a result is streamed
+
+    def __init__(self, url: str, **engine_options):
+        from sqlalchemy import create_engine
+
+        self.url = url
+        self.engine = create_engine(url, **engine_options)
+
+    @property
+    def dialect_name(self) -> str:
+        return self.engine.dialect.name
+
+    def execute(self, sql: str, params: Sequence = ()) -> _Cursor:
+        from sqlalchemy import text
+
+        statement, binds = _named_params(sql, params)
+        connection = self.engine.connect()
+        if sql.lstrip()[:6].upper() in ('SELECT', 'WITH'):
+            # Server-side cursors only work for queries (not DDL or DML)
+            connection = connection.execution_options(stream_results=True)
+        try:
+            transaction = connection.begin()
+            result = connection.execute(text(statement), binds)
+        except Exception:
+            connection.close()
+            raise
+        return _Cursor(connection, transaction, result, self.buffer_rows)
+
+    def commit(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+
+    def table_columns(self, table: str) -> List[Tuple[str, str]]:
+        """(name, declared type) of each column, as for the exporter"""
+        from sqlalchemy import inspect
+
+        columns = inspect(self.engine).get_columns(table)
+        if not columns:
+            raise ValueError(f"No such table: {table}")
+        return [(column['name'], str(column['type'])) for column in columns]
+
+    def create_schema(self) -> None:
+        _schema().create_all(self.engine)
+
+    def create_indexes(self, conn) -> None:
+        from sqlalchemy import text
+
+        for statement in self.indexes:
+            conn.execute(text(statement))
+
+    def bulk_insert(self, conn, table, records: List[Dict]) -> None:
+        """Insert record dicts into a Table of _schema() on a connection in a transaction"""
+        conn.execute(table.insert(), records)
+
+    def writer(self, batch_rows: int = 50000) -> 'RepositoryWriter':
+        return RepositoryWriter(self, batch_rows)
+
+
+class SQLiteRepository(Repository):
+    """Repository on a SQLite file.
+
+    Connections use WAL journaling and a busy timeout, so analysts reading
+    the file are not blocked by each other or by a load in progress.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 30000, **engine_options):
+        from sqlalchemy import event
+
+        super().__init__(f"sqlite:///{os.path.abspath(path)}", **engine_options)
+        self.path = path
+
+        @event.listens_for(self.engine, 'connect')
+        def configure(dbapi_connection, _):
+            dbapi_connection.execute('PRAGMA journal_mode=WAL')
+            dbapi_connection.execute(f'PRAGMA busy_timeout={int(busy_timeout_ms)}')
+
+
+class PostgresRepository(Repository):
+    """Repository on a PostgreSQL server, shared by many analysts.
+
+    Connections come from a bounded pool (checked with a ping before use
+    and recycled, so idle connections dropped by the server are replaced).
+    With psycopg2, bulk loads stream rows with COPY ... FROM STDIN instead
+    of INSERT statements; other drivers use executemany INSERTs.
+    """
+
+    # Prefix filters compare paths in the C collation (see GroupFilter)
+    indexes = tuple(statement.replace('(filepath, group_id)', '(filepath COLLATE "C", group_id)')
+                    for statement in INDEXES)
+
+    def __init__(self, url: str, pool_size: int = 5, max_overflow: int = 10,
+                 pool_recycle: int = 1800, **engine_options):
+        super().__init__(url, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True,
+                         pool_recycle=pool_recycle, **engine_options)
+
+    def bulk_insert(self, conn, table, records: List[Dict]) -> None:
+        if conn.dialect.driver != 'psycopg2':
+            super().bulk_insert(conn, table, records)  # copy_expert is psycopg2's
+            return
+        names = [column.name for column in table.columns if column.name in records[0]]
+        buffer = io.StringIO(''.join(
+            '\t'.join(_copy_value(record[name]) for name in names) + '\n' for record in records
+        ))
+        columns = ', '.join(f'"{name}"' for name in names)
+        cursor = conn.connection.cursor()
+        try:
+            cursor.copy_expert(f'COPY {table.name} ({columns}) FROM STDIN', buffer)
+        finally:
+            cursor.close()
+
+
+class RepositoryWriter:
+    """Loads rows into a repository inside one transaction.
+
+    append(table, records) buffers record dicts as XMLFlattener builds them
+    and bulk-loads every ``batch_rows`` rows; commit(), rollback() and
+    close() behave like a SQLite connection's, so the writer can take the
+    place of one in XMLFlattener. The tables are created if missing.
+    """
+
+    TABLES = ('all_groups', 'matches', 'group_summary')
+
+    def __init__(self, repository: Repository, batch_rows: int = 50000):
+        self.repository = repository
+        self.batch_rows = batch_rows
+        repository.create_schema()
+        self._tables = _schema().tables
+        self._conn = repository.engine.connect()
+        self._transaction = self._conn.begin()
+        self._buffers: Dict[str, List[Dict]] = {name: [] for name in self.TABLES}
+
+    def append(self, table: str, records: List[Dict]) -> None:
+        buffer = self._buffers[table]
+        buffer.extend(records)
+        if len(buffer) >= self.batch_rows:
+            self._flush(table)
+
+    def create_indexes(self) -> None:
+        self._flush_all()
+        self.repository.create_indexes(self._conn)
+
+    def commit(self) -> None:
+        self._flush_all()
+        self._transaction.commit()
+        self._transaction = self._conn.begin()
+
+    def rollback(self) -> None:
+        for buffer in self._buffers.values():
+            buffer.clear()
+        self._transaction.rollback()
+        self._transaction = self._conn.begin()
+
+    def close(self) -> None:
+        """Like a SQLite connection, uncommitted rows are discarded"""
+        self._transaction.rollback()
+        self._conn.close()
+
+    def _flush_all(self) -> None:
+        for table in self.TABLES:
+            self._flush(table)
+
+    def _flush(self, table: str) -> None:
+        buffer = self._buffers[table]
+        if buffer:
+            self.repository.bulk_insert(self._conn, self._tables[table], buffer)
+            self._buffers[table] = []
+
+
+def _copy_value(value) -> str:
+    """One field in COPY's text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    return str(value)
+
+
+def _named_params(sql: str, params: Sequence) -> Tuple[str, Dict]:
+    """Turn qmark placeholders into SQLAlchemy named binds (:p0, :p1, ...)"""
+    parts = sql.replace(':', '\\:').split('?')
+    if len(parts) - 1 != len(params):
+        raise ValueError(f"Expected {len(parts) - 1} parameters, got {len(params)}")
+    statement = parts[0] + ''.join(f':p{i}{part}' for i, part in enumerate(parts[1:]))
+    return statement, {f'p{i}': value for i, value in enumerate(params)}
+
+
+def open_repository(target: str, **options) -> Repository:
+    """Shared repository for a database URL or SQLite path (one per process)"""
+    from sqlalchemy.engine import make_url
+
+    key = target if is_database_url(target) else os.path.abspath(target)
+    with _repositories_lock:
+        repository = _repositories.get(key)
+        if repository is None:
+            backend = make_url(target).get_backend_name() if is_database_url(target) else 'sqlite'
+            if backend == 'postgresql':
+                repository = PostgresRepository(target, **options)
+            elif backend == 'sqlite':
+                repository = SQLiteRepository(make_url(target).database if is_database_url(target) else target,
+                                              **options)
+            else:
+                repository = Repository(target, **options)
+            _repositories[key] = repository
+    return repository
+
+
+def connect(target: str):
+    """Open a database for reading: SQLite file, columnar store or database URL"""
+    if is_database_url(target):
+        return open_repository(target)
+    return open_store(target) if is_columnar_store(target) else sqlite3.connect(target)
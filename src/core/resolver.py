@@ -0,0 +1,273 @@
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .analytics import DUPLICATE_PATHS, format_bytes, original_join
+from .hash_verifier import DuplicateVerifier
+from .repository import is_sqlite_file
+
+try:
+    import fcntl
+except ImportError:  # Windows: reflinks are unavailable
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ('delete', 'move', 'hardlink', 'reflink')
+DESTRUCTIVE_ACTIONS = ('delete', 'hardlink', 'reflink')  # The duplicate's own data is gone afterwards
+FICLONE = 0x40049409  # Linux ioctl: share the extents of another file (btrfs, XFS)
+TEMP_SUFFIX = '.dedup-tmp'
+
+
+class DuplicateResolver:
+    """Deletes, quarantines or links flagged duplicates, journaled for resume.
+
+    plan() records one resolution_journal row per duplicate path (with the
+    original it is resolved against) in a single INSERT ... SELECT; run()
+    then streams pending rows in batches, performs the file operations on
+    a thread pool and records each outcome. An interrupted run picks up
+    the remaining pending rows, and undo() reverses completed moves and
+    links. Rows are only run with the action they were planned with. Before
+    a delete or link, the duplicate must have the same content hash as its
+    original (DuplicateVerifier, cached in hash_cache_path). With dry_run
+    the journal lives in a temp table and no file is touched; the stats
+    then describe what would have happened.
+    """
+
+    def __init__(self, db_path: str, action: str = 'delete', quarantine_dir: Optional[str] = None,
+                 dry_run: bool = False, workers: Optional[int] = None, batch_size: int = 1000,
+                 hash_cache_path: str = 'hash_cache.db'):
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action: {action}")
+        if action == 'move' and not quarantine_dir:
+            raise ValueError("The move action needs a quarantine directory")
+        if not is_sqlite_file(db_path):
+            raise ValueError("Resolving duplicates needs a SQLite database file")
+        self.conn = sqlite3.connect(db_path)
+        self.action = action
+        self.quarantine_dir = quarantine_dir
+        self.dry_run = dry_run
+        self.batch_size = batch_size
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.hash_cache_path = hash_cache_path
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self.verifier = None  # Created by the first run() that needs it
+        self.stats = {'files': 0, 'bytes': 0, 'failed': 0, 'seconds': 0.0}
+        # A temp table shadows the persistent journal for unqualified names
+        self.conn.execute(f'''
+        CREATE {'TEMP ' if dry_run else ''}TABLE IF NOT EXISTS resolution_journal (
+            id INTEGER PRIMARY KEY,
+            filepath TEXT UNIQUE,
+            original TEXT,
+            action TEXT,
+            target TEXT,
+            size INTEGER,
+            status TEXT DEFAULT 'pending',
+            error TEXT
+        )''')
+
+    def plan(self) -> int:
+        """Journal every duplicate path not journaled yet; returns the number added"""
+        before = self.conn.total_changes
+        self.conn.execute(f'''
+        INSERT OR IGNORE INTO resolution_journal (filepath, original, action)
+        SELECT d.filepath, MIN(o.filepath), ?
+        FROM all_groups d
+        {original_join(self.conn)}
+        WHERE d.duplicate_flag = 1 AND d.filepath IN ({DUPLICATE_PATHS})
+        GROUP BY d.filepath
+        ''', (self.action,))
+        self.conn.commit()
+        added = self.conn.total_changes - before
+        logger.info(f"Planned {added} duplicate resolutions ({self.action})")
+        return added
+
+    def discard_pending(self) -> int:
+        """Drop journal rows not resolved yet (pending or failed), e.g. to plan another action"""
+        before = self.conn.total_changes
+        self.conn.execute("DELETE FROM resolution_journal WHERE status IN ('pending', 'failed')")
+        self.conn.commit()
+        discarded = self.conn.total_changes - before
+        logger.info(f"Discarded {discarded} unresolved journal entries")
+        return discarded
+
+    def run(self, retry_failed: bool = False) -> Dict:
+        """Resolve every pending journal entry; returns throughput stats
+
+        Raises ValueError if entries to run were planned with another action
+        than this resolver's (discard_pending() drops them).
+        """
+        statuses = ('pending', 'failed') if retry_failed else ('pending',)
+        placeholders = ", ".join("?" * len(statuses))
+        planned = [action for action, in self.conn.execute(
+            f'SELECT DISTINCT action FROM resolution_journal WHERE status IN ({placeholders})', statuses
+        ) if action != self.action]
+        if planned:
+            raise ValueError(f"Unresolved journal entries were planned as {', '.join(planned)}, not "
+                             f"{self.action}; run with that action or discard them first")
+        started = time.perf_counter()
+        last_id = 0
+        while True:
+            batch = self.conn.execute(f'''
+            SELECT id, filepath, original, action FROM resolution_journal
+            WHERE id > ? AND status IN ({placeholders})
+            ORDER BY id LIMIT ?
+            ''', (last_id, *statuses, self.batch_size)).fetchall()
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            verified = self._verify(batch)
+            results = list(self.executor.map(lambda row, same: self._resolve(*row[1:], same), batch, verified))
+            if not self.dry_run:
+                self.conn.executemany('''
+                UPDATE resolution_journal SET status = ?, target = ?, size = ?, error = ?
+                WHERE id = ?
+                ''', [result + (row[0],) for row, result in zip(batch, results)])
+                self.conn.commit()
+            for status, _, size, _ in results:
+                if status == 'done':
+                    self.stats['files'] += 1
+                    self.stats['bytes'] += size or 0
+                else:
+                    self.stats['failed'] += 1
+            self._log_progress(started)
+        self.stats['seconds'] = time.perf_counter() - started
+        return self.stats
+
+    def undo(self) -> int:
+        """Reverse completed moves and links (deletes cannot be undone)"""
+        undone = failed = 0
+        last_id = None
+        while True:
+            batch = self.conn.execute('''
+            SELECT id, filepath, original, action, target FROM resolution_journal
+            WHERE status = 'done' AND (? IS NULL OR id < ?)
+            ORDER BY id DESC LIMIT ?
+            ''', (last_id, last_id, self.batch_size)).fetchall()
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            results = list(self.executor.map(lambda row: self._undo(*row[1:]), batch))
+            self.conn.executemany(
+                'UPDATE resolution_journal SET status = ?, error = ? WHERE id = ?',
+                [result + (row[0],) for row, result in zip(batch, results)]
+            )
+            self.conn.commit()
+            undone += sum(1 for status, _ in results if status == 'undone')
+            failed += sum(1 for _, error in results if error and error.startswith('undo failed'))
+        logger.info(f"Undid {undone} resolutions, {failed} failed")
+        return undone
+
+    def close(self) -> None:
+        self.executor.shutdown()
+        if self.verifier is not None:
+            self.verifier.close()
+        self.conn.close()
+        logger.info(f"Duplicate resolution: {self.stats}")
+
+    def _log_progress(self, started: float) -> None:
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        logger.info(
+            f"{'Would resolve' if self.dry_run else 'Resolved'} {self.stats['files']} files, "
+            f"{format_bytes(self.stats['bytes'])} ({self.stats['files'] / elapsed:.0f} files/s, "
+            f"{format_bytes(self.stats['bytes'] / elapsed)}/s), {self.stats['failed']} failed"
+        )
+
+    def _quarantine_path(self, filepath: str) -> str:
+        # Keep the original directory structure below the quarantine root
+        relative = os.path.splitdrive(os.path.abspath(filepath))[1].lstrip(os.sep)
+        return os.path.join(self.quarantine_dir, relative)
+
+    def _verify(self, batch) -> List[bool]:
+        """Per journal row, whether the duplicate's content matches its original
+
+        Only delete and link rows are hashed; a move keeps the data, so its
+        rows count as verified.
+        """
+        pairs = [[filepath, original] for _, filepath, original, action in batch
+                 if action in DESTRUCTIVE_ACTIONS]
+        if not pairs:
+            return [True] * len(batch)
+        if self.verifier is None:
+            self.verifier = DuplicateVerifier(self.hash_cache_path, workers=self.workers)
+        matches = iter(self.verifier.verify_groups(pairs))
+        return [next(matches) if action in DESTRUCTIVE_ACTIONS else True for _, _, _, action in batch]
+
+    def _resolve(self, filepath: str, original: str, action: str,
+                 verified: bool) -> Tuple[str, Optional[str], Optional[int], Optional[str]]:
+        """Perform one action; returns (status, target, size, error)"""
+        target = self._quarantine_path(filepath) if action == 'move' else None
+        try:
+            if not os.path.exists(filepath):
+                # Already handled by an interrupted run (or removed by hand)
+                if action == 'move' and os.path.exists(target):
+                    return 'done', target, os.path.getsize(target), None
+                if action == 'delete':
+                    return 'done', None, 0, None
+                return 'failed', target, None, "file not found"
+            size = os.path.getsize(filepath)
+            if not os.path.isfile(original):
+                return 'failed', target, size, "original not found"
+            if os.path.getsize(original) != size:
+                return 'failed', target, size, "size differs from original"
+            if os.path.samefile(filepath, original):
+                return 'done', target, 0, None  # Already linked
+            if not verified:
+                return 'failed', target, size, "content differs from original"
+            if self.dry_run:
+                return 'done', target, size, None
+
+            if action == 'delete':
+                os.remove(filepath)
+            elif action == 'move':
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(filepath, target)
+            else:
+                self._replace_with_link(filepath, action, original)
+            return 'done', target, size, None
+        except OSError as e:
+            return 'failed', target, None, str(e)
+
+    def _replace_with_link(self, filepath: str, action: str, original: str) -> None:
+        # Build the link beside the duplicate, then atomically swap it in
+        temp = filepath + TEMP_SUFFIX
+        if os.path.lexists(temp):
+            os.remove(temp)
+        try:
+            if action == 'hardlink':
+                os.link(original, temp)
+            elif fcntl is None:
+                raise OSError("reflinks are not supported on this platform")
+            else:
+                with open(original, 'rb') as source, open(temp, 'wb') as clone:
+                    fcntl.ioctl(clone.fileno(), FICLONE, source.fileno())
+                shutil.copystat(filepath, temp)
+            os.replace(temp, filepath)
+        except OSError:
+            if os.path.lexists(temp):
+                os.remove(temp)
+            raise
+
+    def _undo(self, filepath: str, original: str, action: str, target: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Reverse one action; returns (status, error)"""
+        try:
+            if action == 'delete':
+                return 'done', "deleted files cannot be restored"
+            if action == 'move':
+                if target and os.path.exists(target):
+                    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                    shutil.move(target, filepath)
+                elif not os.path.exists(filepath):
+                    return 'done', f"undo failed: quarantined file {target or '(not recorded)'} not found"
+            elif os.path.exists(filepath):
+                # Give the path its own copy of the data again
+                temp = filepath + TEMP_SUFFIX
+                shutil.copy2(filepath, temp)
+                os.replace(temp, filepath)
+            return 'undone', None
+        except OSError as e:
+            return 'done', f"undo failed: {e}"
@@ -0,0 +1,343 @@
+import xml.etree.ElementTree as ET
+import sqlite3
+from typing import Dict, List, Any, Set
+from tqdm import tqdm
+import logging
+import time
+from pathlib import Path
+from .columnar_store import ColumnarWriter
+from .ingest_stats import IngestStats
+from .group_scanner import GroupScanner
+from .input_stream import open_report
+from .job_control import JobController
+from .hash_verifier import DuplicateVerifier
+from .originals import OriginalPolicy, apply_original_policy
+from .repository import is_database_url, open_repository
+from .group_query import ensure_query_indexes
+from .path_search import build_path_index
+from .group_summary import create_group_summary_table, insert_group_summaries, summarize_group
+
+logger = logging.getLogger(__name__)
+
+class XMLFlattener:
+    STORAGES = ('sqlite', 'parquet')
+
+    def __init__(self, db_path: str = 'xml_data.db', verify_content: bool = False,
+                 hash_cache_path: str = 'hash_cache.db', original_policy: OriginalPolicy = None,
+                 build_search_index: bool = False, index_after_load: bool = True,
+                 storage: str = 'sqlite'):
+        if storage not in self.STORAGES:
+            raise ValueError(f"Unknown storage: {storage}")
+        if (storage == 'parquet' or is_database_url(db_path)) and (original_policy or build_search_index):
+            # Both rewrite or add SQLite tables after loading
+            raise ValueError("Original selection rules and the search index need a SQLite database file")
+        # Database file, SQLAlchemy URL (e.g. postgresql://...), or store directory with parquet storage
+        self.db_path = db_path
+        # 'parquet' writes a columnar store (see columnar_store) instead of SQLite
+        self.storage = storage
+        self.batch_size = 1000
+        self.current_group_id = 0
+        # Optionally confirm byte-identical content before picking an original
+        self.verify_content = verify_content
+        self.hash_cache_path = hash_cache_path
+        self.verifier = None
+        # Rules re-deciding originals in bulk SQL once all rows are loaded
+        self.original_policy = original_policy
+        # Full-text path index for the viewer's search box (can also be built later)
+        self.build_search_index = build_search_index
+        # Off for staging databases that are merged elsewhere (see IngestQueue)
+        self.index_after_load = index_after_load
+        # Instrumentation of the current (or last) run
+        self.stats = IngestStats()
+
+    def create_tables(self, conn: sqlite3.Connection) -> None:
+        """Create required database tables"""
+        # Create all_groups table
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS all_groups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_id INTEGER,
+            file_id INTEGER,
+            filepath TEXT,
+            filename TEXT,
+            duplicate_flag BOOLEAN DEFAULT 1
+        )''')
+
+        # Create matches table
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            group_id INTEGER,
+            first INTEGER,
+            second INTEGER,
+            percentage REAL
+        )''')
+
+        # One summary row per group for fast listing and filtering
+        create_group_summary_table(conn)
+
+    def create_indexes(self, conn: sqlite3.Connection) -> None:
+        """Create lookup indexes (after loading, which is faster than maintaining them)"""
+        if not isinstance(conn, sqlite3.Connection):
+            conn.create_indexes()  # RepositoryWriter, with each dialect's index definitions
+            return
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_all_groups_group_file ON all_groups (group_id, file_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_matches_group ON matches (group_id)')
+        ensure_query_indexes(conn)
+
+    def process_group(self, group_elem: ET.Element) -> tuple[List[Dict], List[Dict]]:
+        """Process a single group element"""
+        self.current_group_id += 1
+        group_id = self.current_group_id
+        
+        # Process files
+        files = group_elem.findall('file')
+        group_records = []
+        for file_id, file_elem in enumerate(files):
+            filepath = file_elem.get('path', '')
+            filename = Path(filepath).name if filepath else ''
+            
+            group_records.append({
+                'group_id': group_id,
+                'file_id': file_id,
+                'filepath': filepath,
+                'filename': filename,
+                'duplicate_flag': True
+            })
+
+        # Process matches
+        matches = group_elem.findall('match')
+        match_records = []
+        all_100_percent = True
+        
+        for match_elem in matches:
+            percentage = float(match_elem.get('percentage', 0))
+            match_records.append({
+                'group_id': group_id,
+                'first': int(match_elem.get('first', 0)),
+                'second': int(match_elem.get('second', 0)),
+                'percentage': percentage
+            })
+            if percentage < 100:
+                all_100_percent = False
+
+        # Update duplicate_flag if all matches are 100%
+        if all_100_percent and group_records:
+            # Mark the first listed file as non-duplicate; original_policy may
+            # re-decide it after loading
+            group_records[0]['duplicate_flag'] = False
+
+        return group_records, match_records
+
+    def process_large_xml(self, xml_path: str, progress_callback=None,
+                          stats_path: str = None, job: JobController = None) -> IngestStats:
+        """Process large XML file using iterative parsing
+
+        Reports compressed with gzip, bz2, xz or zstd are decompressed on
+        the fly by a background thread. progress_callback(processed, total)
+        is called about every 0.1% of the groups (and once at the end), not
+        per group; for compressed reports it counts compressed bytes
+        instead, so no pre-scan is needed. A JobController
+        can pause the load (committing first, so the database is not left
+        locked) or cancel it; groups loaded so far are kept and indexed.
+        Returns the run's IngestStats (stage timings, row counts and
+        throughput), which are also written as JSON to stats_path if given.
+        """
+        logger.info(f"Processing XML file: {xml_path}")
+        stats = self.stats = IngestStats(xml_path)
+        
+        stream = open_report(xml_path)
+        if stream is not None:
+            progress_total = stream.compressed_size
+            progress_step = 1000
+        else:
+            # Count total groups first for progress tracking (memory-mapped,
+            # so the report is not read into memory)
+            with stats.stage('count'), GroupScanner(xml_path) as scanner:
+                progress_total = scanner.count()
+            # Report progress in steps so callbacks cost nothing per group
+            progress_step = max(1, progress_total // 1000)
+        
+        processed_groups = 0
+        perf_counter = time.perf_counter
+        next_progress = progress_step
+        
+        try:
+            # Writers stand in for the connection: same commit/rollback/close
+            if self.storage == 'parquet':
+                conn = ColumnarWriter(self.db_path)
+            elif is_database_url(self.db_path):
+                conn = open_repository(self.db_path).writer()
+            else:
+                conn = sqlite3.connect(self.db_path)
+                self.create_tables(conn)
+        except Exception:
+            if stream:
+                stream.close()
+            raise
+        if self.verify_content:
+            self.verifier = DuplicateVerifier(self.hash_cache_path)
+        
+        try:
+            context = ET.iterparse(stream or xml_path, events=('end',))
+            group_buffer = []
+            match_buffer = []
+            summary_buffer = []
+            loop_started = perf_counter()
+            progress_bar = tqdm(total=progress_total, desc="Processing XML",
+                                unit='B' if stream else 'group', unit_scale=stream is not None)
+            
+            for event, elem in context:
+                if elem.tag == 'group':
+                    processed_groups += 1
+                    if processed_groups >= next_progress:
+                        next_progress += progress_step
+                        current = stream.position if stream else processed_groups
+                        progress_bar.update(current - progress_bar.n)
+                        if progress_callback:
+                            progress_callback(current, progress_total)
+                    
+                    build_started = perf_counter()
+                    group_records, match_records = self.process_group(elem)
+                    
+                    group_buffer.extend(group_records)
+                    match_buffer.extend(match_records)
+                    summary_buffer.append(summarize_group(self.current_group_id, group_records, match_records))
+                    stats.add_time('build', perf_counter() - build_started)
+                    
+                    # Batch insert when buffer is full (buffers always hold whole groups)
+                    if len(group_buffer) >= self.batch_size:
+                        self._flush_groups(conn, group_buffer, summary_buffer)
+                        group_buffer = []
+                        summary_buffer = []
+                    
+                    if len(match_buffer) >= self.batch_size:
+                        self._batch_insert_matches(conn, match_buffer)
+                        match_buffer = []
+                    
+                    elem.clear()
+                    
+                    if job is not None and job.interrupted:
+                        conn.commit()
+                        with stats.stage('paused'):
+                            keep_going = job.wait()
+                        if not keep_going:
+                            stats.cancelled = True
+                            logger.info(f"Cancelled after {processed_groups} groups")
+                            break
+            
+            current = stream.position if stream else processed_groups
+            progress_bar.update(current - progress_bar.n)
+            progress_bar.close()
+            if progress_callback:
+                progress_callback(current, progress_total)
+            if stream:
+                stats.count(decompressed_bytes=stream.decompressed_bytes)
+            
+            # Insert remaining buffers
+            if group_buffer or summary_buffer:
+                self._flush_groups(conn, group_buffer, summary_buffer)
+            if match_buffer:
+                self._batch_insert_matches(conn, match_buffer)
+            # Whatever the loop spent outside building, inserting and pausing went to parsing
+            loop_seconds = perf_counter() - loop_started
+            stats.add_time('parse', loop_seconds - sum(stats.stages.get(name, 0.0)
+                                                       for name in ('build', 'verify', 'insert', 'paused')))
+            stats.count(groups=processed_groups)
+            
+            if self.index_after_load and self.storage == 'sqlite':
+                with stats.stage('index'):
+                    self.create_indexes(conn)
+            with stats.stage('commit'):
+                conn.commit()
+            # A cancelled load is kept usable, but skips the optional extra passes
+            if self.original_policy and not stats.cancelled:
+                with stats.stage('original_policy'):
+                    apply_original_policy(conn, self.original_policy)
+            if self.build_search_index and not stats.cancelled:
+                with stats.stage('search_index'):
+                    build_path_index(conn)
+            stats.finish()
+            logger.info(f"Processing {'cancelled' if stats.cancelled else 'completed successfully'}: "
+                        f"{stats.summary()}")
+            if stats_path:
+                stats.write_json(stats_path)
+            return stats
+            
+        except Exception as e:
+            logger.error(f"Error processing XML: {str(e)}")
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+            if stream:
+                stream.close()
+            if self.verifier:
+                self.verifier.close()
+                self.verifier = None
+
+    def _flush_groups(self, conn: sqlite3.Connection, group_buffer: List[Dict],
+                      summary_buffer: List[Dict]) -> None:
+        """Verify, then insert buffered groups together with their summary rows"""
+        with self.stats.stage('verify'):
+            self._verify_originals(group_buffer)
+        
+        with self.stats.stage('insert'):
+            self._batch_insert_groups(conn, group_buffer)
+            
+            # Verification may have withdrawn originals, so count them now
+            originals = {}
+            for record in group_buffer:
+                if not record['duplicate_flag']:
+                    originals[record['group_id']] = originals.get(record['group_id'], 0) + 1
+            for summary in summary_buffer:
+                summary['original_count'] = originals.get(summary['group_id'], 0)
+            if not isinstance(conn, sqlite3.Connection):
+                conn.append('group_summary', summary_buffer)
+            else:
+                insert_group_summaries(conn, summary_buffer)
+        self.stats.count(files=len(group_buffer), group_batches=1)
+        self.stats.observe_buffer('groups', len(group_buffer))
+
+    def _verify_originals(self, group_records: List[Dict]) -> None:
+        """Withdraw the original of any group whose files are not byte-identical"""
+        if not self.verifier:
+            return
+        
+        groups = {}
+        for record in group_records:
+            groups.setdefault(record['group_id'], []).append(record)
+        # Only groups that were given an original need confirming
+        candidates = [records for records in groups.values()
+                      if any(not r['duplicate_flag'] for r in records)]
+        if not candidates:
+            return
+        
+        verified = self.verifier.verify_groups([[r['filepath'] for r in records] for records in candidates])
+        for records, identical in zip(candidates, verified):
+            if not identical:
+                for record in records:
+                    record['duplicate_flag'] = True
+
+    def _batch_insert_groups(self, conn: sqlite3.Connection, data: List[Dict]) -> None:
+        """Batch insert group records"""
+        if not isinstance(conn, sqlite3.Connection):
+            conn.append('all_groups', data)
+            return
+        conn.executemany('''
+        INSERT INTO all_groups (group_id, file_id, filepath, filename, duplicate_flag)
+        VALUES (:group_id, :file_id, :filepath, :filename, :duplicate_flag)
+        ''', data)
+
+    def _batch_insert_matches(self, conn: sqlite3.Connection, data: List[Dict]) -> None:
+        """Batch insert match records"""
+        with self.stats.stage('insert'):
+            if not isinstance(conn, sqlite3.Connection):
+                conn.append('matches', data)
+            else:
+                conn.executemany('''
+                INSERT INTO matches (group_id, first, second, percentage)
+                VALUES (:group_id, :first, :second, :percentage)
+                ''', data)
+        self.stats.count(matches=len(data), match_batches=1)
+        self.stats.observe_buffer('matches', len(data))
@@ -2,7 +2,11 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from .components.progress_bar import ProgressBar
 from .utils.logger import TextLogger
+from .utils.update_channel import UpdateChannel
+from ..core.ingest_queue import IngestQueue
+from ..core.job_control import JobController
 from ..core.xml_processor import XMLFlattener
+import logging
 import threading
 
 class AnalyzeFrame(ttk.Frame):
@@ -15,12 +19,19 @@ class AnalyzeFrame(ttk.Frame):
         self.xml_path = tk.StringVar()
         self.db_path = tk.StringVar(value="xml_data.db")
         self.progress_var = tk.DoubleVar()
+        self.verify_content = tk.BooleanVar(value=False)
+        self.columnar = tk.BooleanVar(value=False)
         self.processing = False
+        self.job = None  # JobController of the running load
+        self.batch_files = []  # XML reports waiting in the batch queue
+        self.batch_shared_db = tk.BooleanVar(value=False)
+        self.ingest_queue = None  # IngestQueue while a batch runs
 
     def create_widgets(self):
         self.create_file_selection()
         self.create_db_config()
         self.create_process_button()
+        self.create_batch_section()
         self.create_progress_section()
 
     def create_file_selection(self):
@@ -50,6 +61,18 @@ class AnalyzeFrame(ttk.Frame):
         ttk.Label(db_frame, text="Database Name:", font=("Helvetica", 10)).pack(anchor="w")
         db_entry = ttk.Entry(db_frame, textvariable=self.db_path, width=80)
         db_entry.pack(fill="x")
+        
+        ttk.Checkbutton(
+            db_frame,
+            text="Verify file contents before marking an original (hash cache: hash_cache.db)",
+            variable=self.verify_content
+        ).pack(anchor="w", pady=(10, 0))
+        
+        ttk.Checkbutton(
+            db_frame,
+            text="Write a columnar store (Parquet directory) instead of SQLite",
+            variable=self.columnar
+        ).pack(anchor="w")
 
     def create_process_button(self):
         button_frame = ttk.Frame(self, padding=15)
@@ -62,7 +85,175 @@ class AnalyzeFrame(ttk.Frame):
             style='Action.TButton',
             width=20
         )
-        self.process_button.pack(pady=10)
+        self.process_button.pack(side="left", expand=True, anchor="e", padx=5, pady=10)
+        
+        self.pause_button = ttk.Button(
+            button_frame,
+            text="Pause",
+            command=self.toggle_pause,
+            style='Action.TButton',
+            width=12,
+            state="disabled"
+        )
+        self.pause_button.pack(side="left", padx=5, pady=10)
+        
+        self.cancel_button = ttk.Button(
+            button_frame,
+            text="Cancel",
+            command=self.cancel_processing,
+            style='Action.TButton',
+            width=12,
+            state="disabled"
+        )
+        self.cancel_button.pack(side="left", expand=True, anchor="w", padx=5, pady=10)
+
+    def create_batch_section(self):
+        batch_frame = ttk.LabelFrame(self, text="Batch Queue", padding=15)
+        batch_frame.pack(fill="x", pady=(0, 10))
+        
+        controls = ttk.Frame(batch_frame)
+        controls.pack(fill="x")
+        
+        ttk.Button(
+            controls,
+            text="Add XML Files",
+            command=self.add_batch_files,
+            style='Action.TButton'
+        ).pack(side="left")
+        
+        ttk.Button(
+            controls,
+            text="Clear",
+            command=self.clear_batch,
+            style='Action.TButton'
+        ).pack(side="left", padx=5)
+        
+        ttk.Checkbutton(
+            controls,
+            text="Load all into the database above (otherwise one database per report)",
+            variable=self.batch_shared_db
+        ).pack(side="left", padx=15)
+        
+        self.batch_cancel_button = ttk.Button(
+            controls,
+            text="Cancel Queue",
+            command=self.cancel_batch,
+            style='Action.TButton',
+            state="disabled"
+        )
+        self.batch_cancel_button.pack(side="right")
+        
+        self.batch_run_button = ttk.Button(
+            controls,
+            text="Run Queue",
+            command=self.run_batch,
+            style='Action.TButton'
+        )
+        self.batch_run_button.pack(side="right", padx=5)
+        
+        self.batch_tree = ttk.Treeview(
+            batch_frame,
+            columns=("file", "status", "progress", "rate"),
+            show="headings",
+            height=5
+        )
+        for column, heading, width in (("file", "Report", 420), ("status", "Status", 90),
+                                       ("progress", "Progress", 80), ("rate", "Rows/s", 90)):
+            self.batch_tree.heading(column, text=heading)
+            self.batch_tree.column(column, width=width, stretch=(column == "file"))
+        self.batch_tree.pack(fill="x", pady=(10, 0))
+        
+        self.batch_summary = ttk.Label(batch_frame, text="", foreground='#666666')
+        self.batch_summary.pack(anchor="w", pady=(5, 0))
+
+    def add_batch_files(self):
+        filenames = filedialog.askopenfilenames(
+            title="Select XML Files",
+            filetypes=[("XML files", "*.xml *.xml.gz *.xml.bz2 *.xml.xz *.xml.zst"), ("All files", "*.*")]
+        )
+        for filename in filenames:
+            if filename not in self.batch_files:
+                self.batch_files.append(filename)
+                self.batch_tree.insert("", "end", iid=filename, values=(filename, "waiting", "", ""))
+
+    def clear_batch(self):
+        if self.ingest_queue:
+            return
+        self.batch_files = []
+        self.batch_tree.delete(*self.batch_tree.get_children())
+        self.batch_summary.config(text="")
+
+    def update_batch_job(self, job):
+        # Runs on the Tk thread, driven by the UpdateChannel
+        rate = f"{job.stats['rows_per_sec']:.0f}" if job.stats else ""
+        status = job.status if not job.error else f"failed: {job.error}"
+        self.batch_tree.item(job.xml_path, values=(job.xml_path, status, f"{job.percentage:.0f}%", rate))
+
+    def run_batch(self):
+        if not self.batch_files:
+            messagebox.showerror("Error", "Please add XML files to the queue")
+            return
+        if self.batch_shared_db.get() and not self.db_path.get():
+            messagebox.showerror("Error", "Please enter a database name")
+            return
+        if self.processing:
+            return
+        
+        self.processing = True
+        self.process_button.config(state="disabled")
+        self.batch_run_button.config(state="disabled")
+        self.batch_cancel_button.config(state="normal")
+        channel = UpdateChannel(self, lambda current, total: None)
+        channel.start()
+        shared_db = self.db_path.get() if self.batch_shared_db.get() else None
+        verify_content = self.verify_content.get()
+        files = list(self.batch_files)
+        
+        def finish(summary, error):
+            channel.stop()
+            self.processing = False
+            self.ingest_queue = None
+            self.process_button.config(state="normal")
+            self.batch_run_button.config(state="normal")
+            self.batch_cancel_button.config(state="disabled")
+            if error:
+                messagebox.showerror("Error", error)
+                return
+            self.batch_summary.config(
+                text=f"{summary['done']}/{summary['jobs']} reports loaded, {summary['failed']} failed, "
+                     f"{summary['cancelled']} cancelled; {summary['rows']} rows in {summary['seconds']:.1f}s "
+                     f"({summary['rows_per_sec']:.0f} rows/s)"
+            )
+        
+        def process():
+            summary = error = None
+            try:
+                self.ingest_queue = ingest_queue = IngestQueue(
+                    shared_db=shared_db,
+                    on_update=lambda job: channel.call(self.update_batch_job, job),
+                    verify_content=verify_content
+                )
+                try:
+                    for xml_path in files:
+                        ingest_queue.submit(xml_path)
+                except Exception:
+                    ingest_queue.cancel()  # Stop what was submitted before the failure
+                    ingest_queue.wait()
+                    raise
+                summary = ingest_queue.wait()
+            except Exception as e:
+                error = f"Failed to run the batch: {str(e)}"
+            finally:
+                channel.call(finish, summary, error)
+        
+        threading.Thread(target=process, daemon=True).start()
+
+    def cancel_batch(self):
+        if self.ingest_queue and messagebox.askyesno(
+            "Cancel", "Stop the queue? Groups loaded so far are kept."
+        ):
+            self.ingest_queue.cancel()
+            self.batch_cancel_button.config(state="disabled")
 
     def create_progress_section(self):
         progress_frame = ttk.LabelFrame(self, text="Progress", padding=15)
@@ -109,12 +300,13 @@ class AnalyzeFrame(ttk.Frame):
     def browse_xml(self):
         filename = filedialog.askopenfilename(
             title="Select XML File",
-            filetypes=[("XML files", "*.xml"), ("All files", "*.*")]
+            filetypes=[("XML files", "*.xml *.xml.gz *.xml.bz2 *.xml.xz *.xml.zst"), ("All files", "*.*")]
         )
         if filename:
             self.xml_path.set(filename)
 
     def update_progress(self, current, total):
+        # Runs on the Tk thread, driven by the UpdateChannel
         if total > 0:
             percentage = (current / total) * 100
             self.progress_var.set(percentage)
@@ -124,6 +316,27 @@ class AnalyzeFrame(ttk.Frame):
                 foreground='#2196F3' if percentage < 100 else '#4CAF50'
             )
 
+    def toggle_pause(self):
+        if not self.job:
+            return
+        if self.job.paused:
+            self.job.resume()
+            self.pause_button.config(text="Pause")
+            self.status_label.config(text="Processing...", foreground='#2196F3')
+        else:
+            self.job.pause()
+            self.pause_button.config(text="Resume")
+            self.status_label.config(text="Paused (loaded groups are committed)", foreground='#FF9800')
+
+    def cancel_processing(self):
+        if self.job and messagebox.askyesno(
+            "Cancel", "Stop processing? Groups loaded so far are kept in the database."
+        ):
+            self.job.cancel()
+            self.cancel_button.config(state="disabled")
+            self.pause_button.config(state="disabled")
+            self.status_label.config(text="Cancelling...", foreground='#FF9800')
+
     def process_xml(self):
         if not self.xml_path.get():
             messagebox.showerror("Error", "Please select an XML file")
@@ -137,26 +350,47 @@ class AnalyzeFrame(ttk.Frame):
             return
             
         self.processing = True
+        self.job = job = JobController()
         self.process_button.config(state="disabled")
+        self.pause_button.config(state="normal", text="Pause")
+        self.cancel_button.config(state="normal")
         self.log_text.delete(1.0, tk.END)
         self.progress_var.set(0)
         
+        # The worker never touches Tk: progress, log lines and the final
+        # message all reach the widgets through after() polling
+        channel = UpdateChannel(self, self.update_progress)
+        log_handler = TextLogger(self.log_text)
+        logging.getLogger().addHandler(log_handler)
+        channel.start()
+        xml_path, db_path = self.xml_path.get(), self.db_path.get()
+        verify_content = self.verify_content.get()
+        storage = 'parquet' if self.columnar.get() else 'sqlite'
+        
+        def finish(title, message, show):
+            logging.getLogger().removeHandler(log_handler)
+            log_handler.close()
+            channel.stop()
+            self.processing = False
+            self.job = None
+            self.process_button.config(state="normal")
+            self.pause_button.config(state="disabled", text="Pause")
+            self.cancel_button.config(state="disabled")
+            show(title, message)
+        
         def process():
             try:
-                flattener = XMLFlattener(self.db_path.get())
-                flattener.process_large_xml(self.xml_path.get(), self.update_progress)
-                
-                self.root.after(0, lambda: messagebox.showinfo(
-                    "Success", 
-                    f"Data successfully processed and stored in {self.db_path.get()}"
-                ))
+                flattener = XMLFlattener(db_path, verify_content=verify_content, storage=storage)
+                stats = flattener.process_large_xml(xml_path, channel.progress, job=job)
+                if stats.cancelled:
+                    channel.call(finish, "Cancelled",
+                                 f"Processing cancelled; {stats.counters.get('groups', 0)} groups "
+                                 f"were kept in {db_path}", messagebox.showinfo)
+                else:
+                    channel.call(finish, "Success",
+                                 f"Data successfully processed and stored in {db_path}\n\n{stats.summary()}",
+                                 messagebox.showinfo)
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror(
-                    "Error",
-                    f"Failed to process XML: {str(e)}"
-                ))
-            finally:
-                self.processing = False
-                self.root.after(0, lambda: self.process_button.config(state="normal"))
+                channel.call(finish, "Error", f"Failed to process XML: {str(e)}", messagebox.showerror)
         
         threading.Thread(target=process, daemon=True).start()
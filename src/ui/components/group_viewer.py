@@ -1,18 +1,78 @@
 import tkinter as tk
 from tkinter import ttk
 from ..utils.image_handler import ImageHandler
-import sqlite3
+from ..utils.prefetcher import fetch_group_files
 import os
 
+class ImageSlot(ttk.Frame):
+    """Thumbnail tile that is rebound to another file instead of recreated"""
+
+    def __init__(self, parent, viewer):
+        super().__init__(parent)
+        self.viewer = viewer
+        self.filepath = None
+        self.photo = None
+        self.create_widgets()
+
+    def create_widgets(self):
+        # Image label
+        self.image_label = ttk.Label(self, cursor="hand2")
+        self.image_label.pack(pady=2)
+        
+        # Bind events; handlers read self.filepath so they follow rebinding
+        self.image_label.bind('<Button-1>', lambda e: self.viewer.image_handler.open_image(self.filepath))
+        self.image_label.bind('<Enter>', lambda e: self.viewer.show_tooltip(self.image_label, self.filepath))
+        self.image_label.bind('<Leave>', lambda e: self.viewer.hide_tooltip())
+        self.image_label.bind('<Button-3>', lambda e: self.viewer.show_context_menu(e, self.filepath))
+        
+        # Status label
+        self.status_label = ttk.Label(self, font=("Helvetica", 9, "bold"))
+        self.status_label.pack()
+        
+        # Filename label
+        self.name_label = ttk.Label(self, wraplength=140, font=("Helvetica", 8))
+        self.name_label.pack()
+
+    def bind_file(self, filepath, is_duplicate, photo):
+        """Show filepath in this slot; photo is None when it could not be loaded"""
+        self.filepath = filepath
+        self.photo = photo  # Keep reference to prevent garbage collection
+        if photo is not None:
+            self.image_label.configure(image=photo, text="", foreground="")
+        else:
+            self.image_label.configure(image="", text="⚠️\nImage not found", foreground='red')
+        
+        status = 'Original' if not is_duplicate else 'Duplicate'
+        status_color = '#4CAF50' if not is_duplicate else '#666666'
+        self.status_label.configure(text=status, foreground=status_color)
+        self.name_label.configure(text=os.path.basename(filepath))
+        self.configure(style='Original.TFrame' if not is_duplicate else 'TFrame')
+
+
 class GroupViewer(ttk.LabelFrame):
-    def __init__(self, parent, group_id, db_path):
-        super().__init__(parent, text=f"Group {group_id}", padding=10)
-        self.group_id = group_id
+    """Horizontally scrolling group of thumbnails.
+
+    Tiles have a fixed pitch, so only the slots inside the visible part of
+    the canvas exist; they are rebound as the group scrolls or the viewer
+    is reused for another group.
+    """
+
+    slot_width = 170
+    canvas_height = 250
+
+    def __init__(self, parent, group_id=None, db_path=None, files=None):
+        super().__init__(parent, padding=10)
+        self.group_id = None
         self.db_path = db_path
+        self.files = []
         self.image_handler = ImageHandler()
-        self.thumbnails = []  # Keep reference to prevent garbage collection
+        self._windows = {}  # slot -> canvas window item
+        self._bound = {}  # file index -> slot
+        self._free = []
+        self._visible = None
         self.create_widgets()
-        self.load_images()
+        if group_id is not None:
+            self.bind_group(group_id, db_path, files)
 
     def create_widgets(self):
         self.create_image_container()
@@ -23,85 +83,84 @@ class GroupViewer(ttk.LabelFrame):
         container.pack(fill="both", expand=True)
         
         # Create horizontal scrolling canvas
-        self.canvas = tk.Canvas(container, height=250)
-        scrollbar = ttk.Scrollbar(container, orient="horizontal", 
-                                command=self.canvas.xview)
+        self.canvas = tk.Canvas(container, height=self.canvas_height)
+        self.scrollbar = ttk.Scrollbar(container, orient="horizontal", 
+                                       command=self.canvas.xview)
         
-        self.image_frame = ttk.Frame(self.canvas)
-        self.image_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        
-        self.canvas.create_window((0, 0), window=self.image_frame, anchor="nw")
-        self.canvas.configure(xscrollcommand=scrollbar.set)
+        # Re-layout tiles whenever the view moves or the canvas is resized
+        self.canvas.configure(xscrollcommand=self._on_xscroll)
+        self.canvas.bind("<Configure>", lambda e: self.layout_slots())
         
         self.canvas.pack(side="top", fill="both", expand=True)
-        scrollbar.pack(side="bottom", fill="x")
+        self.scrollbar.pack(side="bottom", fill="x")
+
+    def _on_xscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.layout_slots()
+
+    def bind_group(self, group_id, db_path, files=None):
+        """Rebind this viewer (and its image slots) to another group"""
+        self.group_id = group_id
+        self.db_path = db_path
+        self.configure(text=f"Group {group_id}")
+        self.load_images(files)
 
-    def load_images(self):
+    def load_images(self, files=None):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            files = cursor.execute("""
-                SELECT filepath, duplicate_flag, file_id 
-                FROM all_groups 
-                WHERE group_id = ?
-                ORDER BY file_id
-            """, (self.group_id,)).fetchall()
-            
-            conn.close()
-
-            for filepath, is_duplicate, file_id in files:
-                self.add_image_frame(filepath, is_duplicate)
-                
+            if files is None:
+                files = fetch_group_files(self.db_path, [self.group_id])[self.group_id]
         except Exception as e:
             print(f"Error loading images for group {self.group_id}: {e}")
+            files = []
+        self.files = files
+        
+        # Every slot becomes free and is hidden; layout_slots picks the visible ones again
+        for slot in self._bound.values():
+            self.canvas.coords(self._windows[slot], -self.slot_width, 0)
+            self._free.append(slot)
+        self._bound.clear()
+        self._visible = None
+        self.canvas.configure(scrollregion=(0, 0, len(files) * self.slot_width, self.canvas_height))
+        self.canvas.xview_moveto(0)
+        self.layout_slots()
+
+    def layout_slots(self):
+        """Bind slots to the files inside the visible part of the canvas"""
+        left = self.canvas.canvasx(0)
+        first = max(int(left // self.slot_width), 0)
+        last = min(int((left + self.canvas.winfo_width()) // self.slot_width) + 1, len(self.files))
+        if (first, last) == self._visible:
+            return
+        self._visible = (first, last)
+        
+        for index in [i for i in self._bound if not first <= i < last]:
+            slot = self._bound.pop(index)
+            self.canvas.coords(self._windows[slot], -self.slot_width, 0)
+            self._free.append(slot)
+        
+        for index in range(first, last):
+            if index not in self._bound:
+                self.add_image_frame(index, *self.files[index][:2])
 
-    def add_image_frame(self, filepath, is_duplicate):
+    def add_image_frame(self, index, filepath, is_duplicate):
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = ImageSlot(self.canvas, self)
+            self._windows[slot] = self.canvas.create_window(
+                (-self.slot_width, 0), window=slot, anchor="nw", width=self.slot_width - 10
+            )
+        
         try:
-            frame = ttk.Frame(self.image_frame)
-            frame.pack(side="left", padx=5, pady=5)
-            
-            # Create thumbnail
-            photo = self.image_handler.create_thumbnail(filepath)
-            self.thumbnails.append(photo)  # Keep reference
-            
-            # Image label
-            label = ttk.Label(frame, image=photo, cursor="hand2")
-            label.pack(pady=2)
-            
-            # Bind events
-            label.bind('<Button-1>', lambda e: self.image_handler.open_image(filepath))
-            label.bind('<Enter>', lambda e: self.show_tooltip(label, filepath))
-            label.bind('<Leave>', lambda e: self.hide_tooltip())
-            label.bind('<Button-3>', lambda e: self.show_context_menu(e, filepath))
-            
-            # Status label
-            status = 'Original' if not is_duplicate else 'Duplicate'
-            status_color = '#4CAF50' if not is_duplicate else '#666666'
-            
-            ttk.Label(
-                frame,
-                text=status,
-                foreground=status_color,
-                font=("Helvetica", 9, "bold")
-            ).pack()
-            
-            # Filename label
-            ttk.Label(
-                frame,
-                text=os.path.basename(filepath),
-                wraplength=140,
-                font=("Helvetica", 8)
-            ).pack()
-            
-            if not is_duplicate:
-                frame.configure(style='Original.TFrame')
-                
+            # Create thumbnail (served from the shared cache when possible)
+            photo = self.image_handler.get_thumbnail(filepath)
         except Exception as e:
             print(f"Error adding image frame for {filepath}: {e}")
+            photo = None
+        
+        slot.bind_file(filepath, is_duplicate, photo)
+        self.canvas.coords(self._windows[slot], index * self.slot_width + 5, 5)
+        self._bound[index] = slot
 
     def show_tooltip(self, widget, text):
         x = y = 0
@@ -0,0 +1,141 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+from .group_viewer import GroupViewer
+
+
+class VirtualGroupList(ttk.Frame):
+    """Continuously scrolling group list that only materialises visible rows.
+
+    Rows have a fixed height, so scrolling is tracked in row units and Tk
+    never sees a scroll region proportional to the number of groups. Only
+    as many GroupViewer widgets exist as fit in the viewport; they are
+    rebound to other groups as the list scrolls.
+    """
+
+    row_height = 330
+    scroll_unit = 0.25  # Rows moved per arrow click / wheel notch
+
+    def __init__(self, parent, fetch_rows, on_visible_change=None):
+        super().__init__(parent)
+        self.fetch_rows = fetch_rows  # callable(group_ids) -> {group_id: rows}
+        self.on_visible_change = on_visible_change
+        self.group_ids = []
+        self.db_path = None
+        self.top = 0.0  # Index of the first visible row, fractional
+        self._windows = {}  # viewer -> canvas window item
+        self._bound = {}  # row index -> viewer
+        self._free = []
+        self._layout_pending = False
+        self.create_widgets()
+
+    def create_widgets(self):
+        self.canvas = tk.Canvas(
+            self,
+            bg='#f0f0f0',
+            height=600,
+            highlightthickness=0  # Remove border
+        )
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True, padx=(5, 0))
+
+        self.canvas.bind("<Configure>", lambda e: self.schedule_layout())
+        self.bind_mouse_wheel()
+
+    def bind_mouse_wheel(self):
+        def _on_mousewheel(event):
+            self.scroll_rows((-1 if event.delta > 0 else 1) * self.scroll_unit)
+
+        self.canvas.bind_all("<MouseWheel>", _on_mousewheel)
+        self.canvas.bind_all("<Button-4>", lambda e: self.scroll_rows(-self.scroll_unit))
+        self.canvas.bind_all("<Button-5>", lambda e: self.scroll_rows(self.scroll_unit))
+
+    def set_groups(self, group_ids, db_path):
+        """Show a new sequence of group ids (any indexable, e.g. an array)"""
+        self.group_ids = group_ids
+        self.db_path = db_path
+        self.top = 0.0
+        self._free.extend(self._bound.values())
+        self._bound.clear()
+        self.schedule_layout()
+
+    def visible_rows(self):
+        return max(self.canvas.winfo_height(), 1) / self.row_height
+
+    def visible_range(self):
+        """Return (first, last) row indices currently in the viewport, last exclusive"""
+        first = int(self.top)
+        last = min(len(self.group_ids), math.ceil(self.top + self.visible_rows()))
+        return first, max(first, last)
+
+    def scroll_rows(self, rows):
+        self.top += rows
+        self.schedule_layout()
+
+    def scroll_pages(self, pages):
+        self.scroll_rows(pages * max(math.floor(self.visible_rows()), 1))
+
+    def scroll_to_index(self, index):
+        self.top = float(index)
+        self.schedule_layout()
+
+    def schedule_layout(self):
+        """Coalesce bursts of scroll events into one layout pass"""
+        if not self._layout_pending:
+            self._layout_pending = True
+            self.after_idle(self.layout)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            self.top = float(args[1]) * len(self.group_ids)
+            self.schedule_layout()
+        elif args[0] == 'scroll':
+            if args[2] == 'pages':
+                self.scroll_pages(int(args[1]))
+            else:
+                self.scroll_rows(int(args[1]) * self.scroll_unit)
+
+    def _new_viewer(self):
+        viewer = GroupViewer(self.canvas)
+        self._windows[viewer] = self.canvas.create_window(
+            (0, -2 * self.row_height), window=viewer, anchor="nw"
+        )
+        return viewer
+
+    def layout(self):
+        """Bind viewers to the rows in the viewport and position them"""
+        self._layout_pending = False
+        total = len(self.group_ids)
+        self.top = min(max(self.top, 0.0), max(total - self.visible_rows(), 0.0))
+        first, last = self.visible_range()
+
+        # Release viewers whose rows scrolled out of view
+        for index in [i for i in self._bound if not first <= i < last]:
+            self._free.append(self._bound.pop(index))
+
+        # Bind newly visible rows, fetching their files in one query
+        needed = [i for i in range(first, last) if i not in self._bound]
+        rows = self.fetch_rows([self.group_ids[i] for i in needed]) if needed else {}
+        for index in needed:
+            viewer = self._free.pop() if self._free else self._new_viewer()
+            group_id = self.group_ids[index]
+            viewer.bind_group(group_id, self.db_path, rows.get(group_id))
+            self._bound[index] = viewer
+
+        width = self.canvas.winfo_width()
+        for index, viewer in self._bound.items():
+            window = self._windows[viewer]
+            self.canvas.coords(window, 0, (index - self.top) * self.row_height)
+            self.canvas.itemconfigure(window, width=width, height=self.row_height - 10)
+        for viewer in self._free:
+            self.canvas.coords(self._windows[viewer], 0, -2 * self.row_height)
+
+        if total:
+            self.scrollbar.set(self.top / total, min((self.top + self.visible_rows()) / total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        if self.on_visible_change:
+            self.on_visible_change(first, last)
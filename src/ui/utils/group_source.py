@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from ...core.repository import connect
+
+
+class GroupSource:
+    """Lazily paged, indexable sequence of group ids for the virtual list.
+
+    Behaves like a read-only list of the group ids matching a GroupFilter,
+    but only fetches blocks of ``block_size`` ids when they are indexed and
+    keeps at most ``max_blocks`` of them. A block following a cached one is
+    fetched by keyset, so scrolling never pays for a growing OFFSET.
+    """
+
+    def __init__(self, db_path, group_filter, block_size=500, max_blocks=64):
+        self.conn = connect(db_path)
+        self.group_filter = group_filter
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.total = group_filter.count(self.conn)
+        self._blocks = OrderedDict()  # block number -> [(group_id, sort_key), ...]
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.total))]
+        if index < 0:
+            index += self.total
+        if not 0 <= index < self.total:
+            raise IndexError("group index out of range")
+        block, offset = divmod(index, self.block_size)
+        return self._block(block)[offset][0]
+
+    def position(self, group_id):
+        """Return the index of group_id, or None if it is not listed"""
+        return self.group_filter.position(self.conn, group_id)
+
+    def close(self):
+        self.conn.close()
+
+    def _block(self, block):
+        rows = self._blocks.get(block)
+        if rows is not None:
+            self._blocks.move_to_end(block)
+            return rows
+
+        previous = self._blocks.get(block - 1)
+        if previous:
+            rows = self.group_filter.fetch_page(self.conn, self.block_size, after=previous[-1][1])
+        else:
+            rows = self.group_filter.fetch_page(self.conn, self.block_size, offset=block * self.block_size)
+        self._blocks[block] = rows
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        return rows
@@ -1,14 +1,75 @@
-from PIL import Image, ImageTk
+from PIL import Image, ImageTk, ExifTags
+from .thumbnail_cache import ThumbnailCache
+import io
 import os
 import platform
 import subprocess
 
 class ImageHandler:
+    # Shared by every viewer so paging back to a group reuses its thumbnails
+    cache = ThumbnailCache()
+
     @staticmethod
-    def create_thumbnail(filepath, size=(150, 150)):
+    def load_thumbnail(filepath, size=(150, 150)):
+        """Decode a reduced-size PIL image, avoiding a full-resolution decode
+
+        JPEGs use their embedded EXIF preview when it is large enough, and
+        otherwise DCT-scaled draft decoding. Other formats are fully decoded.
+        Safe to call from worker threads (no Tk objects are created).
+        """
         image = Image.open(filepath)
+        if image.format == 'JPEG':
+            preview = ImageHandler._exif_preview(image, size)
+            if preview is not None:
+                image.close()
+                image = preview
+            else:
+                image.draft(None, size)
         image.thumbnail(size)
-        return ImageTk.PhotoImage(image)
+        return image
+
+    @staticmethod
+    def _exif_preview(image, size):
+        """Return the embedded EXIF thumbnail if it can stand in for image"""
+        try:
+            exif_bytes = image.info.get('exif')
+            if not exif_bytes or not hasattr(ExifTags, 'IFD'):
+                return None
+            width, height = image.size
+            scale = min(size[0] / width, size[1] / height)
+            if scale >= 1:
+                return None  # Already small, nothing to gain
+
+            ifd1 = image.getexif().get_ifd(ExifTags.IFD.IFD1)
+            offset, length = ifd1.get(0x0201), ifd1.get(0x0202)
+            if not offset or not length:
+                return None
+            base = 6 if exif_bytes.startswith(b'Exif\x00\x00') else 0
+            preview = Image.open(io.BytesIO(exif_bytes[base + offset:base + offset + length]))
+            preview.load()
+        except Exception:
+            return None
+
+        # Reject previews that would be upscaled or are letterboxed
+        if preview.width < int(width * scale) or preview.height < int(height * scale):
+            return None
+        if abs(preview.width / preview.height - width / height) > 0.02 * width / height:
+            return None
+        return preview
+
+    @staticmethod
+    def create_thumbnail(filepath, size=(150, 150)):
+        return ImageTk.PhotoImage(ImageHandler.load_thumbnail(filepath, size))
+
+    @classmethod
+    def get_thumbnail(cls, filepath, size=(150, 150)):
+        """Return a cached thumbnail, creating and caching it on a miss"""
+        key = (filepath, tuple(size))
+        photo = cls.cache.get(key)
+        if photo is None:
+            photo = cls.create_thumbnail(filepath, size)
+            cls.cache.put(key, photo)
+        return photo
 
     @staticmethod
     def open_image(filepath):
@@ -1,13 +1,48 @@
 import tkinter as tk
 import logging
+import queue
 
 class TextLogger(logging.Handler):
-    def __init__(self, text_widget):
+    """Logging handler writing to a Text widget from any thread.
+
+    emit() only queues the formatted line; the Tk loop drains the queue
+    every ``interval_ms`` and inserts all pending lines at once, keeping at
+    most ``max_lines`` in the widget.
+    """
+
+    def __init__(self, text_widget, interval_ms=100, max_lines=5000):
         super().__init__()
         self.text_widget = text_widget
+        self.interval_ms = interval_ms
+        self.max_lines = max_lines
+        self.lines = queue.SimpleQueue()
+        self.closed = False
         self.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+        self.text_widget.after(self.interval_ms, self.drain)
 
     def emit(self, record):
-        msg = self.format(record)
-        self.text_widget.insert(tk.END, f"{msg}\n")
-        self.text_widget.see(tk.END)
+        try:
+            self.lines.put(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        # The final drain still runs, so nothing logged before closing is lost
+        self.closed = True
+        super().close()
+
+    def drain(self):
+        pending = []
+        while True:
+            try:
+                pending.append(self.lines.get_nowait())
+            except queue.Empty:
+                break
+        if pending:
+            self.text_widget.insert(tk.END, "\n".join(pending) + "\n")
+            excess = int(self.text_widget.index('end-1c').split('.')[0]) - 1 - self.max_lines
+            if excess > 0:
+                self.text_widget.delete('1.0', f'{excess + 1}.0')
+            self.text_widget.see(tk.END)
+        if not self.closed:
+            self.text_widget.after(self.interval_ms, self.drain)
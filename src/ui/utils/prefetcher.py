@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from PIL import ImageTk
+from .image_handler import ImageHandler
+from .update_channel import UpdateChannel
+from ...core.repository import connect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_group_files(db_path, group_ids):
+    """Return {group_id: [(filepath, duplicate_flag, file_id), ...]} for group_ids"""
+    files = {group_id: [] for group_id in group_ids}
+    if not files:
+        return files
+    conn = connect(db_path)
+    try:
+        placeholders = ",".join("?" * len(files))
+        rows = conn.execute(f"""
+            SELECT group_id, filepath, duplicate_flag, file_id
+            FROM all_groups
+            WHERE group_id IN ({placeholders})
+            ORDER BY group_id, file_id
+        """, list(files)).fetchall()
+    finally:
+        conn.close()
+    for group_id, filepath, duplicate_flag, file_id in rows:
+        files[group_id].append((filepath, duplicate_flag, file_id))
+    return files
+
+
+class PagePrefetcher:
+    """Loads rows and thumbnails of neighbouring pages in the background.
+
+    Rows are kept in a small LRU keyed by group id. Thumbnails are decoded
+    on a worker thread and queued on an UpdateChannel, which turns them
+    into PhotoImages in the shared ImageHandler cache on the Tk thread and
+    only polls while a round is running. A prefetch round never fills more
+    than ``cache_fraction`` of the cache budget, so it cannot evict the
+    page on screen, and is abandoned as soon as a newer round starts.
+    """
+
+    def __init__(self, widget, depth=1, max_groups=64, cache_fraction=0.5,
+                 thumbnail_size=(150, 150)):
+        self.channel = UpdateChannel(widget, lambda current, total: None)  # Thumbnails to Tk
+        self.depth = depth
+        self.max_groups = max_groups
+        self.cache_fraction = cache_fraction
+        self.thumbnail_size = thumbnail_size
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._rounds = 0  # Rounds not finished yet (Tk thread only)
+
+    def get_rows(self, group_id):
+        """Return prefetched rows for group_id, or None if not loaded"""
+        with self._lock:
+            rows = self._rows.get(group_id)
+            if rows is not None:
+                self._rows.move_to_end(group_id)
+            return rows
+
+    def reset(self):
+        """Drop prefetched rows and cancel any running round"""
+        with self._lock:
+            self._generation += 1
+            self._rows.clear()
+
+    def prefetch(self, db_path, group_ids):
+        """Start a background round for group_ids (most urgent first)"""
+        if self.depth <= 0 or not group_ids:
+            return
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._rounds += 1
+        self.channel.start()  # Called on the Tk thread; stopped by the last _finish_round
+        threading.Thread(
+            target=self._run,
+            args=(generation, db_path, list(group_ids)),
+            daemon=True
+        ).start()
+
+    def _is_current(self, generation):
+        return generation == self._generation
+
+    def _store_rows(self, rows):
+        with self._lock:
+            for group_id, files in rows.items():
+                self._rows[group_id] = files
+                self._rows.move_to_end(group_id)
+            while len(self._rows) > self.max_groups:
+                self._rows.popitem(last=False)
+
+    def _run(self, generation, db_path, group_ids):
+        try:
+            missing = [g for g in group_ids if self.get_rows(g) is None]
+            if missing:
+                self._store_rows(fetch_group_files(db_path, missing))
+
+            cache = ImageHandler.cache
+            budget = int(cache.max_bytes * self.cache_fraction)
+            for group_id in group_ids:
+                for filepath, _, _ in self.get_rows(group_id) or []:
+                    if not self._is_current(generation) or budget <= 0:
+                        return
+                    key = (filepath, tuple(self.thumbnail_size))
+                    if key in cache:
+                        continue
+                    try:
+                        image = ImageHandler.load_thumbnail(filepath, self.thumbnail_size)
+                    except Exception:
+                        continue  # Missing files are reported when displayed
+                    budget -= image.width * image.height * 4
+                    self.channel.call(self._publish, generation, key, image)
+        except Exception as e:
+            logger.warning(f"Prefetch failed: {e}")
+        finally:
+            self.channel.call(self._finish_round)
+
+    def _finish_round(self):
+        """Runs on the Tk thread after a round's thumbnails were published"""
+        self._rounds -= 1
+        if not self._rounds:
+            self.channel.stop()
+
+    def _publish(self, generation, key, image):
+        """Runs on the Tk thread: turn a decoded image into a cached PhotoImage"""
+        if self._is_current(generation) and key not in ImageHandler.cache:
+            ImageHandler.cache.put(key, ImageTk.PhotoImage(image))
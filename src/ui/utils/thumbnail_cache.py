@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+
+class ThumbnailCache:
+    """Bounded LRU of ready-to-display thumbnails shared across viewers.
+
+    Entries are weighed by their decoded pixel size so the cache holds as
+    many thumbnails as fit in ``max_bytes`` rather than a fixed count.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_size(photo):
+        """Approximate memory held by a PhotoImage (RGBA pixels)"""
+        return photo.width() * photo.height() * 4
+
+    def get(self, key):
+        """Return cached thumbnail for key, or None on a miss"""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, photo):
+        """Store thumbnail, evicting least recently used entries over budget"""
+        size = self.estimate_size(photo)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._items[key] = (photo, size)
+            self.current_bytes += size
+            self._evict()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def set_max_bytes(self, max_bytes):
+        """Change the memory budget, evicting immediately if it shrank"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._items),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._items:
+            _, (_, size) = self._items.popitem(last=False)
+            self.current_bytes -= size
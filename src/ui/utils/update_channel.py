@@ -0,0 +1,56 @@
+import queue
+
+
+class UpdateChannel:
+    """Hands progress and completion callbacks from a worker to the Tk loop.
+
+    Worker threads never touch Tk: progress() only stores the latest value
+    (so any number of reports between two polls cost one widget update)
+    and call() queues a function. The Tk side polls every ``interval_ms``
+    with after() and runs them there, until stop() is called.
+    """
+
+    def __init__(self, widget, on_progress, interval_ms=100):
+        self.widget = widget
+        self.on_progress = on_progress
+        self.interval_ms = interval_ms
+        self._latest = None
+        self._shown = None
+        self._calls = queue.SimpleQueue()
+        self._running = False
+        self._scheduled = False  # A _poll is pending in the Tk event loop
+
+    def progress(self, current, total):
+        """Record progress; safe to call from any thread, as often as wanted"""
+        self._latest = (current, total)
+
+    def call(self, func, *args):
+        """Run func(*args) on the Tk thread at the next poll"""
+        self._calls.put((func, args))
+
+    def start(self):
+        """Start (or restart after stop()) polling; call from the Tk thread"""
+        self._running = True
+        if not self._scheduled:
+            self._scheduled = True
+            self.widget.after(self.interval_ms, self._poll)
+
+    def stop(self):
+        """Stop polling after the current round (call from the Tk thread)"""
+        self._running = False
+
+    def _poll(self):
+        self._scheduled = False
+        latest = self._latest
+        if latest is not None and latest != self._shown:
+            self._shown = latest
+            self.on_progress(*latest)
+        while True:
+            try:
+                func, args = self._calls.get_nowait()
+            except queue.Empty:
+                break
+            func(*args)
+        if self._running and not self._scheduled:
+            self._scheduled = True
+            self.widget.after(self.interval_ms, self._poll)
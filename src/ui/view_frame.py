@@ -1,7 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from .components.group_viewer import GroupViewer
+from .components.virtual_group_list import VirtualGroupList
+from .utils.image_handler import ImageHandler
+from .utils.prefetcher import PagePrefetcher, fetch_group_files
+from .utils.group_source import GroupSource
+from .utils.update_channel import UpdateChannel
+from ..core.analytics import directory_rollup, format_bytes, reclaimable_summary
+from ..core.repository import connect, is_database_url, is_sqlite_file
+from ..core.group_query import GroupFilter, ensure_query_indexes
+from ..core.group_summary import has_group_summary, rebuild_group_summary
+from ..core.path_search import build_path_index, has_path_index, match_expression
 import sqlite3
+import threading
 
 class ViewFrame(ttk.Frame):
     def __init__(self, parent):
@@ -11,15 +21,29 @@ class ViewFrame(ttk.Frame):
 
     def setup_variables(self):
         self.db_path_view = tk.StringVar()
-        self.current_page = 0
-        self.groups_per_page = 3  # Changed from 5 to 3
-        self.total_pages = 0
-        self.groups = []
+        self.groups = []  # GroupSource once a database is loaded
+        self.min_members = tk.StringVar()
+        self.max_members = tk.StringVar()
+        self.directory_prefix = tk.StringVar()
+        self.filename_pattern = tk.StringVar()
+        self.path_search = tk.StringVar()
+        self.min_percentage = tk.StringVar()
+        self.max_percentage = tk.StringVar()
+        self.sort_order = tk.StringVar(value="Group ID")
+        self.only_with_original = tk.BooleanVar(value=True)
+        self.thumbnail_cache_mb = 64  # Memory budget for cached thumbnails
+        ImageHandler.cache.set_max_bytes(self.thumbnail_cache_mb * 1024 * 1024)
+        self.prefetch_depth = 1  # Screens loaded ahead on each side of the viewport
+        self.prefetcher = PagePrefetcher(self, depth=self.prefetch_depth)
+        self._prefetch_job = None
 
     def create_widgets(self):
         # Database selection frame
         self.create_db_selection()
         
+        # Filter and sort frame
+        self.create_filter_controls()
+        
         # Navigation frame
         self.create_navigation()
         
@@ -27,70 +51,13 @@ class ViewFrame(ttk.Frame):
         self.create_groups_container()
 
     def create_groups_container(self):
-        # Create main container frame
-        self.main_container = ttk.Frame(self)
-        self.main_container.pack(fill="both", expand=True)
-        
-        # Create canvas with fixed height and scrollbar
-        self.canvas = tk.Canvas(
-            self.main_container,
-            bg='#f0f0f0',
-            height=600,  # Fixed height to ensure scroll works
-            highlightthickness=0  # Remove border
-        )
-        self.scrollbar = ttk.Scrollbar(
-            self.main_container,
-            orient="vertical",
-            command=self.canvas.yview
+        # Only the groups inside the viewport are materialised
+        self.group_list = VirtualGroupList(
+            self,
+            fetch_rows=self.fetch_rows,
+            on_visible_change=self.on_visible_change
         )
-        
-        # Create frame to hold groups
-        self.groups_container = ttk.Frame(self.canvas)
-        
-        # Pack scrollbar and canvas
-        self.scrollbar.pack(side="right", fill="y")
-        self.canvas.pack(side="left", fill="both", expand=True, padx=(5, 0))
-        
-        # Create window in canvas
-        self.canvas_window = self.canvas.create_window(
-            (0, 0),
-            window=self.groups_container,
-            anchor="nw",
-            width=self.canvas.winfo_reqwidth()
-        )
-        
-        # Configure canvas
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
-        
-        # Bind events
-        self.groups_container.bind(
-            "<Configure>",
-            self._on_frame_configure
-        )
-        self.canvas.bind(
-            "<Configure>",
-            self._on_canvas_configure
-        )
-        
-        # Bind mouse wheel scrolling
-        self.bind_mouse_wheel()
-
-    def bind_mouse_wheel(self):
-        def _on_mousewheel(event):
-            self.canvas.yview_scroll(int(-1 * (event.delta/120)), "units")
-        
-        # Bind to canvas and groups container
-        self.canvas.bind_all("<MouseWheel>", _on_mousewheel)
-
-    def _on_frame_configure(self, event):
-        """Reset the scroll region when the frame changes size"""
-        # Update the scroll region to encompass the inner frame
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-    def _on_canvas_configure(self, event):
-        """Update the groups container width when canvas changes size"""
-        # Update the width of the window to fit the canvas
-        self.canvas.itemconfig(self.canvas_window, width=event.width)
+        self.group_list.pack(fill="both", expand=True)
 
     def create_db_selection(self):
         db_select_frame = ttk.LabelFrame(self, text="Database Selection", padding=15)
@@ -109,12 +76,93 @@ class ViewFrame(ttk.Frame):
             style='Action.TButton'
         ).pack(side="left")
         
+        ttk.Button(
+            db_select_frame,
+            text="Browse Store",
+            command=self.browse_store,
+            style='Action.TButton'
+        ).pack(side="left", padx=(10, 0))
+        
         ttk.Button(
             db_select_frame,
             text="Load Duplicates",
             command=self.load_duplicates,
             style='Action.TButton'
         ).pack(side="left", padx=10)
+        
+        ttk.Button(
+            db_select_frame,
+            text="Space Report",
+            command=self.show_space_report,
+            style='Action.TButton'
+        ).pack(side="left")
+
+    SORT_ORDERS = {
+        "Group ID": 'group_id',
+        "Largest groups first": 'size_desc',
+        "Smallest groups first": 'size_asc',
+        "Lowest match % first": 'percentage_asc',
+    }
+
+    def create_filter_controls(self):
+        filter_frame = ttk.LabelFrame(self, text="Filter & Sort", padding=15)
+        filter_frame.pack(fill="x", pady=(0, 10))
+        
+        criteria = ttk.Frame(filter_frame)
+        criteria.pack(fill="x")
+        
+        ttk.Label(criteria, text="Files from:").pack(side="left", padx=5)
+        ttk.Entry(criteria, textvariable=self.min_members, width=6).pack(side="left")
+        ttk.Label(criteria, text="to").pack(side="left", padx=5)
+        ttk.Entry(criteria, textvariable=self.max_members, width=6).pack(side="left")
+        
+        ttk.Label(criteria, text="Match % from:").pack(side="left", padx=(15, 5))
+        ttk.Entry(criteria, textvariable=self.min_percentage, width=6).pack(side="left")
+        ttk.Label(criteria, text="to").pack(side="left", padx=5)
+        ttk.Entry(criteria, textvariable=self.max_percentage, width=6).pack(side="left")
+        
+        ttk.Label(criteria, text="Directory:").pack(side="left", padx=(15, 5))
+        ttk.Entry(criteria, textvariable=self.directory_prefix, width=30).pack(side="left", fill="x", expand=True)
+        
+        ttk.Label(criteria, text="Filename (e.g. *.jpg):").pack(side="left", padx=(15, 5))
+        ttk.Entry(criteria, textvariable=self.filename_pattern, width=15).pack(side="left")
+        
+        options = ttk.Frame(filter_frame)
+        options.pack(fill="x", pady=(10, 0))
+        
+        ttk.Label(options, text="Search path:").pack(side="left", padx=5)
+        search_entry = ttk.Entry(options, textvariable=self.path_search, width=30)
+        search_entry.pack(side="left", padx=(0, 15))
+        search_entry.bind('<Return>', lambda e: self.apply_filter())
+        
+        ttk.Label(options, text="Sort by:").pack(side="left", padx=5)
+        ttk.Combobox(
+            options,
+            textvariable=self.sort_order,
+            values=list(self.SORT_ORDERS),
+            state="readonly",
+            width=22
+        ).pack(side="left")
+        
+        ttk.Checkbutton(
+            options,
+            text="Only groups with an original",
+            variable=self.only_with_original
+        ).pack(side="left", padx=15)
+        
+        ttk.Button(
+            options,
+            text="Reset",
+            command=self.reset_filter,
+            style='Action.TButton'
+        ).pack(side="right", padx=5)
+        
+        ttk.Button(
+            options,
+            text="Apply",
+            command=self.apply_filter,
+            style='Action.TButton'
+        ).pack(side="right", padx=5)
 
     def create_navigation(self):
         nav_container = ttk.LabelFrame(self, text="Navigation", padding=15)
@@ -146,7 +194,7 @@ class ViewFrame(ttk.Frame):
         
         self.page_label = ttk.Label(
             nav_center,
-            text="Page: 0/0",
+            text="Groups: 0/0",
             font=("Helvetica", 12, "bold")
         )
         self.page_label.pack(side="left", padx=10)
@@ -166,6 +214,14 @@ class ViewFrame(ttk.Frame):
             style='Action.TButton'
         )
         self.next_btn.pack(side="right", padx=5)
+        
+        self.cache_label = ttk.Label(
+            nav_right,
+            text="",
+            font=("Helvetica", 9),
+            foreground='#666666'
+        )
+        self.cache_label.pack(side="right", padx=10)
 
     def create_goto_controls(self, parent):
         # Group navigation
@@ -179,41 +235,51 @@ class ViewFrame(ttk.Frame):
             command=self.goto_specific_group,
             style='Action.TButton'
         ).pack(side="left", padx=5)
+
+    def fetch_rows(self, group_ids):
+        """Return rows for group_ids, using prefetched rows where available"""
+        rows = {}
+        missing = []
+        for group_id in group_ids:
+            files = self.prefetcher.get_rows(group_id)
+            if files is None:
+                missing.append(group_id)
+            else:
+                rows[group_id] = files
+        if missing:
+            rows.update(fetch_group_files(self.db_path_view.get(), missing))
+        return rows
+
+    def on_visible_change(self, first, last):
+        self.update_navigation(first, last)
         
-        # Page navigation
-        ttk.Label(parent, text="Go to Page:").pack(side="left", padx=5)
-        self.goto_page = ttk.Entry(parent, width=10)
-        self.goto_page.pack(side="left", padx=5)
-        
-        ttk.Button(
-            parent,
-            text="Go",
-            command=self.goto_specific_page,
-            style='Action.TButton'
-        ).pack(side="left", padx=5)
+        # Warm up the neighbouring screens once scrolling settles
+        if self._prefetch_job is not None:
+            self.after_cancel(self._prefetch_job)
+        self._prefetch_job = self.after(150, self.prefetch_neighbours, first, last)
 
-    def load_current_page(self):
-        # Clear existing groups
-        for widget in self.groups_container.winfo_children():
-            widget.destroy()
-        
-        start_idx = self.current_page * self.groups_per_page
-        end_idx = min(start_idx + self.groups_per_page, len(self.groups))
-        
-        # Add groups to the container
-        for group in self.groups[start_idx:end_idx]:
-            group_viewer = GroupViewer(self.groups_container, group[0], self.db_path_view.get())
-            group_viewer.pack(fill="x", pady=5, padx=5)
-        
-        # Important: Update scroll region after adding groups
-        self.groups_container.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        self.update_navigation()
+    def prefetch_neighbours(self, first, last):
+        """Prefetch rows and thumbnails of the screens around the viewport"""
+        self._prefetch_job = None
+        span = max(last - first, 1) * self.prefetch_depth
+        group_ids = list(self.groups[last:last + span])
+        group_ids.extend(reversed(self.groups[max(first - span, 0):first]))
+        self.prefetcher.depth = self.prefetch_depth
+        self.prefetcher.prefetch(self.db_path_view.get(), group_ids)
 
-    def update_navigation(self):
-        self.page_label.config(text=f"Page: {self.current_page + 1}/{self.total_pages}")
-        self.prev_btn.config(state="normal" if self.current_page > 0 else "disabled")
-        self.next_btn.config(state="normal" if self.current_page < self.total_pages - 1 else "disabled")
+    def update_navigation(self, first, last):
+        total = len(self.groups)
+        self.page_label.config(
+            text=f"Groups: {first + 1}-{last}/{total}" if total else "Groups: 0/0"
+        )
+        self.prev_btn.config(state="normal" if first > 0 else "disabled")
+        self.next_btn.config(state="normal" if last < total else "disabled")
+        
+        stats = ImageHandler.cache.stats()
+        self.cache_label.config(
+            text=f"Thumbnail cache: {stats['hits']} hits / {stats['misses']} misses "
+                 f"({stats['bytes'] // (1024 * 1024)}/{stats['max_bytes'] // (1024 * 1024)} MB)"
+        )
 
     def browse_db(self):
         filename = filedialog.askopenfilename(
@@ -223,64 +289,174 @@ class ViewFrame(ttk.Frame):
         if filename:
             self.db_path_view.set(filename)
 
+    def browse_store(self):
+        directory = filedialog.askdirectory(title="Select Columnar Store")
+        if directory:
+            self.db_path_view.set(directory)
+
+    def build_filter(self, path_match=None):
+        """Translate the filter controls into a GroupFilter"""
+        def number(var, convert):
+            text = var.get().strip()
+            return convert(text) if text else None
+        
+        return GroupFilter(
+            path_match=path_match,
+            min_members=number(self.min_members, int),
+            max_members=number(self.max_members, int),
+            directory_prefix=self.directory_prefix.get().strip(),
+            filename_pattern=self.filename_pattern.get().strip(),
+            min_percentage=number(self.min_percentage, float),
+            max_percentage=number(self.max_percentage, float),
+            only_with_original=self.only_with_original.get(),
+            sort=self.SORT_ORDERS[self.sort_order.get()]
+        )
+
     def load_duplicates(self):
         if not self.db_path_view.get():
             messagebox.showerror("Error", "Please select a database file")
             return
         
         try:
-            conn = sqlite3.connect(self.db_path_view.get())
-            cursor = conn.cursor()
-            
-            self.groups = cursor.execute("""
-                SELECT DISTINCT group_id 
-                FROM all_groups 
-                WHERE duplicate_flag = 0
-                ORDER BY group_id
-            """).fetchall()
-            
+            conn = connect(self.db_path_view.get())
+            # Older databases get their summary table and indexes built once, on first load
+            if is_sqlite_file(self.db_path_view.get()):
+                if not has_group_summary(conn):
+                    rebuild_group_summary(conn)
+                ensure_query_indexes(conn)
             conn.close()
-            
-            if not self.groups:
-                messagebox.showinfo("Info", "No duplicate groups found")
-                return
-            
-            self.current_page = 0
-            self.total_pages = (len(self.groups) + self.groups_per_page - 1) // self.groups_per_page
-            self.load_current_page()
-            
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load database: {str(e)}")
+            return
+        
+        self.apply_filter()
+
+    def apply_filter(self):
+        if not self.db_path_view.get():
+            messagebox.showerror("Error", "Please select a database file")
+            return
+        
+        path_match = self.build_path_match()
+        if path_match is False:
+            return
+        
+        try:
+            group_filter = self.build_filter(path_match)
+        except ValueError:
+            messagebox.showerror("Error", "Please enter valid numbers for file count and match %")
+            return
+        
+        try:
+            groups = GroupSource(self.db_path_view.get(), group_filter)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load database: {str(e)}")
+            return
+        
+        if isinstance(self.groups, GroupSource):
+            self.groups.close()
+        self.groups = groups
+        self.prefetcher.reset()
+        self.group_list.set_groups(self.groups, self.db_path_view.get())
+        
+        if not len(groups):
+            messagebox.showinfo("Info", "No duplicate groups found")
+
+    def build_path_match(self):
+        """Return the FTS expression for the search box, None if empty, False if unusable"""
+        text = self.path_search.get().strip()
+        if not text:
+            return None
+        if not is_sqlite_file(self.db_path_view.get()):
+            messagebox.showerror("Error", "Path search needs a SQLite database file")
+            return False
+        
+        conn = sqlite3.connect(self.db_path_view.get())
+        try:
+            if not has_path_index(conn):
+                if not messagebox.askyesno(
+                    "Search Index",
+                    "This database has no path search index yet. Build it now?\n"
+                    "(This reads every file path once and may take a while.)"
+                ):
+                    return False
+                build_path_index(conn)
+            return match_expression(conn, text)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return False
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to search paths: {str(e)}")
+            return False
+        finally:
+            conn.close()
+
+    def reset_filter(self):
+        for var in (self.min_members, self.max_members, self.directory_prefix, self.filename_pattern,
+                    self.path_search, self.min_percentage, self.max_percentage):
+            var.set("")
+        self.sort_order.set("Group ID")
+        self.only_with_original.set(True)
+        self.apply_filter()
+
+    def show_space_report(self):
+        """Stat files and total reclaimable space in the background"""
+        db_path = self.db_path_view.get()
+        if not db_path:
+            messagebox.showerror("Error", "Please select a database file")
+            return
+        if is_database_url(db_path):
+            messagebox.showerror("Error", "The space report needs a SQLite database file or a columnar store")
+            return
+        
+        # The worker never touches Tk; the result or error reaches it through the channel
+        channel = UpdateChannel(self, lambda current, total: None)
+        channel.start()
+        
+        def finish(show, *args):
+            channel.stop()
+            show(*args)
+        
+        def work():
+            try:
+                conn = connect(db_path)
+                try:
+                    summary = reclaimable_summary(conn)
+                    directories = directory_rollup(conn, limit=10)
+                finally:
+                    conn.close()
+            except Exception as e:
+                channel.call(finish, messagebox.showerror, "Error", f"Failed to build report: {str(e)}")
+                return
+            channel.call(finish, self.present_space_report, summary, directories)
+        
+        threading.Thread(target=work, daemon=True).start()
+
+    def present_space_report(self, summary, directories):
+        lines = [
+            f"Files: {summary['files']} ({format_bytes(summary['total_bytes'])})",
+            f"Duplicates: {summary['duplicate_files']} "
+            f"({format_bytes(summary['reclaimable_bytes'])} reclaimable)",
+            f"Not found on disk: {summary['missing_files']}",
+            "",
+            "Top directories:",
+        ]
+        lines.extend(f"  {format_bytes(size)}  {count} files  {directory}"
+                     for directory, count, size in directories)
+        messagebox.showinfo("Space Report", "\n".join(lines))
 
     def goto_specific_group(self):
         try:
             group_id = int(self.goto_group.get())
-            if group_id in [g[0] for g in self.groups]:
-                group_index = [g[0] for g in self.groups].index(group_id)
-                self.current_page = group_index // self.groups_per_page
-                self.load_current_page()
+            group_index = self.groups.position(group_id) if isinstance(self.groups, GroupSource) else None
+            if group_index is not None:
+                self.group_list.scroll_to_index(group_index)
             else:
                 messagebox.showerror("Error", "Group ID not found")
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid group number")
 
-    def goto_specific_page(self):
-        try:
-            page = int(self.goto_page.get()) - 1
-            if 0 <= page < self.total_pages:
-                self.current_page = page
-                self.load_current_page()
-            else:
-                messagebox.showerror("Error", "Page number out of range")
-        except ValueError:
-            messagebox.showerror("Error", "Please enter a valid page number")
-
     def next_page(self):
-        if self.current_page < self.total_pages - 1:
-            self.current_page += 1
-            self.load_current_page()
+        self.group_list.scroll_pages(1)
 
     def prev_page(self):
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.load_current_page()
+        self.group_list.scroll_pages(-1)
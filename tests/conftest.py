@@ -0,0 +1,50 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.generate import generate_groups, write_xml
+
+# A small report with partial groups and paths shared between groups
+SHAPE = dict(groups=300, min_files=2, max_files=5, directories=20, depth=2,
+             partial_fraction=0.2, shared_fraction=0.1, seed=7)
+
+
+@pytest.fixture(scope='session')
+def shape():
+    """Keyword arguments of benchmarks.generate for the test report"""
+    return SHAPE
+
+
+@pytest.fixture(scope='session')
+def shape_groups():
+    """(paths, matches) per group of SHAPE, as the generator yields them"""
+    return list(generate_groups(**SHAPE))
+
+
+@pytest.fixture(scope='session')
+def report(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('report') / 'report.xml')
+    write_xml(path, **SHAPE)
+    return path
+
+
+@pytest.fixture(scope='session')
+def ingested(tmp_path_factory, report):
+    """Database loaded from report by XMLFlattener (read-only for tests)"""
+    pytest.importorskip('tqdm')
+    from src.core.xml_processor import XMLFlattener
+
+    db_path = str(tmp_path_factory.mktemp('ingested') / 'xml_data.db')
+    XMLFlattener(db_path).process_large_xml(report)
+    return db_path
+
+
+@pytest.fixture
+def ingested_copy(tmp_path, ingested):
+    """Writable connection to a copy of the ingested database"""
+    source = sqlite3.connect(ingested)
+    conn = sqlite3.connect(str(tmp_path / 'copy.db'))
+    source.backup(conn)
+    source.close()
+    yield conn
+    conn.close()
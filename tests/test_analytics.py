@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+from src.core.analytics import directory_rollup, reclaimable_summary
+from src.core.resolver import DuplicateResolver
+
+KB = 1024
+
+
+@pytest.fixture
+def pairs(tmp_path):
+    """A 100% pair with an original and an 80% pair flagged duplicate on both sides"""
+    files = tmp_path / 'files'
+    files.mkdir()
+    rows = [
+        (1, 0, 'exact_a.jpg', False),
+        (1, 1, 'exact_b.jpg', True),
+        (2, 0, 'similar_a.jpg', True),
+        (2, 1, 'similar_b.jpg', True),
+    ]
+    db_path = str(tmp_path / 'xml_data.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+    CREATE TABLE all_groups (
+        id INTEGER PRIMARY KEY,
+        group_id INTEGER,
+        file_id INTEGER,
+        filepath TEXT,
+        filename TEXT,
+        duplicate_flag BOOLEAN
+    )''')
+    for group_id, file_id, name, duplicate in rows:
+        path = files / name
+        path.write_bytes(b'x' * KB)
+        conn.execute(
+            'INSERT INTO all_groups (group_id, file_id, filepath, filename, duplicate_flag) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (group_id, file_id, str(path), name, duplicate)
+        )
+    conn.commit()
+    yield db_path, conn
+    conn.close()
+
+
+def planned(tmp_path, db_path):
+    resolver = DuplicateResolver(db_path, action='move', quarantine_dir=str(tmp_path / 'quarantine'))
+    try:
+        return resolver.plan()
+    finally:
+        resolver.close()
+
+
+def test_groups_without_original_reclaim_nothing(tmp_path, pairs):
+    db_path, conn = pairs
+    summary = reclaimable_summary(conn, workers=1)
+    assert summary['files'] == 4
+    assert summary['duplicate_files'] == 1
+    assert summary['reclaimable_bytes'] == KB
+    assert [row[1:] for row in directory_rollup(conn)] == [(1, KB)]
+    assert planned(tmp_path, db_path) == summary['duplicate_files']
+
+
+def test_file_clusters_decide_the_original(tmp_path, pairs):
+    db_path, conn = pairs
+    # Split group 1: the duplicate ends up alone in its own subcluster
+    conn.execute('CREATE TABLE file_clusters (id INTEGER PRIMARY KEY, cluster_id INTEGER)')
+    conn.executemany('INSERT INTO file_clusters (id, cluster_id) VALUES (?, ?)',
+                     [(1, 1), (2, 2), (3, 3), (4, 3)])
+    conn.commit()
+    summary = reclaimable_summary(conn, workers=1)
+    assert summary['duplicate_files'] == 0
+    assert summary['reclaimable_bytes'] == 0
+    assert planned(tmp_path, db_path) == 0
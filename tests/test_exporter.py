@@ -0,0 +1,75 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from src.core.exporter import export_table, infer_format
+
+
+@pytest.fixture
+def table_rows(ingested):
+    conn = sqlite3.connect(ingested)
+    try:
+        columns = [row[1] for row in conn.execute('SELECT * FROM pragma_table_info(?)', ('all_groups',))]
+        rows = conn.execute(f'SELECT {", ".join(columns)} FROM all_groups').fetchall()
+    finally:
+        conn.close()
+    return columns, rows
+
+
+def test_infer_format():
+    assert infer_format('out.CSV') == 'csv'
+    assert infer_format('out.jsonl') == 'jsonl'
+    assert infer_format('out.parquet') == 'parquet'
+    assert infer_format('out.txt') == 'csv'
+
+
+def export(ingested, output, **options):
+    conn = sqlite3.connect(ingested)
+    try:
+        return export_table(conn, 'all_groups', output, batch_size=64, **options)
+    finally:
+        conn.close()
+
+
+def test_csv(tmp_path, ingested, table_rows):
+    columns, rows = table_rows
+    output = str(tmp_path / 'all_groups.csv')
+    assert export(ingested, output) == len(rows)
+    with open(output, newline='', encoding='utf-8') as f:
+        exported = list(csv.reader(f))
+    assert exported[0] == columns
+    assert exported[1:] == [[str(value) for value in row] for row in rows]
+
+
+def test_jsonl(tmp_path, ingested, table_rows):
+    columns, rows = table_rows
+    output = str(tmp_path / 'all_groups.jsonl')
+    assert export(ingested, output) == len(rows)
+    with open(output, encoding='utf-8') as f:
+        exported = [json.loads(line) for line in f]
+    assert exported == [dict(zip(columns, row)) for row in rows]
+
+
+def test_parquet(tmp_path, ingested, table_rows):
+    pq = pytest.importorskip('pyarrow.parquet')
+    columns, rows = table_rows
+    output = str(tmp_path / 'all_groups.parquet')
+    assert export(ingested, output) == len(rows)
+    table = pq.read_table(output)
+    assert table.column_names == columns
+    assert str(table.schema.field('duplicate_flag').type) == 'bool'
+    assert [tuple(row.values()) for row in table.to_pylist()] == \
+        [row[:-1] + (bool(row[-1]),) for row in rows]
+
+
+def test_unknown_table_and_format(tmp_path, ingested):
+    with pytest.raises(ValueError):
+        export(ingested, str(tmp_path / 'out.csv'), fmt='xlsx')
+    conn = sqlite3.connect(ingested)
+    try:
+        with pytest.raises(ValueError):
+            export_table(conn, 'no_such_table', str(tmp_path / 'out.csv'))
+    finally:
+        conn.close()
@@ -0,0 +1,81 @@
+import pytest
+
+from src.core.group_query import GroupFilter, ensure_query_indexes
+from src.ui.utils.group_source import GroupSource
+
+FILTERS = [
+    dict(),
+    dict(only_with_original=False),
+    dict(min_members=3),
+    dict(max_percentage=99.0, only_with_original=False),
+    dict(directory_prefix='/data/d1'),
+    dict(filename_pattern='IMG_*1.jpg'),
+]
+
+
+@pytest.fixture
+def indexed(tmp_path, ingested_copy):
+    ensure_query_indexes(ingested_copy)
+    ingested_copy.commit()
+    return str(tmp_path / 'copy.db'), ingested_copy
+
+
+def listing(conn, group_filter):
+    """Every (group_id, sort_key) of the filter, fetched in one page"""
+    return group_filter.fetch_page(conn, limit=-1)
+
+
+def test_filters_match_summary(indexed, shape_groups):
+    _, conn = indexed
+    with_original = sum(all(pct == 100 for _, _, pct in matches) for _, matches in shape_groups)
+    assert GroupFilter().count(conn) == with_original
+    assert GroupFilter(only_with_original=False).count(conn) == len(shape_groups)
+    three = [group_id for group_id, (paths, _) in enumerate(shape_groups, 1) if len(paths) >= 3]
+    assert [group_id for group_id, _ in listing(conn, GroupFilter(min_members=3, only_with_original=False))] == three
+
+
+@pytest.mark.parametrize('sort', sorted(GroupFilter.SORTS))
+@pytest.mark.parametrize('options', FILTERS)
+def test_keyset_pages_match_offset_pages(indexed, sort, options):
+    _, conn = indexed
+    group_filter = GroupFilter(sort=sort, **options)
+    expected = listing(conn, group_filter)
+    assert len(expected) == group_filter.count(conn)
+
+    keyset, offset, after = [], [], None
+    while True:
+        page = group_filter.fetch_page(conn, 7, after=after)
+        if not page:
+            break
+        keyset.extend(page)
+        after = page[-1][1]
+    while len(offset) < len(expected):
+        offset.extend(group_filter.fetch_page(conn, 7, offset=len(offset)))
+    assert keyset == offset == expected
+    for index in (0, len(expected) // 2, len(expected) - 1):
+        if expected:
+            assert group_filter.position(conn, expected[index][0]) == index
+
+
+@pytest.mark.parametrize('sort', sorted(GroupFilter.SORTS))
+def test_group_source_pages(indexed, sort):
+    db_path, conn = indexed
+    group_filter = GroupFilter(sort=sort, only_with_original=False)
+    expected = [group_id for group_id, _ in listing(conn, group_filter)]
+    source = GroupSource(db_path, group_filter, block_size=16, max_blocks=3)
+    try:
+        assert len(source) == len(expected)
+        assert source[:] == expected  # Sequential blocks continue by keyset
+        assert [source[i] for i in range(len(expected) - 1, -1, -37)] == expected[::-37]
+        assert source[-1] == expected[-1]
+        assert len(source._blocks) <= 3
+        assert source.position(expected[100]) == 100
+        with pytest.raises(IndexError):
+            source[len(expected)]
+    finally:
+        source.close()
+
+
+def test_unknown_sort():
+    with pytest.raises(ValueError):
+        GroupFilter(sort='name')
@@ -0,0 +1,42 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from src.core import group_scanner
+from src.core.group_scanner import GroupScanner
+
+
+def test_count_and_offsets(report, shape_groups):
+    with GroupScanner(report) as scanner:
+        offsets = list(scanner.offsets())
+        assert scanner.count() == len(offsets) == len(shape_groups)
+        with open(report, 'rb') as f:
+            data = f.read()
+        assert all(data.startswith(b'<group>', offset) for offset in offsets)
+
+
+def test_count_across_window_edges(report, shape_groups, monkeypatch):
+    monkeypatch.setattr(group_scanner, 'WINDOW_BYTES', 37)
+    with GroupScanner(report) as scanner:
+        assert scanner.count() == len(shape_groups)
+
+
+@pytest.mark.parametrize('parts', [1, 4, 1000])
+def test_split_ranges_cover_every_group(report, shape_groups, parts):
+    with GroupScanner(report) as scanner:
+        ranges = scanner.split(parts)
+        assert len(ranges) <= min(parts, len(shape_groups))
+        assert sum(scanner.count(start, end) for start, end in ranges) == len(shape_groups)
+        paths = []
+        for start, end in ranges:
+            root = ET.parse(scanner.open_range(start, end)).getroot()
+            paths.extend([f.get('path') for f in group.findall('file')] for group in root.findall('group'))
+    assert paths == [group_paths for group_paths, _ in shape_groups]
+
+
+def test_empty_report(tmp_path):
+    path = tmp_path / 'empty.xml'
+    path.write_bytes(b'')
+    with GroupScanner(str(path)) as scanner:
+        assert scanner.count() == 0
+        assert scanner.split(4) == []
@@ -0,0 +1,59 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from src.core.input_stream import ReportStream, compression_of, open_report
+
+COMPRESSORS = {'gzip': gzip.compress, 'bz2': bz2.compress, 'xz': lzma.compress}
+
+
+@pytest.fixture
+def report_bytes(report):
+    with open(report, 'rb') as f:
+        return f.read()
+
+
+def test_plain_report_is_not_wrapped(report):
+    assert compression_of(report) is None
+    assert open_report(report) is None
+
+
+@pytest.mark.parametrize('compression', sorted(COMPRESSORS))
+def test_decompresses_report(tmp_path, report_bytes, compression):
+    path = str(tmp_path / f'report.{compression}')
+    with open(path, 'wb') as f:
+        f.write(COMPRESSORS[compression](report_bytes))
+    assert compression_of(path) == compression
+
+    stream = open_report(path)
+    try:
+        assert stream.read() == report_bytes
+        assert stream.decompressed_bytes == len(report_bytes)
+        assert stream.position == stream.compressed_size
+    finally:
+        stream.close()
+
+
+def test_small_chunks_and_early_close(tmp_path, report_bytes):
+    path = str(tmp_path / 'report.gz')
+    with open(path, 'wb') as f:
+        f.write(gzip.compress(report_bytes))
+    stream = ReportStream(path, 'gzip', chunk_size=100, depth=2)
+    assert b''.join(stream.read(100) for _ in range(5)) == report_bytes[:500]  # Raw reads return one chunk at most
+    stream.close()  # The decompressing thread is blocked on a full queue
+    assert stream.closed
+
+
+def test_truncated_report_raises_in_reader(tmp_path, report_bytes):
+    compressed = gzip.compress(report_bytes)
+    path = str(tmp_path / 'report.gz')
+    with open(path, 'wb') as f:
+        f.write(compressed[:len(compressed) // 2])
+    stream = open_report(path)
+    try:
+        with pytest.raises(EOFError):
+            stream.read()
+    finally:
+        stream.close()
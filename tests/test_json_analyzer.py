@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from benchmarks.generate import write_json
+
+pytest.importorskip('pandas')
+from json_analyzer import JsonAnalyzer  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def report_data(tmp_path_factory, shape):
+    path = str(tmp_path_factory.mktemp('json') / 'report.json')
+    assert write_json(path, **shape) == shape['groups']
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_structure(report_data):
+    result = JsonAnalyzer(report_data).analyze()
+    assert result['structure'] == {
+        'groups': 'list[dict]',
+        'groups.files': 'list[dict]',
+        'groups.files.path': 'str',
+        'groups.matches': 'list[dict]',
+        'groups.matches.first': 'int',
+        'groups.matches.second': 'int',
+        'groups.matches.percentage': 'float',
+    }
+
+
+def test_stats(report_data, shape_groups):
+    stats = JsonAnalyzer(report_data).analyze()['stats']
+    assert stats['groups']['count'] == len(shape_groups)
+    assert stats['groups.files']['count'] == len(shape_groups[0][0])
+    assert stats['groups.files.path']['value'] == shape_groups[0][0][0]
+
+
+def test_json_lines_match_document(tmp_path, report_data, shape):
+    path = str(tmp_path / 'report.jsonl')
+    write_json(path, lines=True, **shape)
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == report_data['groups']
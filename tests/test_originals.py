@@ -0,0 +1,71 @@
+from src.core.clustering import cluster_matches
+from src.core.originals import OriginalPolicy, apply_original_policy
+
+
+def originals(conn):
+    return dict(conn.execute('SELECT group_id, filepath FROM all_groups WHERE duplicate_flag = 0').fetchall())
+
+
+def expected_clusters(shape_groups, threshold):
+    """Python union-find over each group's matches: (clusters with more than one file, files in them)"""
+    clusters = files = 0
+    for paths, matches in shape_groups:
+        parent = list(range(len(paths)))
+
+        def find(node):
+            while parent[node] != node:
+                node = parent[node]
+            return node
+
+        for first, second, pct in matches:
+            if pct >= threshold:
+                parent[find(first)] = find(second)
+        sizes = {}
+        for node in range(len(paths)):
+            sizes[find(node)] = sizes.get(find(node), 0) + 1
+        clusters += sum(size > 1 for size in sizes.values())
+        files += sum(size for size in sizes.values() if size > 1)
+    return clusters, files
+
+
+def test_shortest_path_policy(ingested_copy, shape_groups):
+    conn = ingested_copy
+    before = originals(conn)
+    decided = apply_original_policy(conn, OriginalPolicy(rules=['shortest_path']), collect_meta=False)
+    after = originals(conn)
+
+    assert decided == len(before)
+    assert set(after) == set(before)  # Groups without an original keep none
+    for group_id, filepath in after.items():
+        paths = shape_groups[group_id - 1][0]
+        assert filepath == min(paths, key=lambda path: (len(path), path))
+    assert conn.execute('SELECT SUM(original_count) FROM group_summary').fetchone()[0] == len(after)
+
+
+def test_preferred_prefix_policy(ingested_copy, shape_groups):
+    conn = ingested_copy
+    policy = OriginalPolicy(rules=['preferred_prefix', 'shortest_path'], preferred_prefixes=['/data/d3/'])
+    apply_original_policy(conn, policy, collect_meta=False)
+    for group_id, filepath in originals(conn).items():
+        preferred = [path for path in shape_groups[group_id - 1][0] if path.startswith('/data/d3/')]
+        if preferred:
+            assert filepath == min(preferred, key=lambda path: (len(path), path))
+
+
+def test_cluster_matches(ingested_copy, shape_groups):
+    conn = ingested_copy
+    for threshold in (100.0, 80.0, 0.0):
+        expected, files = expected_clusters(shape_groups, threshold)
+        assert cluster_matches(conn, threshold=threshold) == expected
+
+        # Every file is in a cluster, and every cluster has exactly one original
+        assert conn.execute('SELECT COUNT(*) FROM file_clusters').fetchone()[0] == \
+            sum(len(paths) for paths, _ in shape_groups)
+        per_cluster = conn.execute('''
+        SELECT COUNT(*), SUM(g.duplicate_flag = 0) FROM file_clusters fc
+        JOIN all_groups g ON g.id = fc.id
+        GROUP BY fc.cluster_id
+        ''').fetchall()
+        assert all(cluster_originals == 1 for _, cluster_originals in per_cluster)
+        assert sum(size for size, _ in per_cluster if size > 1) == files
+        assert conn.execute('SELECT SUM(original_count) FROM group_summary').fetchone()[0] == len(per_cluster)
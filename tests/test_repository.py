@@ -0,0 +1,148 @@
+import os
+import sqlite3
+
+import pytest
+
+from src.core import repository
+from src.core.repository import _copy_value, _named_params, connect
+
+# SQLAlchemy URL of an empty scratch PostgreSQL database; the tables loaded are dropped
+POSTGRES_URL = os.environ.get('XML_ANALYZER_TEST_POSTGRES')
+
+
+def records(count, group_id=1):
+    return [{'group_id': group_id, 'file_id': i, 'filepath': f'/photos\tnew\\{i}.jpg',
+             'filename': f'{i}.jpg', 'duplicate_flag': i > 0} for i in range(count)]
+
+
+def load(repo, count):
+    writer = repo.writer(batch_rows=3)
+    try:
+        writer.append('all_groups', records(count))
+        writer.commit()
+    finally:
+        writer.close()
+
+
+@pytest.fixture
+def sqlite_repo(tmp_path):
+    pytest.importorskip('sqlalchemy')
+    repo = repository.open_repository(f"sqlite:///{tmp_path / 'shared.db'}")
+    yield repo
+    repo.dispose()
+    repository._repositories.clear()
+
+
+@pytest.fixture
+def postgres_repo():
+    if not POSTGRES_URL:
+        pytest.skip('XML_ANALYZER_TEST_POSTGRES is not set')
+    pytest.importorskip('sqlalchemy')
+    repo = repository.open_repository(POSTGRES_URL)
+    if repo.execute("SELECT to_regclass('all_groups')").fetchone()[0] is not None:
+        pytest.skip('XML_ANALYZER_TEST_POSTGRES already has an all_groups table')
+    yield repo
+    for table in reversed(repository.RepositoryWriter.TABLES):
+        repo.execute(f'DROP TABLE IF EXISTS {table}').close()
+    repo.dispose()
+    repository._repositories.clear()
+
+
+def test_named_params():
+    statement, binds = _named_params("SELECT ? || ':x' FROM t WHERE a = ? AND b = 'c:d'", ('v', 2))
+    assert statement == "SELECT :p0 || '\\:x' FROM t WHERE a = :p1 AND b = 'c\\:d'"
+    assert binds == {'p0': 'v', 'p1': 2}
+    assert _named_params('SELECT 1', ()) == ('SELECT 1', {})
+    with pytest.raises(ValueError):
+        _named_params('SELECT ?', ())
+
+
+def test_copy_value():
+    assert [_copy_value(value) for value in (None, True, False, 3, 0.5, 'a\tb\\c\n')] == \
+        ['\\N', 't', 'f', '3', '0.5', 'a\\tb\\\\c\\n']
+
+
+def test_connect_dispatch(tmp_path, sqlite_repo):
+    path = str(tmp_path / 'plain.db')
+    conn = connect(path)
+    try:
+        assert isinstance(conn, sqlite3.Connection)
+    finally:
+        conn.close()
+    assert connect(sqlite_repo.url) is sqlite_repo
+    assert isinstance(sqlite_repo, repository.SQLiteRepository)
+    assert sqlite_repo.path == str(tmp_path / 'shared.db')
+
+
+def test_connect_columnar_store(tmp_path):
+    pytest.importorskip('duckdb')
+    pytest.importorskip('pyarrow')
+    from src.core.columnar_store import ColumnarWriter
+
+    writer = ColumnarWriter(str(tmp_path / 'store'))
+    writer.append('all_groups', records(2))
+    writer.commit()
+    conn = connect(str(tmp_path / 'store'))
+    assert not isinstance(conn, sqlite3.Connection)
+    assert conn.execute('SELECT COUNT(*) FROM all_groups').fetchone() == (2,)
+
+
+def test_writer_loads_with_executemany(sqlite_repo):
+    load(sqlite_repo, 7)
+    rows = sqlite_repo.execute(
+        'SELECT file_id, filepath, duplicate_flag FROM all_groups WHERE group_id = ? ORDER BY file_id', (1,)
+    ).fetchall()
+    assert len(rows) == 7
+    assert rows[1] == (1, '/photos\tnew\\1.jpg', True)
+
+
+def test_writer_discards_uncommitted_rows(sqlite_repo):
+    writer = sqlite_repo.writer(batch_rows=2)
+    writer.append('all_groups', records(5))
+    writer.close()
+    assert sqlite_repo.execute('SELECT COUNT(*) FROM all_groups').fetchone() == (0,)
+
+
+def test_cursor_streams_long_results(sqlite_repo, monkeypatch):
+    load(sqlite_repo, 10)
+    pool = sqlite_repo.engine.pool
+    monkeypatch.setattr(sqlite_repo, 'buffer_rows', 4)
+
+    # A result that fits in the buffer gives its connection back at once
+    cursor = sqlite_repo.execute('SELECT file_id FROM all_groups WHERE file_id < 3')
+    assert pool.checkedout() == 0
+    assert cursor.fetchall() == [(0,), (1,), (2,)]
+
+    cursor = sqlite_repo.execute('SELECT file_id FROM all_groups ORDER BY file_id')
+    assert pool.checkedout() == 1
+    assert cursor.fetchone() == (0,)
+    assert cursor.fetchmany(5) == [(i,) for i in range(1, 6)]
+    assert list(cursor) == [(i,) for i in range(6, 10)]
+    assert pool.checkedout() == 0
+    assert cursor.fetchone() is None
+
+    # Closing an unfinished stream returns its connection too
+    cursor = sqlite_repo.execute('SELECT file_id FROM all_groups')
+    cursor.fetchmany(2)
+    cursor.close()
+    assert pool.checkedout() == 0
+
+
+def test_postgres_loads_with_copy(postgres_repo, monkeypatch):
+    if postgres_repo.engine.dialect.driver != 'psycopg2':
+        pytest.skip('COPY is only used with psycopg2')
+    monkeypatch.setattr(repository.Repository, 'bulk_insert', None)  # Any INSERT path would fail
+    load(postgres_repo, 7)
+    rows = postgres_repo.execute('SELECT file_id, filepath, duplicate_flag FROM all_groups ORDER BY file_id')
+    assert rows.fetchall() == [(r['file_id'], r['filepath'], r['duplicate_flag']) for r in records(7)]
+
+
+def test_postgres_falls_back_to_executemany(postgres_repo, monkeypatch):
+    inserted = []
+    bulk_insert = repository.Repository.bulk_insert
+    monkeypatch.setattr(repository.Repository, 'bulk_insert',
+                        lambda self, conn, table, rows: inserted.append(len(rows)) or bulk_insert(self, conn, table, rows))
+    monkeypatch.setattr(postgres_repo.engine.dialect, 'driver', 'other')
+    load(postgres_repo, 7)
+    assert inserted == [7]
+    assert postgres_repo.execute('SELECT COUNT(*) FROM all_groups').fetchone() == (7,)
@@ -0,0 +1,192 @@
+import os
+import sqlite3
+
+import pytest
+
+from src.core.resolver import DuplicateResolver
+
+
+@pytest.fixture
+def library(tmp_path):
+    """A database with two groups of identical files, plus its paths"""
+    files = tmp_path / 'files'
+    files.mkdir()
+    groups = {1: [b'first group', b'first group'], 2: [b'second', b'second', b'second']}
+    db_path = str(tmp_path / 'xml_data.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+    CREATE TABLE all_groups (
+        id INTEGER PRIMARY KEY,
+        group_id INTEGER,
+        file_id INTEGER,
+        filepath TEXT,
+        filename TEXT,
+        duplicate_flag BOOLEAN
+    )''')
+    paths = {}
+    for group_id, contents in groups.items():
+        for file_id, content in enumerate(contents):
+            path = files / f'{group_id}_{file_id}.jpg'
+            path.write_bytes(content)
+            paths[(group_id, file_id)] = str(path)
+            conn.execute(
+                'INSERT INTO all_groups (group_id, file_id, filepath, filename, duplicate_flag) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (group_id, file_id, str(path), path.name, file_id > 0)
+            )
+    conn.commit()
+    conn.close()
+    return db_path, paths
+
+
+def make_resolver(tmp_path, db_path, action, **options):
+    return DuplicateResolver(db_path, action=action, quarantine_dir=str(tmp_path / 'quarantine'),
+                             hash_cache_path=str(tmp_path / 'hash_cache.db'), workers=2, **options)
+
+
+def journal(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(
+            'SELECT filepath, action, status, target, error FROM resolution_journal ORDER BY id'
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def duplicates(paths):
+    return [path for (_, file_id), path in paths.items() if file_id > 0]
+
+
+def test_plan_journals_each_duplicate_once(tmp_path, library):
+    db_path, paths = library
+    resolver = make_resolver(tmp_path, db_path, 'move')
+    try:
+        assert resolver.plan() == 3
+        assert resolver.plan() == 0
+    finally:
+        resolver.close()
+    rows = journal(db_path)
+    assert sorted(row[0] for row in rows) == sorted(duplicates(paths))
+    assert {row[1:3] for row in rows} == {('move', 'pending')}
+
+
+def test_run_moves_duplicates_and_keeps_originals(tmp_path, library):
+    db_path, paths = library
+    resolver = make_resolver(tmp_path, db_path, 'move')
+    try:
+        resolver.plan()
+        stats = resolver.run()
+    finally:
+        resolver.close()
+    assert (stats['files'], stats['failed']) == (3, 0)
+    for path in duplicates(paths):
+        assert not os.path.exists(path)
+    assert os.path.exists(paths[(1, 0)]) and os.path.exists(paths[(2, 0)])
+    for _, _, status, target, _ in journal(db_path):
+        assert status == 'done' and os.path.exists(target)
+
+
+def test_dry_run_touches_nothing(tmp_path, library):
+    db_path, paths = library
+    resolver = make_resolver(tmp_path, db_path, 'delete', dry_run=True)
+    try:
+        resolver.plan()
+        assert resolver.run()['files'] == 3
+    finally:
+        resolver.close()
+    assert all(os.path.exists(path) for path in paths.values())
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'resolution_journal'"
+        ).fetchone() is None
+    finally:
+        conn.close()
+
+
+def test_run_resumes_an_interrupted_move(tmp_path, library):
+    db_path, paths = library
+    resolver = make_resolver(tmp_path, db_path, 'move', batch_size=1)
+    try:
+        resolver.plan()
+        # The first file was moved before the run was interrupted
+        moved = duplicates(paths)[0]
+        target = resolver._quarantine_path(moved)
+        os.makedirs(os.path.dirname(target))
+        os.rename(moved, target)
+        stats = resolver.run()
+    finally:
+        resolver.close()
+    assert (stats['files'], stats['failed']) == (3, 0)
+    assert {row[2] for row in journal(db_path)} == {'done'}
+
+
+def test_run_refuses_a_different_action_than_planned(tmp_path, library):
+    db_path, paths = library
+    planner = make_resolver(tmp_path, db_path, 'move')
+    try:
+        planner.plan()
+    finally:
+        planner.close()
+
+    resolver = make_resolver(tmp_path, db_path, 'delete')
+    try:
+        resolver.plan()
+        with pytest.raises(ValueError, match='planned as move'):
+            resolver.run()
+        assert all(os.path.exists(path) for path in paths.values())
+
+        resolver.discard_pending()
+        resolver.plan()
+        assert resolver.run()['files'] == 3
+    finally:
+        resolver.close()
+    assert {row[1:3] for row in journal(db_path)} == {('delete', 'done')}
+
+
+def test_delete_requires_identical_content(tmp_path, library):
+    db_path, paths = library
+    changed = paths[(2, 1)]
+    with open(changed, 'wb') as f:
+        f.write(b'SECOND')  # Same size as the original, different bytes
+    resolver = make_resolver(tmp_path, db_path, 'delete')
+    try:
+        resolver.plan()
+        stats = resolver.run()
+    finally:
+        resolver.close()
+    assert (stats['files'], stats['failed']) == (2, 1)
+    assert os.path.exists(changed)
+    errors = {row[0]: row[4] for row in journal(db_path)}
+    assert errors[changed] == "content differs from original"
+
+
+def test_undo_restores_moved_files(tmp_path, library):
+    db_path, paths = library
+    resolver = make_resolver(tmp_path, db_path, 'move')
+    try:
+        resolver.plan()
+        resolver.run()
+        assert resolver.undo() == 3
+    finally:
+        resolver.close()
+    assert all(os.path.exists(path) for path in paths.values())
+    assert {row[2] for row in journal(db_path)} == {'undone'}
+
+
+def test_undo_reports_a_move_without_target(tmp_path, library):
+    db_path, paths = library
+    resolver = make_resolver(tmp_path, db_path, 'move')
+    try:
+        resolver.plan()
+        # Journal left by an older version that ran a planned move as a delete
+        resolver.conn.execute("UPDATE resolution_journal SET status = 'done', target = NULL")
+        resolver.conn.commit()
+        for path in duplicates(paths):
+            os.remove(path)
+        assert resolver.undo() == 0
+    finally:
+        resolver.close()
+    for _, _, status, _, error in journal(db_path):
+        assert status == 'done' and error.startswith('undo failed')
@@ -0,0 +1,54 @@
+import gzip
+import shutil
+import sqlite3
+
+import pytest
+
+
+def counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        result = {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                  for table in ('all_groups', 'matches', 'group_summary')}
+        result['originals'] = conn.execute('SELECT COUNT(*) FROM all_groups WHERE duplicate_flag = 0').fetchone()[0]
+        return result
+    finally:
+        conn.close()
+
+
+def expected_counts(shape_groups):
+    return {
+        'all_groups': sum(len(paths) for paths, _ in shape_groups),
+        'matches': sum(len(matches) for _, matches in shape_groups),
+        'group_summary': len(shape_groups),
+        'originals': sum(all(pct == 100 for _, _, pct in matches) for _, matches in shape_groups),
+    }
+
+
+def test_ingest_row_counts(ingested, shape_groups):
+    assert counts(ingested) == expected_counts(shape_groups)
+
+
+def test_ingest_keeps_group_layout(ingested, shape_groups):
+    conn = sqlite3.connect(ingested)
+    try:
+        rows = conn.execute('SELECT group_id, filepath FROM all_groups ORDER BY group_id, file_id').fetchall()
+        summary = conn.execute('SELECT member_count, match_count FROM group_summary ORDER BY group_id').fetchall()
+    finally:
+        conn.close()
+    expected = [(group_id, path) for group_id, (paths, _) in enumerate(shape_groups, 1) for path in paths]
+    assert rows == expected
+    assert summary == [(len(paths), len(matches)) for paths, matches in shape_groups]
+
+
+def test_ingest_compressed_report(tmp_path, report, shape_groups):
+    pytest.importorskip('tqdm')
+    from src.core.xml_processor import XMLFlattener
+
+    compressed = str(tmp_path / 'report.xml.gz')
+    with open(report, 'rb') as source, gzip.open(compressed, 'wb') as target:
+        shutil.copyfileobj(source, target)
+    db_path = str(tmp_path / 'xml_data.db')
+    stats = XMLFlattener(db_path).process_large_xml(compressed)
+    assert counts(db_path) == expected_counts(shape_groups)
+    assert not stats.cancelled
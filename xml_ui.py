@@ -2,10 +2,12 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
 from xml_analyzer import XMLFlattener
+from src.ui.utils.image_handler import ImageHandler
+from src.ui.utils.logger import TextLogger
+from src.ui.utils.update_channel import UpdateChannel
 import threading
 import logging
 import ttkthemes
-from PIL import Image, ImageTk
 import sqlite3
 import os
 
@@ -30,6 +32,7 @@ class XMLAnalyzerUI:
         # Initialize image display variables
         self.image_labels = []
         self.thumbnails = []
+        self.thumbnail_cache = ImageHandler.cache  # Shared with the new viewer, survives page changes
         self.current_group_index = 0
         self.groups = []
         
@@ -1236,10 +1239,8 @@ class XMLAnalyzerUI:
                     frame.pack(side="left", padx=5, pady=5)
                     
                     try:
-                        # Create thumbnail
-                        image = Image.open(filepath)
-                        image.thumbnail((150, 150))
-                        photo = ImageTk.PhotoImage(image)
+                        # Create thumbnail, reusing one from an earlier page if cached
+                        photo = ImageHandler.get_thumbnail(filepath, (150, 150))
                         
                         # Keep reference to prevent garbage collection
                         frame.photo = photo
@@ -1330,10 +1331,9 @@ class XMLAnalyzerUI:
         self.next_btn.config(state="normal" if self.current_page < self.total_pages - 1 else "disabled")
     
     def update_progress(self, current, total):
-        """Update progress bar with current progress"""
+        """Update progress bar with current progress (Tk thread, via UpdateChannel)"""
         if total > 0:
-            percentage = (current / total) * 100
-            self.root.after(0, lambda: self._update_progress_ui(percentage))
+            self._update_progress_ui((current / total) * 100)
 
     def _update_progress_ui(self, value):
         """Update UI elements with progress value"""
@@ -1347,7 +1347,7 @@ class XMLAnalyzerUI:
     def browse_xml(self):
         filename = filedialog.askopenfilename(
             title="Select XML File",
-            filetypes=[("XML files", "*.xml"), ("All files", "*.*")]
+            filetypes=[("XML files", "*.xml *.xml.gz *.xml.bz2 *.xml.xz *.xml.zst"), ("All files", "*.*")]
         )
         if filename:
             self.xml_path.set(filename)
@@ -1373,48 +1373,44 @@ class XMLAnalyzerUI:
         self.log_text.delete(1.0, tk.END)
         self.progress_var.set(0)
         
-        class TextHandler(logging.Handler):
-            def __init__(self, text_widget):
-                super().__init__()
-                self.text_widget = text_widget
-                
-            def emit(self, record):
-                msg = self.format(record)
-                self.text_widget.insert(tk.END, f"{msg}\n")
-                self.text_widget.see(tk.END)
-    
+        # Worker-side progress and log lines are drained by the Tk loop
         logger = logging.getLogger()
-        text_handler = TextHandler(self.log_text)
-        text_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+        text_handler = TextLogger(self.log_text)
         logger.addHandler(text_handler)
+        channel = UpdateChannel(self.root, self.update_progress)
+        channel.start()
+        xml_path, db_path = self.xml_path.get(), self.db_path.get()
+        
+        def done():
+            logger.removeHandler(text_handler)
+            text_handler.close()
+            channel.stop()
+            self.processing = False
+            self.process_button.config(state="normal")
     
         def process():
             try:
-                flattener = XMLFlattener(self.db_path.get())
-                flattener.process_large_xml(self.xml_path.get(), self.update_progress)
+                flattener = XMLFlattener(db_path)
+                flattener.process_large_xml(xml_path, channel.progress)
                 
                 def success_callback():
+                    done()
                     messagebox.showinfo(
                         "Success", 
-                        f"Data successfully processed and stored in {self.db_path.get()}"
+                        f"Data successfully processed and stored in {db_path}"
                     )
-                    self.processing = False
-                    self.process_button.config(state="normal")
                     
-                self.root.after(0, success_callback)
+                channel.call(success_callback)
                 
             except Exception as e:
                 def error_callback():
+                    done()
                     messagebox.showerror(
                         "Error",
                         f"Failed to process XML: {str(e)}"
                     )
-                    self.processing = False
-                    self.process_button.config(state="normal")
                     
-                self.root.after(0, error_callback)
-            finally:
-                logger.removeHandler(text_handler)
+                channel.call(error_callback)
     
         threading.Thread(target=process, daemon=True).start()
 